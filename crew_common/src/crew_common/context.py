@@ -0,0 +1,228 @@
+"""Context compaction between chained crew tasks.
+
+By default crewAI hands a task the full raw output of every task in its
+``context``. For tasks listed in a crew's ``config/compaction.yaml`` the
+context is compacted first:
+
+- structured outputs (``output_pydantic``) are reduced to the listed fields;
+- repeated facts are dropped, comparing sentences case- and punctuation-blind;
+- the result is cut to a token budget, taking facts round-robin across items
+  (companies, report sections) so every item keeps its leading facts. The
+  budget is checked against the rendered context, labels and separators
+  included, and sections left without facts are dropped with their heading.
+
+Token counts are estimated at four characters per token, which is close
+enough to compare runs without pulling in a tokenizer.
+"""
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.constants import NOT_SPECIFIED
+from pydantic import BaseModel, Field
+
+# Same divider crewAI puts between upstream outputs
+DIVIDER = "\n\n----------\n\n"
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _fact_key(sentence: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", sentence.lower()).split())
+
+
+class CompactionRule(BaseModel):
+    """How to compact the context handed to one task"""
+    max_tokens: Optional[int] = Field(default=None, description="Token budget for the whole context")
+    fields: Optional[List[str]] = Field(default=None, description="Fields to keep from structured outputs")
+    dedupe: bool = Field(default=True, description="Drop facts already seen earlier in the context")
+
+
+class ContextCompactor:
+    """Compacts task context according to per-task rules and records the savings"""
+
+    def __init__(self, rules: Optional[Dict[str, CompactionRule]] = None):
+        self.rules = rules or {}
+        self.stats: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_yaml(cls, path) -> "ContextCompactor":
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        config = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        return cls({name: CompactionRule(**(rule or {})) for name, rule in config.items()})
+
+    def applies_to(self, task: Task) -> bool:
+        return task.name in self.rules
+
+    def compact(self, task: Task, outputs: List[TaskOutput]) -> str:
+        rule = self.rules[task.name]
+        original = DIVIDER.join(output.raw for output in outputs)
+
+        blocks = [self._items(output, rule) for output in outputs]
+        if rule.dedupe:
+            seen = set()
+            for output, items in zip(outputs, blocks):
+                structured = output.pydantic is not None or bool(output.json_dict)
+                for _, facts in items:
+                    if structured:
+                        # A sentence shared by two companies is still a fact about each
+                        seen = set()
+                    kept = []
+                    for fact in facts:
+                        key = _fact_key(fact[1])
+                        if key and key not in seen:
+                            seen.add(key)
+                            kept.append(fact)
+                    facts[:] = kept
+        if rule.max_tokens:
+            self._apply_budget(blocks, rule.max_tokens)
+
+        compacted = self._render_blocks(blocks)
+        self.stats.append({
+            "task": task.name,
+            "original_tokens": estimate_tokens(original),
+            "compacted_tokens": estimate_tokens(compacted),
+        })
+        return compacted
+
+    def tokens_saved(self) -> int:
+        return sum(s["original_tokens"] - s["compacted_tokens"] for s in self.stats)
+
+    def summary(self) -> str:
+        lines = ["Context compaction (estimated tokens):"]
+        for s in self.stats:
+            lines.append(
+                f"  {s['task']}: {s['original_tokens']} -> {s['compacted_tokens']}"
+                f" (saved {s['original_tokens'] - s['compacted_tokens']})"
+            )
+        lines.append(f"  total saved: {self.tokens_saved()}")
+        return "\n".join(lines)
+
+    def _items(self, output: TaskOutput, rule: CompactionRule) -> List[Tuple[str, List[tuple]]]:
+        """
+        Split an output into items, each a (heading, facts) pair where a fact is
+        (label, sentence, line). Structured outputs give one item per model in a
+        list; text gives one item per markdown section, and ``line`` keeps the
+        sentences of one source line together when rendered.
+        """
+        if output.pydantic is not None or output.json_dict:
+            data = output.pydantic.model_dump() if output.pydantic is not None else output.json_dict
+            return self._structured_items(data, rule.fields)
+
+        items: List[Tuple[str, List[tuple]]] = []
+        heading, facts = "", []
+        for number, line in enumerate(output.raw.splitlines()):
+            if line.lstrip().startswith("#"):
+                if heading or facts:
+                    items.append((heading, facts))
+                heading, facts = line.strip(), []
+            else:
+                facts.extend(("", s.strip(), number) for s in SENTENCE_SPLIT.split(line) if s.strip())
+        if heading or facts:
+            items.append((heading, facts))
+        return items
+
+    def _structured_items(self, data: Any, fields: Optional[List[str]]) -> List[Tuple[str, List[tuple]]]:
+        records: List[Dict[str, Any]] = []
+
+        def collect(value: Any) -> None:
+            if isinstance(value, list):
+                for element in value:
+                    collect(element)
+            elif isinstance(value, dict):
+                nested = [v for v in value.values() if isinstance(v, (list, dict))]
+                scalars = {k: v for k, v in value.items() if not isinstance(v, (list, dict))}
+                if scalars:
+                    records.append(scalars)
+                for v in nested:
+                    collect(v)
+
+        collect(data)
+        items = []
+        for record in records:
+            facts = []
+            for key, value in record.items():
+                if fields and key not in fields:
+                    continue
+                sentences = [s.strip() for s in SENTENCE_SPLIT.split(str(value)) if s.strip()]
+                facts.extend((key if i == 0 else "", s, 0) for i, s in enumerate(sentences))
+            if facts:
+                items.append(("", facts))
+        return items
+
+    def _apply_budget(self, blocks: List[List[Tuple[str, List[tuple]]]], max_tokens: int) -> None:
+        """Keep facts round-robin across items while the rendered context fits ``max_tokens``"""
+        items = [item for block in blocks for item in block]
+        keep = [0] * len(items)
+
+        def kept() -> List[List[Tuple[str, List[tuple]]]]:
+            position, trimmed = 0, []
+            for block in blocks:
+                counts = keep[position:position + len(block)]
+                trimmed.append([(heading, facts[:n]) for (heading, facts), n in zip(block, counts) if n])
+                position += len(block)
+            return trimmed
+
+        depth, full = 0, False
+        while not full and any(depth < len(facts) for _, facts in items):
+            for i, (_, facts) in enumerate(items):
+                if depth < len(facts):
+                    keep[i] = depth + 1
+                    if estimate_tokens(self._render_blocks(kept())) > max_tokens:
+                        keep[i] = depth
+                        full = True
+                        break
+            depth += 1
+        blocks[:] = kept()
+
+    def _render_blocks(self, blocks: List[List[Tuple[str, List[tuple]]]]) -> str:
+        return DIVIDER.join(text for text in (self._render(items) for items in blocks) if text)
+
+    def _render(self, items: List[Tuple[str, List[tuple]]]) -> str:
+        lines: List[str] = []
+        for heading, facts in items:
+            if heading:
+                lines.append(heading)
+            if any(label for label, _, _ in facts):
+                parts: List[str] = []
+                for label, sentence, _ in facts:
+                    if label:
+                        parts.append(f"{label}: {sentence}")
+                    elif parts:
+                        parts[-1] += f" {sentence}"
+                    else:
+                        parts.append(sentence)
+                lines.append("- " + " | ".join(parts))
+            else:
+                # Text keeps its line breaks; sentences split from one line rejoin it
+                previous = None
+                for _, sentence, line in facts:
+                    if line == previous:
+                        lines[-1] += f" {sentence}"
+                    else:
+                        lines.append(sentence)
+                    previous = line
+        return "\n".join(lines)
+
+
+class CompactingCrew(Crew):
+    """Crew that runs configured tasks' context through a ContextCompactor"""
+
+    compactor: Optional[Any] = Field(default=None, exclude=True, description="ContextCompactor applied to configured tasks")
+
+    def _get_context(self, task: Task, task_outputs: List[TaskOutput]) -> str:
+        if not task.context or self.compactor is None or not self.compactor.applies_to(task):
+            return super()._get_context(task, task_outputs)
+        if task.context is NOT_SPECIFIED:
+            outputs = task_outputs
+        else:
+            outputs = [context_task.output for context_task in task.context if context_task.output]
+        return self.compactor.compact(task, outputs)
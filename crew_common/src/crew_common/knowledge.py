@@ -0,0 +1,351 @@
+"""Persistent, content-addressed knowledge store for crews.
+
+crewAI's default knowledge storage chunks and embeds every source again each
+time a crew starts. Here embeddings are cached on disk keyed by the hash of
+the chunk text and the embedder, so a chunk is embedded once no matter how
+many crews or runs use it. Each crew's collection keeps a manifest of the
+files it was built from (size, mtime and content hash) together with its
+vectors and an IVF index, so a crew whose knowledge files are unchanged
+starts without reading them or calling the embedder at all.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+from crewai.knowledge.knowledge import Knowledge
+from crewai.knowledge.source.base_knowledge_source import BaseKnowledgeSource
+from crewai.knowledge.storage.knowledge_storage import KnowledgeStorage
+from pydantic import Field
+
+STORE_DIR = os.getenv("CREW_KNOWLEDGE_STORE", os.path.join(Path.home(), ".crew_knowledge"))
+DEFAULT_EMBEDDER = {"provider": "ollama", "config": {"model": "nomic-embed-text"}}
+KNOWLEDGE_SUFFIXES = (".txt", ".md")
+
+# Below this many chunks an exact scan is as fast as probing an index
+IVF_MIN_VECTORS = 1024
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedder_key(embedder: Dict[str, Any]) -> str:
+    """
+    Stable identity of an embedder config: provider, model and, for a custom
+    embedder, its ``name`` or class. API keys and object reprs (which carry a
+    memory address) are left out, so the key is the same on every start.
+    """
+    config = embedder.get("config") or {}
+    identity = {
+        "provider": embedder.get("provider"),
+        "model": config.get("model") or config.get("model_name") or config.get("deployment_id"),
+        "dimensions": config.get("dimensions"),
+    }
+    custom = config.get("embedder")
+    if custom is not None:
+        cls = custom if isinstance(custom, type) else type(custom)
+        identity["embedder"] = config.get("name") or f"{cls.__module__}.{cls.__qualname__}"
+    return json.dumps(identity, sort_keys=True)
+
+
+def _atomic_save(path: Path, write: Callable[[Any], None], mode: str = "wb") -> None:
+    """Write to a temporary file and move it into place so readers never see half a file"""
+    # A unique name per writer, so crews saving the same collection never share a temp file
+    with tempfile.NamedTemporaryFile(mode, dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+        write(f)
+    os.replace(f.name, path)
+
+
+class EmbeddingCache:
+    """SQLite map of (embedder, chunk hash) to vector, shared by every crew"""
+
+    def __init__(self, store_dir: str = STORE_DIR):
+        os.makedirs(store_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(store_dir, "embeddings.db"), timeout=30)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dim INTEGER, vector BLOB)"
+        )
+        self._db.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+            [(key, len(vec), np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in vectors.items()],
+        )
+        self._db.commit()
+
+
+class IVFIndex:
+    """
+    Inverted-file ANN index over unit vectors.
+
+    Vectors are clustered with a few rounds of k-means; a query scores only the
+    members of its ``nprobe`` closest clusters. Small collections skip the
+    clustering and are scanned exactly.
+    """
+
+    def __init__(self, vectors: np.ndarray, centroids: Optional[np.ndarray] = None,
+                 assignments: Optional[np.ndarray] = None):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.assignments = assignments
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, iterations: int = 10, seed: int = 0) -> "IVFIndex":
+        if len(vectors) < IVF_MIN_VECTORS:
+            return cls(vectors)
+
+        n_lists = int(np.sqrt(len(vectors)))
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = vectors[assignments == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+        assignments = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+        return cls(vectors, centroids.astype(np.float32), assignments)
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = 8) -> List[tuple]:
+        """Return up to k (row, cosine similarity) pairs, best first"""
+        if len(self.vectors) == 0:
+            return []
+        if self.centroids is None:
+            candidates = np.arange(len(self.vectors))
+        else:
+            nearest = np.argsort(self.centroids @ query)[::-1][:nprobe]
+            candidates = np.flatnonzero(np.isin(self.assignments, nearest))
+        scores = np.asarray(self.vectors[candidates] @ query)
+        top = np.argsort(scores)[::-1][:k]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+
+class LocalKnowledgeStorage(KnowledgeStorage):
+    """
+    Drop-in replacement for crewAI's Chroma-backed KnowledgeStorage.
+
+    Collections live under ``<store_dir>/collections/<name>/`` and are loaded
+    with memory-mapped arrays; embeddings come from the shared EmbeddingCache.
+    """
+
+    def __init__(self, embedder: Optional[Dict[str, Any]] = None,
+                 collection_name: Optional[str] = None, store_dir: str = STORE_DIR):
+        embedder = embedder or DEFAULT_EMBEDDER
+        super().__init__(embedder=embedder, collection_name=collection_name)
+        self.embedder_key = embedder_key(embedder)
+        self.store_dir = Path(store_dir)
+        self.collection_dir = self.store_dir / "collections" / (collection_name or "knowledge")
+        self.manifest: Dict[str, Any] = {"files": {}, "ids": [], "texts": [], "metadata": []}
+        self.index: Optional[IVFIndex] = None
+        self._cache: Optional[EmbeddingCache] = None
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        if self._cache is None:
+            self._cache = EmbeddingCache(str(self.store_dir))
+        return self._cache
+
+    def initialize_knowledge_storage(self):
+        manifest_path = self.collection_dir / "manifest.json"
+        if not manifest_path.exists():
+            return
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("embedder") != self.embedder_key:
+            # Vectors from another embedder are not comparable; rebuild on the next sync
+            return
+        self.manifest = manifest
+        vectors = np.load(self.collection_dir / "vectors.npy", mmap_mode="r")
+        centroids_path = self.collection_dir / "centroids.npy"
+        if centroids_path.exists():
+            self.index = IVFIndex(
+                vectors,
+                np.load(centroids_path),
+                np.load(self.collection_dir / "assignments.npy"),
+            )
+        else:
+            self.index = IVFIndex(vectors)
+
+    def search(self, query: List[str], limit: int = 3, filter: Optional[dict] = None,
+               score_threshold: float = 0.35) -> List[Dict[str, Any]]:
+        if self.index is None:
+            return []
+        results = []
+        for query_vector in self._embed(query):
+            for row, score in self.index.search(query_vector, limit):
+                metadata = self.manifest["metadata"][row]
+                if score < score_threshold:
+                    continue
+                if filter and any(metadata.get(k) != v for k, v in filter.items()):
+                    continue
+                results.append({
+                    "id": self.manifest["ids"][row],
+                    "metadata": metadata,
+                    "context": self.manifest["texts"][row],
+                    "score": score,
+                })
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[:limit]
+
+    def save(self, documents: List[str],
+             metadata: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None):
+        """Add documents to the collection, embedding only chunks never seen before"""
+        if isinstance(metadata, list):
+            metadatas = metadata
+        else:
+            metadatas = [metadata or {} for _ in documents]
+        entries = dict(zip(self.manifest["ids"], zip(self.manifest["texts"], self.manifest["metadata"])))
+        for doc, meta in zip(documents, metadatas):
+            entries[_sha256(doc)] = (doc, meta or {})
+        self._rebuild(entries)
+
+    def sync_files(self, paths: List[Path], chunker: Callable[[str], List[str]]) -> None:
+        """
+        Bring the collection in line with ``paths``.
+
+        Files whose size and mtime match the manifest are not even opened; files
+        whose content hash matches keep their chunks; only changed files are
+        re-chunked, and only their new chunks reach the embedder.
+        """
+        known = self.manifest["files"]
+        rows = {chunk_id: row for row, chunk_id in enumerate(self.manifest["ids"])}
+        files: Dict[str, Any] = {}
+        entries: Dict[str, tuple] = {}
+        changed = set(known) != {str(p) for p in paths}
+
+        for path in paths:
+            key = str(path)
+            stat = path.stat()
+            record = known.get(key)
+            if record and record["size"] == stat.st_size and record["mtime"] == stat.st_mtime:
+                files[key] = record
+            else:
+                text = path.read_text(encoding="utf-8")
+                digest = _sha256(text)
+                if record and record["sha256"] == digest:
+                    files[key] = dict(record, size=stat.st_size, mtime=stat.st_mtime)
+                else:
+                    chunks = chunker(text)
+                    files[key] = {
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime,
+                        "sha256": digest,
+                        "chunks": [_sha256(chunk) for chunk in chunks],
+                    }
+                    for chunk in chunks:
+                        entries[_sha256(chunk)] = (chunk, {"source": key})
+                    changed = True
+            for chunk_id in files[key]["chunks"]:
+                if chunk_id not in entries and chunk_id in rows:
+                    row = rows[chunk_id]
+                    entries[chunk_id] = (self.manifest["texts"][row], self.manifest["metadata"][row])
+
+        self.manifest["files"] = files
+        if changed or self.index is None:
+            self._rebuild(entries)
+        else:
+            self._write_manifest()
+
+    def reset(self):
+        for name in ("manifest.json", "vectors.npy", "centroids.npy", "assignments.npy"):
+            (self.collection_dir / name).unlink(missing_ok=True)
+        self.manifest = {"files": {}, "ids": [], "texts": [], "metadata": []}
+        self.index = None
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts through the shared cache, calling the embedder only for misses"""
+        keys = [_sha256(self.embedder_key + "\0" + text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = [(key, text) for key, text in zip(keys, texts) if key not in cached]
+        if missing:
+            fresh = self.embedder([text for _, text in missing])
+            new = {key: np.asarray(vec, dtype=np.float32) for (key, _), vec in zip(missing, fresh)}
+            self.cache.put_many(new)
+            cached.update(new)
+        vectors = np.stack([cached[key] for key in keys]) if keys else np.zeros((0, 0), np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _rebuild(self, entries: Dict[str, tuple]) -> None:
+        ids = list(entries)
+        texts = [entries[i][0] for i in ids]
+        vectors = self._embed(texts).astype(np.float32)
+        self.index = IVFIndex.build(vectors)
+        self.manifest.update(ids=ids, texts=texts, metadata=[entries[i][1] for i in ids])
+
+        self.collection_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_save(self.collection_dir / "vectors.npy", lambda f: np.save(f, vectors))
+        for name in ("centroids", "assignments"):
+            path = self.collection_dir / f"{name}.npy"
+            array = getattr(self.index, name)
+            if array is None:
+                path.unlink(missing_ok=True)
+            else:
+                _atomic_save(path, lambda f, a=array: np.save(f, a))
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        self.manifest["embedder"] = self.embedder_key
+        self.collection_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_save(
+            self.collection_dir / "manifest.json",
+            lambda f: json.dump(self.manifest, f),
+            mode="w",
+        )
+
+
+class KnowledgeFolderSource(BaseKnowledgeSource):
+    """Every text/markdown file in a crew's knowledge folder, synced incrementally"""
+
+    folder: Path = Field(default=Path("knowledge"))
+
+    def validate_content(self) -> List[Path]:
+        if not self.folder.is_dir():
+            return []
+        return sorted(p for p in self.folder.rglob("*") if p.suffix in KNOWLEDGE_SUFFIXES and p.is_file())
+
+    def add(self) -> None:
+        if not isinstance(self.storage, LocalKnowledgeStorage):
+            raise ValueError("KnowledgeFolderSource needs a LocalKnowledgeStorage")
+        self.storage.sync_files(self.validate_content(), self._chunk_text)
+
+
+def crew_knowledge(collection_name: str, folder: str = "knowledge",
+                   embedder: Optional[Dict[str, Any]] = None) -> Optional[Knowledge]:
+    """
+    Knowledge for a crew's ``knowledge/`` folder backed by the shared local store.
+
+    Pass the result as ``Crew(knowledge=...)``.
+    """
+    try:
+        storage = LocalKnowledgeStorage(embedder=embedder, collection_name=collection_name)
+        knowledge = Knowledge(
+            collection_name=collection_name,
+            sources=[KnowledgeFolderSource(folder=Path(folder))],
+            embedder=embedder or DEFAULT_EMBEDDER,
+            storage=storage,
+        )
+        knowledge.add_sources()
+        return knowledge
+    except Exception as e:
+        # Same policy as crewAI's own knowledge setup: warn and run without it
+        print(f"Failed to init knowledge for {collection_name}: {e}")
+        return None
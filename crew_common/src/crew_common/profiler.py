@@ -0,0 +1,255 @@
+"""Timeline profiler for crew runs.
+
+``CrewProfiler`` listens on crewAI's event bus and records a span for the
+crew, each task, each agent execution, each agent iteration (one LLM turn
+plus the tool calls it triggers), each tool call and each LLM call. Token
+counts for LLM calls are estimated from the prompt and response text.
+
+A run is saved as Chrome trace JSON (open it in ``chrome://tracing``,
+Perfetto or speedscope for a flamegraph). Saved traces can be summarised
+later without re-running anything::
+
+    python -m crew_common.profiler output/trace.json
+"""
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai.utilities.events.agent_events import (
+    AgentExecutionCompletedEvent,
+    AgentExecutionErrorEvent,
+    AgentExecutionStartedEvent,
+)
+from crewai.utilities.events.base_event_listener import BaseEventListener
+from crewai.utilities.events.crew_events import (
+    CrewKickoffCompletedEvent,
+    CrewKickoffFailedEvent,
+    CrewKickoffStartedEvent,
+)
+from crewai.utilities.events.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+)
+from crewai.utilities.events.task_events import (
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+)
+from crewai.utilities.events.tool_usage_events import (
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+
+from crew_common.context import estimate_tokens
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float
+    end: Optional[float] = None
+    thread: int = 0
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+
+def _task_name(task: Any) -> str:
+    if task is None:
+        return "task"
+    return getattr(task, "name", None) or (getattr(task, "description", "") or "task")[:40]
+
+
+def _message_text(messages: Any) -> str:
+    if isinstance(messages, str):
+        return messages
+    if isinstance(messages, list):
+        return "\n".join(str(m.get("content", "")) if isinstance(m, dict) else str(m) for m in messages)
+    return ""
+
+
+class CrewProfiler(BaseEventListener):
+    """Records crew, task, agent, iteration, tool and LLM spans from crewAI events"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._open: Dict[Tuple, List[Span]] = defaultdict(list)
+        self._iterations: Dict[Tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        super().__init__()
+
+    def _begin(self, key: Tuple, name: str, category: str, **args) -> Span:
+        span = Span(name, category, time.perf_counter() - self._origin, thread=threading.get_ident(), args=args)
+        with self._lock:
+            self.spans.append(span)
+            self._open[key].append(span)
+        return span
+
+    def _end(self, key: Tuple, **args) -> Optional[Span]:
+        with self._lock:
+            stack = self._open.get(key)
+            if not stack:
+                return None
+            span = stack.pop()
+        span.end = time.perf_counter() - self._origin
+        span.args.update(args)
+        return span
+
+    def _next_iteration(self, agent: str) -> None:
+        """An agent's LLM call starts a new iteration and closes the previous one"""
+        self._end(("iteration", agent))
+        self._iterations[agent] += 1
+        self._begin(("iteration", agent), f"{agent} #{self._iterations[agent]}", "iteration")
+
+    def setup_listeners(self, bus):
+        @bus.on(CrewKickoffStartedEvent)
+        def on_crew_started(source, event):
+            self._begin(("crew",), event.crew_name or "crew", "crew")
+
+        @bus.on(CrewKickoffCompletedEvent)
+        def on_crew_completed(source, event):
+            self._end(("crew",))
+
+        @bus.on(CrewKickoffFailedEvent)
+        def on_crew_failed(source, event):
+            self._end(("crew",), error=event.error)
+
+        @bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            self._begin(("task", id(event.task)), _task_name(event.task), "task")
+
+        @bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            self._end(("task", id(event.task)))
+
+        @bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            self._end(("task", id(event.task)), error=event.error)
+
+        @bus.on(AgentExecutionStartedEvent)
+        def on_agent_started(source, event):
+            self._begin(("agent", event.agent.role), event.agent.role, "agent", task=_task_name(event.task))
+
+        @bus.on(AgentExecutionCompletedEvent)
+        def on_agent_completed(source, event):
+            self._end(("iteration", event.agent.role))
+            self._end(("agent", event.agent.role))
+
+        @bus.on(AgentExecutionErrorEvent)
+        def on_agent_error(source, event):
+            self._end(("iteration", event.agent.role))
+            self._end(("agent", event.agent.role), error=event.error)
+
+        @bus.on(ToolUsageStartedEvent)
+        def on_tool_started(source, event):
+            self._begin(("tool", event.agent_role, event.tool_name), event.tool_name, "tool",
+                        agent=event.agent_role, args=str(event.tool_args)[:200])
+
+        @bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            self._end(("tool", event.agent_role, event.tool_name))
+
+        @bus.on(ToolUsageErrorEvent)
+        def on_tool_error(source, event):
+            self._end(("tool", event.agent_role, event.tool_name), error=str(event.error))
+
+        @bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            agent = event.agent_role or "llm"
+            if event.agent_role:
+                self._next_iteration(agent)
+            self._begin(("llm", agent), event.model or "llm", "llm", agent=event.agent_role,
+                        prompt_tokens=estimate_tokens(_message_text(event.messages)))
+
+        @bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            self._end(("llm", event.agent_role or "llm"),
+                      completion_tokens=estimate_tokens(str(event.response or "")))
+
+        @bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            self._end(("llm", event.agent_role or "llm"), error=event.error)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        threads = {thread: i + 1 for i, thread in enumerate(dict.fromkeys(s.thread for s in self.spans))}
+        events = []
+        for span in self.spans:
+            if span.end is None:
+                continue
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round(span.start * 1e6),
+                "dur": round(span.duration * 1e6),
+                "pid": 1,
+                "tid": threads[span.thread],
+                "args": span.args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, indent=1, default=str)
+
+    @classmethod
+    def load(cls, path: str) -> "CrewProfiler":
+        """Rebuild a profiler from a saved Chrome trace, without subscribing to events"""
+        profiler = cls.__new__(cls)
+        profiler.spans = []
+        with open(path, encoding="utf-8") as f:
+            trace = json.load(f)
+        for event in trace.get("traceEvents", []):
+            start = event["ts"] / 1e6
+            profiler.spans.append(Span(
+                event["name"], event.get("cat", ""), start, start + event.get("dur", 0) / 1e6,
+                thread=event.get("tid", 0), args=event.get("args", {}),
+            ))
+        return profiler
+
+    def summary(self) -> str:
+        """Table of count, total/mean/max seconds and estimated tokens per category and name"""
+        rows: Dict[Tuple[str, str], Dict[str, float]] = {}
+        for span in self.spans:
+            if span.end is None:
+                continue
+            name = span.name if span.category != "iteration" else span.name.rsplit(" #", 1)[0]
+            row = rows.setdefault((span.category, name), {
+                "count": 0, "total": 0.0, "max": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "errors": 0,
+            })
+            row["count"] += 1
+            row["total"] += span.duration
+            row["max"] = max(row["max"], span.duration)
+            row["prompt_tokens"] += span.args.get("prompt_tokens", 0)
+            row["completion_tokens"] += span.args.get("completion_tokens", 0)
+            row["errors"] += 1 if "error" in span.args else 0
+
+        order = ["crew", "task", "agent", "iteration", "tool", "llm"]
+        header = f"{'category':<10} {'name':<40} {'count':>5} {'total s':>9} {'mean s':>8} {'max s':>8} {'~tok in':>8} {'~tok out':>8} {'err':>4}"
+        lines = [header, "-" * len(header)]
+        for (category, name), row in sorted(
+            rows.items(), key=lambda item: (order.index(item[0][0]) if item[0][0] in order else 99, -item[1]["total"])
+        ):
+            lines.append(
+                f"{category:<10} {name[:40]:<40} {row['count']:>5} {row['total']:>9.2f} "
+                f"{row['total'] / row['count']:>8.2f} {row['max']:>8.2f} "
+                f"{row['prompt_tokens']:>8} {row['completion_tokens']:>8} {row['errors']:>4}"
+            )
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m crew_common.profiler <trace.json>")
+        sys.exit(1)
+    print(CrewProfiler.load(sys.argv[1]).summary())
@@ -0,0 +1,288 @@
+"""Per-agent and per-task model routing by latency and cost budgets.
+
+A crew's ``config/routing.yaml`` lists model tiers, smallest first, each with
+its expected p95 latency per LLM call and its price. It also gives budgets
+for agents and tasks. Each budgeted agent or task gets the largest tier that
+fits its budget, so a quick extraction step can run on a small model while
+deliberation keeps a large one. Agent budgets apply for the whole run. A
+task budget applies to the task's agent while that task runs, then the
+agent goes back to its own model.
+
+Once a model has ``MIN_SAMPLES`` measured calls, routing uses the measured
+p95 in place of the declared latency. Measurements persist across runs in
+``output/routing_stats.json``. Each router reacts only to its own crew's
+events, and adds its new samples to whatever is on disk when it saves, so
+concurrent crews sharing the file do not overwrite each other.
+
+If a task's ``output_pydantic`` fails validation, the task is retried once
+per remaining tier, each time with the next larger model for its worker
+agent. In hierarchical crews the manager is escalated only once the worker
+is on the largest tier. This is the only time a task goes above its budget.
+When no larger tier is left, the unvalidated output is kept, exactly as
+crewAI would without routing.
+
+``router.summary()`` reports LLM call count, p50 and p95 latency, the
+models used and the escalations for each agent.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from crewai import LLM, Crew, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events.base_event_listener import BaseEventListener
+from crewai.utilities.events.crew_events import CrewKickoffCompletedEvent, CrewKickoffFailedEvent
+from crewai.utilities.events.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+from crewai.utilities.events.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+from pydantic import BaseModel, Field
+
+STATS_PATH = "output/routing_stats.json"
+MIN_SAMPLES = 20
+MAX_SAMPLES = 200
+# Routers in one process save to the same file
+_SAVE_LOCK = threading.Lock()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class ModelTier(BaseModel):
+    """One model the router can choose"""
+    model: str = Field(description="crewAI / LiteLLM model name")
+    latency_s: float = Field(description="Expected p95 seconds per LLM call, until measured")
+    cost_per_mtok: float = Field(default=0.0, description="USD per million tokens")
+
+
+class Budget(BaseModel):
+    """Per-call limits for an agent or task"""
+    max_latency_s: Optional[float] = Field(default=None, description="p95 seconds per LLM call")
+    max_cost_per_mtok: Optional[float] = Field(default=None, description="USD per million tokens")
+
+
+class ModelRouter(BaseEventListener):
+    """Routes agents to model tiers by budget and escalates on output_pydantic validation failures"""
+
+    def __init__(self, tiers: Optional[Dict[str, ModelTier]] = None, budgets: Optional[Dict[str, Budget]] = None,
+                 stats_path: str = STATS_PATH):
+        self.tiers = list((tiers or {}).values())
+        self.budgets = budgets or {}
+        self.stats_path = Path(stats_path)
+        self._llms: Dict[str, LLM] = {}
+        self._defaults: Dict[int, Any] = {}
+        self._workers: Dict[int, Any] = {}
+        self._escalated: Dict[int, ModelTier] = {}
+        self._crew: Optional[Crew] = None
+        self._agents: List[Any] = []
+        self._agent_ids: set = set()
+        self._started: Dict[Tuple, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._unsaved: Dict[str, List[float]] = defaultdict(list)
+        self.calls: Dict[str, List[float]] = defaultdict(list)
+        self.models: Dict[str, set] = defaultdict(set)
+        self.escalations: Dict[str, int] = defaultdict(int)
+        if self.stats_path.exists():
+            self.samples.update(json.loads(self.stats_path.read_text(encoding="utf-8")))
+        super().__init__()
+
+    @classmethod
+    def from_yaml(cls, path, stats_path: str = STATS_PATH) -> "ModelRouter":
+        path = Path(path)
+        if not path.exists():
+            return cls(stats_path=stats_path)
+        config = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        return cls(
+            {name: ModelTier(**tier) for name, tier in (config.get("tiers") or {}).items()},
+            {name: Budget(**(budget or {})) for name, budget in (config.get("budgets") or {}).items()},
+            stats_path,
+        )
+
+    def latency(self, tier: ModelTier) -> float:
+        """Measured p95 once there are enough samples, otherwise the declared latency"""
+        samples = self.samples.get(tier.model, [])
+        return percentile(samples, 0.95) if len(samples) >= MIN_SAMPLES else tier.latency_s
+
+    def tier_for(self, budget: Budget) -> ModelTier:
+        """Largest tier within ``budget``; the smallest tier when none fits"""
+        fitting = [
+            tier for tier in self.tiers
+            if (budget.max_latency_s is None or self.latency(tier) <= budget.max_latency_s)
+            and (budget.max_cost_per_mtok is None or tier.cost_per_mtok <= budget.max_cost_per_mtok)
+        ]
+        return fitting[-1] if fitting else self.tiers[0]
+
+    def llm(self, tier: ModelTier) -> LLM:
+        if tier.model not in self._llms:
+            self._llms[tier.model] = LLM(model=tier.model)
+        return self._llms[tier.model]
+
+    def next_tier(self, model: str) -> Optional[ModelTier]:
+        """Tier after the one serving ``model``; the largest tier for models outside the tiers"""
+        names = [tier.model for tier in self.tiers]
+        if model not in names:
+            return self.tiers[-1] if self.tiers and self.tiers[-1].model != model else None
+        index = names.index(model)
+        return self.tiers[index + 1] if index + 1 < len(self.tiers) else None
+
+    def apply(self, crew: Crew, agents_config: Optional[Dict[str, Dict]] = None) -> Crew:
+        """
+        Route ``crew``'s agents and install escalation on its structured tasks.
+        Agent budgets are keyed by their name in ``agents_config``, matched on
+        the role text, so call this before kickoff interpolates the roles.
+        """
+        if not self.tiers:
+            return crew
+        names = {" ".join(str(config.get("role", "")).split()): name for name, config in (agents_config or {}).items()}
+        agents = list(crew.agents) + ([crew.manager_agent] if crew.manager_agent else [])
+        for agent in agents:
+            name = names.get(" ".join(agent.role.split()))
+            if name in self.budgets:
+                agent.llm = self.llm(self.tier_for(self.budgets[name]))
+            self._defaults[id(agent)] = agent.llm
+        self._crew = crew
+        self._agents = agents
+        self._agent_ids = {str(agent.id) for agent in agents}
+        for task in crew.tasks:
+            # Hierarchical crews replace task.agent with the manager, so remember the worker
+            self._workers[id(task)] = task.agent
+            if task.output_pydantic:
+                self._install_escalation(task)
+        return crew
+
+    def _install_escalation(self, task: Task) -> None:
+        previous = task._guardrail
+
+        def escalate_on_invalid(output: TaskOutput) -> Tuple[bool, Any]:
+            if output.pydantic is None:
+                # task.agent is the manager in hierarchical crews; the worker wrote the output
+                worker = self._workers.get(id(task)) or task.agent
+                for agent in [worker] if task.agent is worker else [worker, task.agent]:
+                    tier = self.next_tier(getattr(agent.llm, "model", str(agent.llm)))
+                    if tier is None:
+                        continue
+                    agent.llm = self.llm(tier)
+                    with self._lock:
+                        self.escalations[agent.role] += 1
+                        if agent is worker:
+                            # The retry emits TaskStartedEvent again, which must not undo this
+                            self._escalated[id(task)] = tier
+                    return False, (
+                        f"The output is not valid {task.output_pydantic.__name__} JSON; "
+                        f"retrying with {tier.model}. Return only JSON matching the schema."
+                    )
+            return previous(output) if previous else (True, output)
+
+        task.guardrail = escalate_on_invalid
+        task._guardrail = escalate_on_invalid
+        task.max_retries = max(task.max_retries, len(self.tiers))
+
+    def _restore(self, task: Task) -> None:
+        self._escalated.pop(id(task), None)
+        for agent in (task.agent, self._workers.get(id(task))):
+            if agent is not None and id(agent) in self._defaults:
+                agent.llm = self._defaults[id(agent)]
+
+    def _ours(self, event) -> bool:
+        if event.agent_id:
+            return str(event.agent_id) in self._agent_ids
+        return any(agent.role == event.agent_role for agent in self._agents)
+
+    def setup_listeners(self, bus):
+        @bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            task = event.task
+            if task is None or id(task) not in self._workers:
+                return
+            budget = self.budgets.get(task.name or "")
+            worker = self._workers[id(task)]
+            tier = self._escalated.get(id(task)) or (self.tier_for(budget) if budget is not None else None)
+            if tier is not None and worker is not None:
+                worker.llm = self.llm(tier)
+
+        @bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            if event.task is not None and id(event.task) in self._workers:
+                self._restore(event.task)
+
+        @bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            if event.task is not None and id(event.task) in self._workers:
+                self._restore(event.task)
+
+        @bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            if self._ours(event):
+                self._started[(event.agent_role, threading.get_ident())] = (time.perf_counter(), event.model or "")
+
+        @bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            self._record(event.agent_role)
+
+        @bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            self._started.pop((event.agent_role, threading.get_ident()), None)
+
+        @bus.on(CrewKickoffCompletedEvent)
+        def on_crew_completed(source, event):
+            if self._crew is not None and source is self._crew:
+                self.save()
+
+        @bus.on(CrewKickoffFailedEvent)
+        def on_crew_failed(source, event):
+            if self._crew is not None and source is self._crew:
+                self.save()
+
+    def _record(self, role: Optional[str]) -> None:
+        started = self._started.pop((role, threading.get_ident()), None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started[0]
+        model = started[1]
+        with self._lock:
+            self.calls[role].append(elapsed)
+            self.models[role].add(model)
+            for samples in (self.samples[model], self._unsaved[model]):
+                samples.append(elapsed)
+                del samples[:-MAX_SAMPLES]
+
+    def save(self) -> None:
+        """Add this router's new samples to the stats file, keeping other crews' samples"""
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        with _SAVE_LOCK:
+            on_disk = {}
+            if self.stats_path.exists():
+                on_disk = json.loads(self.stats_path.read_text(encoding="utf-8"))
+            with self._lock:
+                for model, samples in self._unsaved.items():
+                    on_disk[model] = (on_disk.get(model, []) + samples)[-MAX_SAMPLES:]
+                self._unsaved.clear()
+                self.samples.update(on_disk)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.stats_path.parent,
+                                             prefix=self.stats_path.name, suffix=".tmp", delete=False) as f:
+                json.dump(on_disk, f, indent=1)
+            os.replace(f.name, self.stats_path)
+
+    def summary(self) -> str:
+        """LLM calls, p50/p95 latency, models and escalations per agent"""
+        header = f"{'agent':<40} {'calls':>5} {'p50 s':>7} {'p95 s':>7} {'esc':>4}  models"
+        lines = [header, "-" * len(header)]
+        with self._lock:
+            roles = set(self.calls) | set(self.escalations)
+            for role in sorted(roles, key=lambda role: -percentile(self.calls.get(role, []), 0.95)):
+                values = self.calls.get(role, [])
+                lines.append(
+                    f"{' '.join(role.split())[:40]:<40} {len(values):>5} {percentile(values, 0.5):>7.2f} "
+                    f"{percentile(values, 0.95):>7.2f} {self.escalations.get(role, 0):>4}  "
+                    f"{', '.join(sorted(self.models.get(role, ())))}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+from crewai.tasks.task_output import TaskOutput
+
+from crew_common.context import DIVIDER, CompactionRule, ContextCompactor, estimate_tokens
+
+REPORT = """# Apple
+Revenue grew 8% in the quarter. Services hit a record.
+Margins held at 46%.
+# Microsoft
+Azure grew 31%. Copilot seats doubled.
+Revenue grew 8% in the quarter."""
+
+COMPANIES = {"companies": [
+    {"name": "Apple", "ticker": "AAPL", "reason": "Strong services growth. Buybacks continue. New devices ship soon."},
+    {"name": "Microsoft", "ticker": "MSFT", "reason": "Azure keeps gaining share. Copilot is selling. Margins widen."},
+    {"name": "Nvidia", "ticker": "NVDA", "reason": "Data center demand is sold out. New chips ramp this year."},
+]}
+
+
+def text(raw):
+    return TaskOutput(description="research", raw=raw, agent="researcher")
+
+
+def structured(data):
+    return TaskOutput(description="find", raw=str(data), json_dict=data, agent="finder")
+
+
+def compact(outputs, **rule):
+    compactor = ContextCompactor({"pick": CompactionRule(**rule)})
+    return compactor.compact(SimpleNamespace(name="pick"), outputs), compactor
+
+
+def test_text_keeps_sections_and_line_breaks():
+    compacted, _ = compact([text(REPORT)], dedupe=False)
+    assert compacted == REPORT
+
+
+def test_repeated_facts_are_dropped():
+    compacted, _ = compact([text(REPORT)])
+    assert compacted.count("Revenue grew 8% in the quarter.") == 1
+    assert compacted.endswith("Azure grew 31%. Copilot seats doubled.")
+
+
+def test_structured_output_renders_labelled_fields():
+    compacted, _ = compact([structured(COMPANIES)], fields=["name", "reason"])
+    lines = compacted.splitlines()
+    assert lines[0] == "- name: Apple | reason: Strong services growth. Buybacks continue. New devices ship soon."
+    assert len(lines) == 3
+    assert "AAPL" not in compacted
+
+
+@pytest.mark.parametrize("max_tokens", [10, 30, 45, 60, 100])
+def test_budget_is_measured_on_the_rendered_context(max_tokens):
+    outputs = [structured(COMPANIES), text(REPORT)]
+    compacted, compactor = compact(outputs, max_tokens=max_tokens)
+    assert estimate_tokens(compacted) <= max_tokens
+    assert compactor.stats[-1]["compacted_tokens"] <= max_tokens
+
+
+def test_budget_keeps_leading_facts_of_every_item():
+    compacted, _ = compact([structured(COMPANIES)], fields=["name", "reason"], max_tokens=30)
+    assert [line.split(" | ")[0] for line in compacted.splitlines()] == [
+        "- name: Apple", "- name: Microsoft", "- name: Nvidia",
+    ]
+    assert "Buybacks" not in compacted
+
+
+def test_budget_drops_sections_left_without_facts():
+    compacted, _ = compact([text(REPORT)], max_tokens=12)
+    assert compacted.splitlines() == ["# Apple", "Revenue grew 8% in the quarter."]
+    assert "# Microsoft" not in compacted
+
+
+def test_outputs_are_joined_like_crewai():
+    compacted, _ = compact([text("# A\nOne."), text("# B\nTwo.")])
+    assert compacted == f"# A\nOne.{DIVIDER}# B\nTwo."
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+from crew_common.knowledge import IVF_MIN_VECTORS, EmbeddingCache, IVFIndex, LocalKnowledgeStorage, embedder_key
+
+
+class CountingEmbedder(EmbeddingFunction):
+    """Deterministic bag-of-letters vectors; records every text it is asked to embed"""
+
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, input: Documents) -> Embeddings:
+        self.embedded.extend(input)
+        vectors = []
+        for text in input:
+            vector = np.zeros(26, dtype=np.float32)
+            for char in text.lower():
+                if "a" <= char <= "z":
+                    vector[ord(char) - ord("a")] += 1
+            vector[0] += 0.01
+            vectors.append(vector)
+        return vectors
+
+
+def unit(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def chunker(text):
+    return [line for line in text.splitlines() if line.strip()]
+
+
+def test_embedding_cache_round_trips_vectors(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many({"a": np.array([1.0, 2.0], np.float32), "b": np.array([3.0, 4.0, 5.0], np.float32)})
+
+    found = EmbeddingCache(str(tmp_path)).get_many(["a", "b", "missing"])
+    assert sorted(found) == ["a", "b"]
+    assert found["b"].tolist() == [3.0, 4.0, 5.0]
+
+
+def test_embedding_cache_batches_large_lookups(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many({f"k{i}": np.array([i], np.float32) for i in range(1200)})
+    assert len(cache.get_many([f"k{i}" for i in range(1300)])) == 1200
+
+
+def test_small_index_is_an_exact_scan():
+    vectors = unit(np.eye(4) + 0.1)
+    index = IVFIndex.build(vectors)
+    assert index.centroids is None
+    (row, score), = index.search(vectors[2], 1)
+    assert row == 2 and score == pytest.approx(1.0)
+    assert len(index.search(vectors[2], 10)) == 4
+
+
+def test_ivf_index_finds_the_nearest_vectors():
+    rng = np.random.default_rng(1)
+    vectors = unit(rng.normal(size=(IVF_MIN_VECTORS + 500, 16)))
+    index = IVFIndex.build(vectors)
+    assert index.centroids is not None and len(index.assignments) == len(vectors)
+
+    queries = vectors[rng.choice(len(vectors), 50, replace=False)]
+    hits = 0
+    for query in queries:
+        exact = set(np.argsort(vectors @ query)[::-1][:5].tolist())
+        hits += len(exact & {row for row, _ in index.search(query, 5)})
+    assert hits / (5 * len(queries)) > 0.8
+
+
+def test_empty_index_returns_nothing():
+    assert IVFIndex(np.zeros((0, 4), np.float32)).search(np.ones(4), 3) == []
+
+
+def storage(tmp_path, embedder):
+    return LocalKnowledgeStorage({"provider": "custom", "config": {"embedder": embedder}},
+                                 collection_name="crew", store_dir=str(tmp_path / "store"))
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "knowledge"
+    folder.mkdir()
+    (folder / "companies.md").write_text("apple makes phones\nnvidia makes chips\n", encoding="utf-8")
+    (folder / "notes.txt").write_text("buy low sell high\n", encoding="utf-8")
+    return folder
+
+
+def test_reload_does_not_re_embed(tmp_path, folder):
+    paths = sorted(folder.iterdir())
+    first = CountingEmbedder()
+    built = storage(tmp_path, first)
+    built.initialize_knowledge_storage()
+    built.sync_files(paths, chunker)
+    assert sorted(first.embedded) == ["apple makes phones", "buy low sell high", "nvidia makes chips"]
+
+    # A new process with a new embedder object of the same kind reuses the stored collection
+    second = CountingEmbedder()
+    reloaded = storage(tmp_path, second)
+    reloaded.initialize_knowledge_storage()
+    reloaded.sync_files(paths, chunker)
+    assert second.embedded == []
+    assert reloaded.search(["who makes chips"], limit=1)[0]["context"] == "nvidia makes chips"
+    assert second.embedded == ["who makes chips"]
+
+
+def test_changed_file_embeds_only_new_chunks(tmp_path, folder):
+    built = storage(tmp_path, CountingEmbedder())
+    built.sync_files(sorted(folder.iterdir()), chunker)
+
+    (folder / "notes.txt").write_text("buy low sell high\nhold for the long term\n", encoding="utf-8")
+    embedder = CountingEmbedder()
+    reloaded = storage(tmp_path, embedder)
+    reloaded.initialize_knowledge_storage()
+    reloaded.sync_files(sorted(folder.iterdir()), chunker)
+    assert embedder.embedded == ["hold for the long term"]
+    assert len(reloaded.manifest["ids"]) == 4
+
+
+def test_embedder_key_is_stable_across_instances():
+    assert embedder_key({"provider": "custom", "config": {"embedder": CountingEmbedder()}}) == \
+        embedder_key({"provider": "custom", "config": {"embedder": CountingEmbedder()}})
+    assert embedder_key({"provider": "openai", "config": {"model": "text-embedding-3-small", "api_key": "a"}}) == \
+        embedder_key({"provider": "openai", "config": {"model": "text-embedding-3-small", "api_key": "b"}})
+    assert embedder_key({"provider": "ollama", "config": {"model": "nomic-embed-text"}}) != \
+        embedder_key({"provider": "ollama", "config": {"model": "mxbai-embed-large"}})
+    assert embedder_key({"provider": "custom", "config": {"embedder": CountingEmbedder(), "name": "letters-v2"}}) != \
+        embedder_key({"provider": "custom", "config": {"embedder": CountingEmbedder()}})
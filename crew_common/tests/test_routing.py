@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+
+import pytest
+from crewai import LLM, Agent, Crew, Process, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.crew_events import CrewKickoffCompletedEvent
+from crewai.utilities.events.task_events import TaskStartedEvent
+from pydantic import BaseModel
+
+from crew_common.routing import MIN_SAMPLES, Budget, ModelRouter, ModelTier
+
+TIERS = {
+    "small": ModelTier(model="openai/gpt-4o-mini", latency_s=1.0, cost_per_mtok=0.15),
+    "medium": ModelTier(model="openai/gpt-4.1", latency_s=3.0, cost_per_mtok=2.0),
+    "large": ModelTier(model="openai/o3", latency_s=8.0, cost_per_mtok=10.0),
+}
+
+
+class Pick(BaseModel):
+    symbol: str
+
+
+@pytest.fixture
+def bus():
+    with crewai_event_bus.scoped_handlers():
+        yield crewai_event_bus
+
+
+@pytest.fixture
+def stats_path(tmp_path):
+    return str(tmp_path / "routing_stats.json")
+
+
+def test_largest_tier_within_the_budget(bus, stats_path):
+    router = ModelRouter(TIERS, stats_path=stats_path)
+    assert router.tier_for(Budget()).model == "openai/o3"
+    assert router.tier_for(Budget(max_latency_s=4.0)).model == "openai/gpt-4.1"
+    assert router.tier_for(Budget(max_cost_per_mtok=1.0)).model == "openai/gpt-4o-mini"
+    assert router.tier_for(Budget(max_latency_s=10.0, max_cost_per_mtok=5.0)).model == "openai/gpt-4.1"
+    # Nothing fits, so the smallest tier
+    assert router.tier_for(Budget(max_latency_s=0.5)).model == "openai/gpt-4o-mini"
+
+
+def test_measured_latency_replaces_the_declared_one(bus, stats_path):
+    router = ModelRouter(TIERS, stats_path=stats_path)
+    router.samples["openai/gpt-4.1"] = [5.0] * (MIN_SAMPLES - 1)
+    assert router.tier_for(Budget(max_latency_s=4.0)).model == "openai/gpt-4.1"
+    router.samples["openai/gpt-4.1"].append(5.0)
+    assert router.tier_for(Budget(max_latency_s=4.0)).model == "openai/gpt-4o-mini"
+
+
+def agent(role, model):
+    return Agent(role=role, goal="Pick a stock", backstory="An analyst", llm=LLM(model=model))
+
+
+def invalid(task):
+    return TaskOutput(description=task.description, raw="not json", agent=task.agent.role)
+
+
+def test_invalid_output_escalates_the_worker_before_the_manager(bus, stats_path):
+    worker = agent("Picker", "openai/gpt-4o-mini")
+    manager = agent("Manager", "openai/gpt-4.1")
+    task = Task(description="Pick one", expected_output="A symbol", agent=worker, output_pydantic=Pick)
+    crew = Crew(agents=[worker], tasks=[task], process=Process.hierarchical, manager_agent=manager)
+    router = ModelRouter(TIERS, stats_path=stats_path)
+    router.apply(crew)
+    assert task.max_retries >= len(TIERS)
+
+    # Hierarchical crews hand the task to the manager
+    task.agent = manager
+    for expected in ("openai/gpt-4.1", "openai/o3"):
+        passed, feedback = task._guardrail(invalid(task))
+        assert not passed and expected in feedback
+        assert worker.llm.model == expected and manager.llm.model == "openai/gpt-4.1"
+        # The retry starts the task again; the escalated tier must stay
+        bus.emit(task, TaskStartedEvent(context="", task=task))
+        assert worker.llm.model == expected
+
+    passed, _ = task._guardrail(invalid(task))
+    assert not passed and manager.llm.model == "openai/o3"
+    output = invalid(task)
+    assert task._guardrail(output) == (True, output)
+    assert router.escalations == {"Picker": 2, "Manager": 1}
+
+
+def record(router, model, seconds):
+    """One LLM call by ``model`` taking ``seconds``, as the LLM call events record it"""
+    router._started[("Picker", threading.get_ident())] = (time.perf_counter() - seconds, model)
+    router._record("Picker")
+
+
+def test_save_merges_samples_from_other_routers(bus, stats_path):
+    first = ModelRouter(TIERS, stats_path=stats_path)
+    second = ModelRouter(TIERS, stats_path=stats_path)
+    record(first, "openai/gpt-4o-mini", 1.0)
+    record(second, "openai/gpt-4o-mini", 2.0)
+    record(second, "openai/o3", 9.0)
+
+    first.save()
+    second.save()
+    first.save()
+    with open(stats_path, encoding="utf-8") as f:
+        stats = json.load(f)
+    assert stats["openai/gpt-4o-mini"] == pytest.approx([1.0, 2.0], abs=0.01)
+    assert stats["openai/o3"] == pytest.approx([9.0], abs=0.01)
+    assert first.samples["openai/o3"] == stats["openai/o3"]
+
+
+def test_router_saves_only_for_its_own_crew(bus, stats_path, tmp_path):
+    crew = Crew(agents=[agent("Picker", "openai/gpt-4o-mini")], tasks=[])
+    other = Crew(agents=[agent("Picker", "openai/gpt-4o-mini")], tasks=[])
+    router = ModelRouter(TIERS, stats_path=stats_path)
+    router.apply(crew)
+    record(router, "openai/gpt-4o-mini", 1.0)
+
+    bus.emit(other, CrewKickoffCompletedEvent(crew_name="other", output="done"))
+    assert not (tmp_path / "routing_stats.json").exists()
+    bus.emit(crew, CrewKickoffCompletedEvent(crew_name="crew", output="done"))
+    assert (tmp_path / "routing_stats.json").exists()
@@ -1,6 +1,9 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
+from crew_common.knowledge import crew_knowledge
+from crew_common.routing import ModelRouter
+from pathlib import Path
 from typing import List
 
 
@@ -75,11 +78,13 @@ class EngineeringTeam():
     @crew
     def crew(self) -> Crew:
         """Creates the EngineeringTeam crew"""
-        
-        return Crew(
+
+        self.router = ModelRouter.from_yaml(Path(__file__).parent / "config/routing.yaml")
+        crew = Crew(
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
             verbose=True,
-             
+            knowledge=crew_knowledge("engineering_team"),
         )
+        return self.router.apply(crew, self.agents_config)
@@ -4,8 +4,6 @@ import warnings
 
 from datetime import datetime
 
-from engineering_team.crew import EngineeringTeam
-
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 requirements = """
@@ -19,7 +17,8 @@ class_name = "Account"
 
 def run():
     """
-    Run the crew.
+    Run the crew, reusing cached outputs for tasks whose inputs are unchanged.
+    Pass --no-cache to force every task to run.
     """
     inputs = {
         'requirements': requirements,
@@ -28,8 +27,22 @@ def run():
 
     }
     
+    # crewAI takes seconds to import, so it is loaded only once a crew is actually run
+    from engineering_team.crew import EngineeringTeam
+    from engineering_team.memo import kickoff_memoized
+    from crew_common.profiler import CrewProfiler
+
     try:
-        EngineeringTeam().crew().kickoff(inputs=inputs)
+        team = EngineeringTeam()
+        crew = team.crew()
+        profiler = CrewProfiler()
+        if "--no-cache" in sys.argv:
+            crew.kickoff(inputs=inputs)
+        else:
+            kickoff_memoized(crew, inputs)
+        profiler.export("output/trace.json")
+        print(profiler.summary())
+        print(team.router.summary())
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
 
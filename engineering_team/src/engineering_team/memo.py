@@ -0,0 +1,164 @@
+"""Task-level memoization for sequential crew runs.
+
+Every task is keyed on its rendered description and expected output, the
+config of the agent that runs it and the raw outputs of its upstream
+context. A task whose key is already in the cache is not sent to the LLM:
+its output is restored from disk, including the file it wrote under
+``output/``. Editing one task in ``tasks.yaml`` therefore only re-runs that
+task and whatever consumes its output.
+
+Tasks that miss the cache still run inside the original crew, so listeners
+tied to it (the model router's stats, the profiler's crew span) see one
+kickoff per run just like an uncached ``crew.kickoff``.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.constants import NOT_SPECIFIED
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.crew_events import CrewKickoffFailedEvent, CrewKickoffStartedEvent
+
+CACHE_DIR = "output/.task_cache"
+
+
+def _agent_fingerprint(agent) -> Dict[str, Any]:
+    """The parts of an agent's config that change what it produces"""
+    llm = getattr(agent, "llm", None)
+    return {
+        "role": agent.role,
+        "goal": agent.goal,
+        "backstory": agent.backstory,
+        "llm": getattr(llm, "model", None) or str(llm),
+        "tools": sorted(tool.name for tool in agent.tools or []),
+        "allow_code_execution": getattr(agent, "allow_code_execution", False),
+    }
+
+
+class TaskCache:
+    """On-disk store of task outputs keyed by input hash"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def key(self, task: Task, upstream: List[TaskOutput]) -> str:
+        """Hash the rendered task, its agent config and its upstream outputs"""
+        payload = {
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "output_file": task.output_file,
+            "output_pydantic": task.output_pydantic.__name__ if task.output_pydantic else None,
+            "agent": _agent_fingerprint(task.agent) if task.agent else None,
+            "upstream": [output.raw for output in upstream],
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.cache_dir / f"{key}.json"
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, key: str, task: Task, output: TaskOutput) -> None:
+        file_content = None
+        if task.output_file and Path(task.output_file).exists():
+            file_content = Path(task.output_file).read_text(encoding="utf-8")
+
+        entry = {
+            "task": task.name,
+            "raw": output.raw,
+            "json_dict": output.json_dict,
+            "agent": output.agent,
+            "output_file": task.output_file,
+            "file_content": file_content,
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / f"{key}.json").write_text(json.dumps(entry, indent=2), encoding="utf-8")
+
+    def restore(self, task: Task, entry: Dict[str, Any]) -> TaskOutput:
+        """Rebuild the task's output from a cache entry and rewrite its output file"""
+        pydantic_output = None
+        if task.output_pydantic and entry.get("json_dict") is not None:
+            pydantic_output = task.output_pydantic.model_validate(entry["json_dict"])
+        elif task.output_pydantic:
+            pydantic_output = task.output_pydantic.model_validate_json(entry["raw"])
+
+        if task.output_file and entry.get("file_content") is not None:
+            path = Path(task.output_file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(entry["file_content"], encoding="utf-8")
+
+        output = TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=entry["raw"],
+            pydantic=pydantic_output,
+            json_dict=entry.get("json_dict"),
+            agent=entry.get("agent") or (task.agent.role if task.agent else ""),
+            output_format=task._get_output_format(),
+        )
+        task.output = output
+        return output
+
+
+def kickoff_memoized(crew: Crew, inputs: Dict[str, Any], cache: Optional[TaskCache] = None) -> CrewOutput:
+    """
+    Run a sequential crew task by task, skipping tasks whose inputs are unchanged.
+
+    This mirrors crewAI's own ``Crew.kickoff``/``Crew.replay``: the crew's
+    inputs, callbacks and agents are set up once, then each task that misses
+    the cache is executed by the crew with the (possibly restored) outputs of
+    earlier tasks as its context.
+    """
+    if crew.process != Process.sequential:
+        raise ValueError("kickoff_memoized only supports sequential crews")
+
+    cache = cache or TaskCache()
+    crewai_event_bus.emit(crew, CrewKickoffStartedEvent(crew_name=crew.name, inputs=inputs))
+    try:
+        crew._inputs = inputs
+        crew._interpolate_inputs(inputs)
+        crew._set_tasks_callbacks()
+        for agent in crew.agents:
+            agent.crew = crew
+            agent.set_knowledge(crew_embedder=crew.embedder)
+
+        outputs: List[TaskOutput] = []
+        for task in crew.tasks:
+            if task.context is NOT_SPECIFIED:
+                # Sequential crews hand every earlier output to a task without explicit context
+                upstream = list(outputs)
+            else:
+                upstream = [context_task.output for context_task in task.context or [] if context_task.output]
+
+            key = cache.key(task, upstream)
+            entry = cache.load(key)
+            if entry is not None:
+                crew._logger.log("info", f"{task.name}: unchanged, restored from {cache.cache_dir}", color="bold_blue")
+                outputs.append(cache.restore(task, entry))
+                continue
+
+            crew._logger.log("info", f"{task.name}: inputs changed, running")
+            agent = crew._get_agent_to_use(task)
+            tools = crew._prepare_tools(agent, task, task.tools or agent.tools or [])
+            output = task.execute_sync(agent=agent, context=crew._get_context(task, outputs), tools=tools)
+            crew._process_task_result(task, output)
+            cache.save(key, task, output)
+            outputs.append(output)
+
+        # Emits CrewKickoffCompletedEvent and totals the agents' token usage, as a normal run does
+        result = crew._create_crew_output(outputs)
+        crew.usage_metrics = crew.calculate_usage_metrics()
+        return result
+    except Exception as e:
+        crewai_event_bus.emit(crew, CrewKickoffFailedEvent(error=str(e), crew_name=crew.name))
+        raise
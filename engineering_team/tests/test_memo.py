@@ -0,0 +1,127 @@
+import os
+
+import pytest
+from crewai import Agent, Crew, Process, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.crew_events import CrewKickoffCompletedEvent, CrewKickoffStartedEvent
+
+from crew_common.routing import ModelRouter, ModelTier
+from engineering_team.memo import TaskCache, kickoff_memoized
+
+
+def agent(role, goal="Write {module_name}"):
+    return Agent(role=role, goal=goal, backstory="Seasoned engineer", llm="gpt-4o-mini")
+
+
+def make_crew(design_description="Design {module_name}"):
+    lead, engineer = agent("lead"), agent("engineer")
+    design = Task(name="design", description=design_description, expected_output="A design",
+                  agent=lead, output_file="output/design.md")
+    code = Task(name="code", description="Implement {class_name}", expected_output="Code", agent=engineer)
+    return Crew(agents=[lead, engineer], tasks=[design, code], process=Process.sequential)
+
+
+@pytest.fixture
+def executed(monkeypatch, tmp_path):
+    """Stands in for the LLM: each run task answers with its description and the context it was given"""
+    calls = []
+    monkeypatch.chdir(tmp_path)
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        calls.append(self.name)
+        if self.output_file:
+            os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+            with open(self.output_file, "w", encoding="utf-8") as f:
+                f.write(f"file for {self.description}")
+        self.output = TaskOutput(name=self.name, description=self.description,
+                                 raw=f"{self.description} <- {context}", agent=agent.role)
+        return self.output
+
+    monkeypatch.setattr(Task, "execute_sync", execute_sync)
+    return calls
+
+
+INPUTS = {"module_name": "accounts.py", "class_name": "Account"}
+
+
+def output(raw):
+    return TaskOutput(description="upstream", raw=raw, agent="lead")
+
+
+def test_key_changes_with_upstream_output(tmp_path):
+    cache = TaskCache(str(tmp_path))
+    task = make_crew().tasks[1]
+    assert cache.key(task, [output("design v1")]) == cache.key(task, [output("design v1")])
+    assert cache.key(task, [output("design v1")]) != cache.key(task, [output("design v2")])
+
+
+def test_key_changes_with_agent_fingerprint(tmp_path):
+    cache = TaskCache(str(tmp_path))
+    task = make_crew().tasks[1]
+    before = cache.key(task, [])
+    task.agent.goal = "Write tested {module_name}"
+    assert cache.key(task, []) != before
+    task.agent.goal = "Write {module_name}"
+    task.agent.llm.model = "gpt-4o"
+    assert cache.key(task, []) != before
+
+
+def test_unchanged_run_is_restored_from_cache(tmp_path, executed):
+    cache = TaskCache(str(tmp_path / "cache"))
+    first = kickoff_memoized(make_crew(), INPUTS, cache)
+    assert executed == ["design", "code"]
+
+    (tmp_path / "output" / "design.md").unlink()
+    second = kickoff_memoized(make_crew(), INPUTS, cache)
+    assert executed == ["design", "code"]
+    assert [t.raw for t in second.tasks_output] == [t.raw for t in first.tasks_output]
+    assert (tmp_path / "output" / "design.md").read_text(encoding="utf-8") == "file for Design accounts.py"
+
+
+def test_changed_upstream_reruns_downstream(tmp_path, executed):
+    cache = TaskCache(str(tmp_path / "cache"))
+    kickoff_memoized(make_crew(), INPUTS, cache)
+    result = kickoff_memoized(make_crew("Design {module_name} with tests"), INPUTS, cache)
+    assert executed == ["design", "code", "design", "code"]
+    assert result.raw == "Implement Account <- Design accounts.py with tests <- "
+
+
+def test_changed_inputs_miss_the_cache(tmp_path, executed):
+    cache = TaskCache(str(tmp_path / "cache"))
+    kickoff_memoized(make_crew(), INPUTS, cache)
+    kickoff_memoized(make_crew(), {**INPUTS, "class_name": "Ledger"}, cache)
+    assert executed == ["design", "code", "code"]
+
+
+def test_run_is_one_kickoff_of_the_original_crew(tmp_path, executed):
+    crew = make_crew()
+    events = []
+    with crewai_event_bus.scoped_handlers():
+        @crewai_event_bus.on(CrewKickoffStartedEvent)
+        def on_started(source, event):
+            events.append(("started", source))
+
+        @crewai_event_bus.on(CrewKickoffCompletedEvent)
+        def on_completed(source, event):
+            events.append(("completed", source))
+
+        kickoff_memoized(crew, INPUTS, TaskCache(str(tmp_path / "cache")))
+
+    assert [name for name, _ in events] == ["started", "completed"]
+    assert all(source is crew for _, source in events)
+
+
+def test_router_saves_stats_after_a_memoized_run(tmp_path, executed):
+    stats = tmp_path / "routing_stats.json"
+    with crewai_event_bus.scoped_handlers():
+        router = ModelRouter({"small": ModelTier(model="ollama/llama3.2:1b", latency_s=4)}, stats_path=str(stats))
+        kickoff_memoized(router.apply(make_crew()), INPUTS, TaskCache(str(tmp_path / "cache")))
+    assert stats.exists()
+
+
+def test_hierarchical_crews_are_refused(tmp_path):
+    crew = make_crew()
+    crew.process = Process.hierarchical
+    with pytest.raises(ValueError):
+        kickoff_memoized(crew, INPUTS, TaskCache(str(tmp_path)))
@@ -0,0 +1,103 @@
+"""Research several companies concurrently.
+
+Each company gets its own crew, run in a bounded thread pool, and its own
+report under ``output/companies/<slug>.md``. The researcher's Serper searches
+go through a process-wide cache (``tools/shared_search.py``), so a query the
+crews have in common (a sector overview, a shared competitor) costs one API
+call for the whole batch. ``index.md`` lists every company with its report,
+status, wall time and token usage, followed by the search deduplication
+figures. Each report also gets its metadata file, so it can later be
+refreshed with ``run_delta <company> output/companies/<slug>.md``.
+"""
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+OUTPUT_DIR = "output/companies"
+
+
+def slugify(company: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-")
+    return slug or "company"
+
+
+def research_company(company: str, out_dir: str = OUTPUT_DIR) -> Dict:
+    """
+    Run one crew for ``company`` and write its report to ``<out_dir>/<slug>.md``.
+    Any failure, from building the crew to saving the metadata, is reported
+    in the returned entry so the rest of the batch carries on.
+    """
+    from financial_researcher.crew import FinancialResearcher
+    from financial_researcher.delta import save_metadata
+
+    report_path = f"{out_dir}/{slugify(company)}.md"
+    start = time.perf_counter()
+    try:
+        crew = FinancialResearcher().crew()
+        # Interleaved logs from several crews are unreadable; the index has the outcome
+        crew.verbose = False
+        for agent in crew.agents:
+            agent.verbose = False
+        for task in crew.tasks:
+            if task.output_file:
+                task.output_file = report_path
+
+        result = crew.kickoff(inputs={'company': company})
+        save_metadata(report_path, company, crew, result)
+    except Exception as e:
+        return {
+            "company": company, "report": None, "status": f"failed: {e}",
+            "seconds": time.perf_counter() - start, "tokens": 0,
+        }
+    return {
+        "company": company, "report": report_path, "status": "ok",
+        "seconds": time.perf_counter() - start, "tokens": result.token_usage.total_tokens,
+    }
+
+
+def write_index(results: List[Dict], out_dir: str, elapsed: float, search_stats: Dict[str, int]) -> str:
+    lines = [
+        "# Company Research Reports",
+        "",
+        "| Company | Report | Status | Time (s) | Tokens |",
+        "|---|---|---|---|---|",
+    ]
+    for entry in results:
+        link = f"[{os.path.basename(entry['report'])}]({os.path.basename(entry['report'])})" if entry["report"] else "-"
+        lines.append(f"| {entry['company']} | {link} | {entry['status']} | {entry['seconds']:.1f} | {entry['tokens']:,} |")
+
+    serial = sum(entry["seconds"] for entry in results)
+    lines += [
+        "",
+        f"Wall time {elapsed:.1f}s for {len(results)} companies ({serial:.1f}s of crew time).",
+        "",
+        f"Searches: {search_stats['requests']} requested, {search_stats['api_calls']} sent to Serper, "
+        f"{search_stats['deduplicated']} served from the shared cache.",
+    ]
+    path = os.path.join(out_dir, "index.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def run_companies(companies: List[str], max_workers: int = 4, out_dir: str = OUTPUT_DIR) -> List[Dict]:
+    """Research ``companies`` with at most ``max_workers`` crews at a time; results keep the input order"""
+    from financial_researcher.tools.shared_search import shared_search_cache
+
+    companies = list(dict.fromkeys(c.strip() for c in companies if c.strip()))
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    results: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(research_company, company, out_dir): company for company in companies}
+        for future in as_completed(futures):
+            entry = future.result()
+            results[entry["company"]] = entry
+            print(f"{entry['company']}: {entry['status']} in {entry['seconds']:.1f}s")
+
+    ordered = [results[company] for company in companies]
+    index = write_index(ordered, out_dir, time.perf_counter() - start, shared_search_cache.stats())
+    print(f"Index written to {index}")
+    return ordered
@@ -1,6 +1,11 @@
-from crewai import Agent, Crew, Process, Task
+from datetime import date
+from pathlib import Path
+from crewai import Agent, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool
+from financial_researcher.tools.shared_search import SharedSerperDevTool
+from crew_common.context import CompactingCrew, ContextCompactor
+from crew_common.knowledge import crew_knowledge
+from crew_common.routing import ModelRouter
 
 
 @CrewBase
@@ -13,7 +18,7 @@ class FinancialResearcher():
     
     @agent
     def researcher(self) -> Agent:
-        return Agent(config=self.agents_config['researcher'], verbose=True, tools=[SerperDevTool()])
+        return Agent(config=self.agents_config['researcher'], verbose=True, tools=[SharedSerperDevTool()])
 
     @agent
     def analyst(self) -> Agent:
@@ -27,13 +32,40 @@ class FinancialResearcher():
     @task
     def analysis_task(self) -> Task:
         return Task(config=self.tasks_config['analysis_task'])
+
+    # Delta tasks are not decorated with @task, so they stay out of the full crew
+
+    def delta_research_task(self, since: date) -> Task:
+        news_since = SharedSerperDevTool(search_type="news", tbs=f"cdr:1,cd_min:{since:%m/%d/%Y}")
+        return Task(config=self.tasks_config['delta_research_task'], name='delta_research_task', tools=[news_since])
+
+    def delta_update_task(self, research: Task) -> Task:
+        return Task(config=self.tasks_config['delta_update_task'], name='delta_update_task', context=[research])
         
 
+    def _routed(self, crew: CompactingCrew) -> CompactingCrew:
+        self.router = ModelRouter.from_yaml(Path(__file__).parent / "config/routing.yaml")
+        return self.router.apply(crew, self.agents_config)
+
     @crew
-    def crew(self) -> Crew:
-        return Crew(
+    def crew(self) -> CompactingCrew:
+        return self._routed(CompactingCrew(
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
             verbose=True,
-        )
+            knowledge=crew_knowledge("financial_researcher"),
+            compactor=ContextCompactor.from_yaml(Path(__file__).parent / "config/compaction.yaml"),
+        ))
+
+    def delta_crew(self, since: date) -> CompactingCrew:
+        """Crew that only researches news since ``since`` and rewrites the report sections it affects"""
+        research = self.delta_research_task(since)
+        return self._routed(CompactingCrew(
+            agents=[self.researcher(), self.analyst()],
+            tasks=[research, self.delta_update_task(research)],
+            process=Process.sequential,
+            verbose=True,
+            knowledge=crew_knowledge("financial_researcher"),
+            compactor=ContextCompactor.from_yaml(Path(__file__).parent / "config/compaction.yaml"),
+        ))
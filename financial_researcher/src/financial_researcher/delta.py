@@ -0,0 +1,184 @@
+"""Delta research: refresh an existing report instead of rewriting it.
+
+A full run leaves ``report.md`` plus ``report.meta.json``. The metadata holds
+when the report was generated, the search results it was built from, and the
+run's token and search counts. A delta run reads both and searches only for
+news published since ``generated_at``, with a Serper date filter, skipping
+sources the report already used. The analyst then returns only the sections
+those developments change, and those are spliced into the existing report
+under their original headings. Everything else is kept verbatim, and the
+metadata is rolled forward for the next run.
+"""
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+NO_CHANGES = "NO CHANGES"
+MAX_KNOWN_SOURCES = 40
+
+HEADING = re.compile(r"^(#{1,3})\s+(.+?)\s*#*\s*$")
+
+
+def metadata_path(report_path: str) -> str:
+    return os.path.splitext(report_path)[0] + ".meta.json"
+
+
+def load_metadata(report_path: str) -> Optional[Dict]:
+    path = metadata_path(report_path)
+    if not os.path.exists(report_path) or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def crew_search_tools(crew) -> List:
+    from financial_researcher.tools.shared_search import SharedSerperDevTool
+
+    tools = [tool for agent in crew.agents for tool in agent.tools or []]
+    tools += [tool for task in crew.tasks for tool in task.tools or []]
+    # Tasks without their own tools share their agent's, so count each instance once
+    unique = {id(tool): tool for tool in tools if isinstance(tool, SharedSerperDevTool)}
+    return list(unique.values())
+
+
+def save_metadata(report_path: str, company: str, crew, result, mode: str = "full",
+                  previous: Optional[Dict] = None, changed: Optional[List[str]] = None) -> Dict:
+    """Record what ``crew`` searched and spent producing ``report_path``"""
+    tools = crew_search_tools(crew)
+    sources = {source["link"]: source for source in (previous or {}).get("sources", [])}
+    for tool in tools:
+        sources.update((source["link"], source) for source in tool.sources)
+
+    run = {"tokens": result.token_usage.total_tokens, "searches": sum(tool.searches for tool in tools)}
+    meta = {
+        "company": company,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "mode": mode,
+        "run": run,
+        # Delta runs are measured against the last full run
+        "full_run": run if mode == "full" else (previous or {}).get("full_run", {}),
+        "changed_sections": changed if changed is not None else [],
+        "sources": list(sources.values()),
+    }
+    with open(metadata_path(report_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def _title_key(title: str) -> str:
+    """Heading text without numbering, emphasis or emoji, for matching rewritten sections"""
+    title = re.sub(r"^[\d.\s)]+", "", title)
+    return re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+
+
+def split_sections(markdown: str, level: Optional[int] = None,
+                   known: Set[str] = frozenset()) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    Split a report at its section headings. Returns the section heading level
+    (by default the shallowest level used more than once, since the title is
+    usually the only level-1 heading) and ``(title, text)`` pairs, where
+    ``text`` includes the heading line; text before the first section has an
+    empty title. Headings whose title is in ``known`` start a section at any
+    level.
+    """
+    lines = markdown.splitlines(keepends=True)
+    if level is None:
+        levels = [len(m.group(1)) for m in map(HEADING.match, lines) if m]
+        repeated = [n for n in sorted(set(levels)) if levels.count(n) > 1]
+        level = repeated[0] if repeated else (min(levels) if levels else 2)
+
+    sections: List[Tuple[str, str]] = [("", "")]
+    for line in lines:
+        match = HEADING.match(line)
+        if match and (len(match.group(1)) == level or _title_key(match.group(2)) in known):
+            sections.append((match.group(2), line))
+        else:
+            title, text = sections[-1]
+            sections[-1] = (title, text + line)
+    if not sections[0][1]:
+        sections.pop(0)
+    return level, sections
+
+
+def patch_report(report: str, rewritten: str) -> Tuple[str, List[str]]:
+    """Replace the sections of ``report`` that ``rewritten`` contains; unmatched ones are appended"""
+    rewritten = re.sub(r"^```\w*\n|\n```\s*$", "", rewritten.strip())
+    if not rewritten or rewritten.strip().upper().startswith(NO_CHANGES):
+        return report, []
+
+    level, sections = split_sections(report)
+    positions = {_title_key(title): i for i, (title, _) in enumerate(sections) if title}
+    update_levels = [len(m.group(1)) for m in map(HEADING.match, rewritten.splitlines()) if m]
+    _, updates = split_sections(rewritten, min(update_levels, default=level), known=set(positions))
+    updates = [(title, text) for title, text in updates if title]
+
+    changed = []
+    for title, text in updates:
+        heading, _, body = text.partition("\n")
+        body = body.rstrip("\n") + "\n\n"
+        index = positions.get(_title_key(title))
+        if index is None:
+            last_title, last_text = sections[-1]
+            sections[-1] = (last_title, last_text.rstrip("\n") + "\n\n")
+            # New sections take the report's heading level, whatever level the analyst used
+            sections.append((title, re.sub(r"^#{1,3}", "#" * level, heading) + "\n" + body))
+        else:
+            original_heading = sections[index][1].partition("\n")[0]
+            sections[index] = (sections[index][0], original_heading + "\n" + body)
+        changed.append(title)
+    return "".join(text for _, text in sections).rstrip("\n") + "\n", changed
+
+
+def research_delta(company: str, report_path: str = "output/report.md") -> Dict:
+    """
+    Bring ``report_path`` up to date with news since its last run. Falls back
+    to a full run when there is no previous report or it covers another company.
+    """
+    from financial_researcher.crew import FinancialResearcher
+
+    previous = load_metadata(report_path)
+    if previous is None or previous.get("company", "").lower() != company.lower():
+        print(f"No previous report on {company} at {report_path}; running full research")
+        crew = FinancialResearcher().crew()
+        for task in crew.tasks:
+            if task.output_file:
+                task.output_file = report_path
+        result = crew.kickoff(inputs={'company': company})
+        return save_metadata(report_path, company, crew, result)
+
+    with open(report_path, encoding="utf-8") as f:
+        report = f.read()
+    since = datetime.fromisoformat(previous["generated_at"])
+    _, sections = split_sections(report)
+
+    crew = FinancialResearcher().delta_crew(since.date())
+    result = crew.kickoff(inputs={
+        'company': company,
+        'since': since.strftime("%Y-%m-%d"),
+        'sections': "; ".join(title for title, _ in sections if title),
+        'known_sources': "\n".join(source["link"] for source in previous.get("sources", [])[-MAX_KNOWN_SOURCES:]),
+        'report': report,
+    })
+
+    patched, changed = patch_report(report, result.raw)
+    if changed:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(patched)
+    return save_metadata(report_path, company, crew, result, mode="delta", previous=previous, changed=changed)
+
+
+def describe(meta: Dict) -> str:
+    """One-paragraph account of a run and its cost relative to the last full run"""
+    run, full = meta["run"], meta.get("full_run") or {}
+    lines = [f"{meta['mode'].capitalize()} run for {meta['company']}: {run['tokens']:,} tokens, {run['searches']} searches"]
+    if meta["mode"] == "delta":
+        sections = ", ".join(meta["changed_sections"]) or "none"
+        lines.append(f"Sections updated: {sections}")
+        if full.get("tokens"):
+            lines.append(
+                f"Last full run: {full['tokens']:,} tokens, {full['searches']} searches "
+                f"({run['tokens'] / full['tokens']:.0%} of the tokens)"
+            )
+    return "\n".join(lines)
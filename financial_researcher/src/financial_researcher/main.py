@@ -1,11 +1,10 @@
 #!/usr/bin/env python
+import os
 import sys
 import warnings
 
 from datetime import datetime
 
-from financial_researcher.crew import FinancialResearcher
-
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 
@@ -13,11 +12,59 @@ def run():
     """
     Run the financial researcher crew.
     """
+    # crewAI takes seconds to import, so it is loaded only once a crew is actually run
+    from financial_researcher.crew import FinancialResearcher
+    from crew_common.profiler import CrewProfiler
+    from financial_researcher.delta import save_metadata
+
     inputs = {
         'company': 'Tesla',
     }
-    result = FinancialResearcher().crew().kickoff(inputs=inputs)
+    researcher = FinancialResearcher()
+    crew = researcher.crew()
+    profiler = CrewProfiler()
+    result = crew.kickoff(inputs=inputs)
+    profiler.export("output/trace.json")
+    save_metadata("output/report.md", inputs['company'], crew, result)
     print(result.raw)
+    print(crew.compactor.summary())
+    print(profiler.summary())
+    print(researcher.router.summary())
+
+
+def run_delta():
+    """
+    Refresh output/report.md with news since its last run, rewriting only the sections that changed.
+
+    Usage: run_delta [company] [report_path]
+    """
+    from financial_researcher.delta import describe, research_delta
+
+    company = sys.argv[1] if len(sys.argv) > 1 else 'Tesla'
+    report_path = sys.argv[2] if len(sys.argv) > 2 else "output/report.md"
+    print(describe(research_delta(company, report_path)))
+
+
+def run_batch():
+    """
+    Research several companies concurrently, one report each.
+
+    Usage: run_batch [--workers N] <company> [<company> ...]
+           run_batch [--workers N] companies.txt
+    """
+    from financial_researcher.batch import run_companies
+
+    args = sys.argv[1:]
+    workers = 4
+    if len(args) >= 2 and args[0] == "--workers":
+        workers = int(args[1])
+        args = args[2:]
+    if len(args) == 1 and os.path.isfile(args[0]):
+        with open(args[0], encoding="utf-8") as f:
+            args = f.read().splitlines()
+    if not args:
+        raise SystemExit(run_batch.__doc__)
+    run_companies(args, max_workers=workers)
 
 if __name__ == "__main__":
     run()
\ No newline at end of file
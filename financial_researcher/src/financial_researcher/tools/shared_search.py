@@ -0,0 +1,99 @@
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+import requests
+from crewai_tools import SerperDevTool
+from pydantic import Field
+
+
+class SharedSearchCache:
+    """
+    Process-wide cache of Serper responses, so crews researching different
+    companies at the same time share identical searches. Concurrent requests
+    for the same query wait for a single API call.
+    """
+
+    def __init__(self):
+        self._results: Dict[Tuple, dict] = {}
+        self._inflight: Dict[Tuple, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.api_calls = 0
+
+    def get(self, key: Tuple, fetch) -> dict:
+        while True:
+            with self._lock:
+                if key in self._results:
+                    self.requests += 1
+                    return self._results[key]
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    self._inflight[key] = threading.Event()
+                    self.requests += 1
+                    self.api_calls += 1
+                    break
+            waiting.wait()
+
+        try:
+            result = fetch()
+            with self._lock:
+                self._results[key] = result
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "api_calls": self.api_calls,
+                "deduplicated": self.requests - self.api_calls,
+            }
+
+
+shared_search_cache = SharedSearchCache()
+
+
+class SharedSerperDevTool(SerperDevTool):
+    """
+    SerperDevTool whose API requests go through the shared search cache.
+    ``tbs`` is passed to Serper as a date filter (e.g. ``qdr:w``), and every
+    result link is recorded in ``sources`` so a report can list what it was
+    built from.
+    """
+
+    tbs: str = ""
+    searches: int = 0
+    sources: List[Dict[str, str]] = Field(default_factory=list)
+
+    def _make_api_request(self, search_query: str, search_type: str) -> dict:
+        normalized = " ".join(search_query.lower().split())
+        key = (search_type, normalized, self.n_results, self.country, self.location, self.locale, self.tbs)
+        return shared_search_cache.get(key, lambda: self._request(search_query, search_type))
+
+    def _request(self, search_query: str, search_type: str) -> dict:
+        if not self.tbs:
+            return super()._make_api_request(search_query, search_type)
+        payload = {"q": search_query, "num": self.n_results, "tbs": self.tbs}
+        for name, value in (("gl", self.country), ("location", self.location), ("hl", self.locale)):
+            if value:
+                payload[name] = value
+        response = requests.post(
+            self._get_search_url(search_type),
+            headers={"X-API-KEY": os.environ["SERPER_API_KEY"], "content-type": "application/json"},
+            json=payload,
+            timeout=10,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _run(self, **kwargs: Any) -> Any:
+        results = super()._run(**kwargs)
+        self.searches += 1
+        for item in results.get("organic", []) + results.get("news", []):
+            # Serper leaves out the title or link on some results
+            if item.get("link"):
+                self.sources.append({"title": item.get("title", ""), "link": item["link"], "date": item.get("date", "")})
+        return results
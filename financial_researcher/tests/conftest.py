@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Keep crewAI from exporting telemetry while the tests build crews
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
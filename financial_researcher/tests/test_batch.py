@@ -0,0 +1,62 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from financial_researcher import batch, crew, delta
+
+
+class FakeCrew:
+    """Writes a report for its company, or fails in kickoff for companies named Failing"""
+
+    def __init__(self):
+        self.agents = [SimpleNamespace(verbose=True)]
+        self.tasks = [SimpleNamespace(output_file="output/report.md")]
+        self.verbose = True
+
+    def kickoff(self, inputs):
+        if inputs["company"].startswith("Failing"):
+            raise RuntimeError("LLM unavailable")
+        with open(self.tasks[0].output_file, "w", encoding="utf-8") as f:
+            f.write(f"# {inputs['company']}\n")
+        return SimpleNamespace(token_usage=SimpleNamespace(total_tokens=1200))
+
+
+@pytest.fixture
+def researcher(monkeypatch):
+    monkeypatch.setattr(crew, "FinancialResearcher", lambda: SimpleNamespace(crew=FakeCrew))
+    saved = []
+
+    def save_metadata(report_path, company, crew, result):
+        if company.startswith("Unsaved"):
+            raise OSError("disk full")
+        saved.append(company)
+
+    monkeypatch.setattr(delta, "save_metadata", save_metadata)
+    return saved
+
+
+def test_failures_are_isolated_per_company(tmp_path, researcher):
+    results = batch.run_companies(["Apple", "Failing Corp", "Unsaved Inc", "Tesla"], out_dir=str(tmp_path))
+
+    assert [entry["company"] for entry in results] == ["Apple", "Failing Corp", "Unsaved Inc", "Tesla"]
+    assert [entry["status"] for entry in results] == ["ok", "failed: LLM unavailable", "failed: disk full", "ok"]
+    assert sorted(researcher) == ["Apple", "Tesla"]
+    assert results[0]["report"] == f"{tmp_path}/apple.md" and results[0]["tokens"] == 1200
+    assert results[1]["report"] is None
+    assert os.path.exists(tmp_path / "apple.md") and os.path.exists(tmp_path / "index.md")
+
+
+def test_crew_construction_failure_is_reported(tmp_path, monkeypatch):
+    def broken():
+        raise KeyError("research_task")
+
+    monkeypatch.setattr(crew, "FinancialResearcher", broken)
+    entry = batch.research_company("Apple", str(tmp_path))
+    assert entry["status"] == "failed: 'research_task'"
+    assert entry["report"] is None and entry["tokens"] == 0
+
+
+def test_companies_are_deduplicated_and_trimmed(tmp_path, researcher):
+    results = batch.run_companies([" Apple ", "Apple", "", "Tesla"], out_dir=str(tmp_path))
+    assert [entry["company"] for entry in results] == ["Apple", "Tesla"]
@@ -0,0 +1,55 @@
+from financial_researcher.delta import NO_CHANGES, patch_report, split_sections
+
+REPORT = """# Apple Inc. Research Report
+
+Prepared for the investment committee.
+
+## 1. Company Overview
+Apple designs phones.
+
+## 2. Financial Performance
+Revenue was $383B.
+
+### Margins
+Gross margin 44%.
+
+## 3. Risks
+Supply chain concentration.
+"""
+
+
+def test_split_sections_uses_the_repeated_heading_level():
+    level, sections = split_sections(REPORT)
+    assert level == 2
+    assert [title for title, _ in sections] == ["", "1. Company Overview", "2. Financial Performance", "3. Risks"]
+    assert sections[0][1].startswith("# Apple Inc.")
+    assert "### Margins" in sections[2][1]
+    assert "".join(text for _, text in sections) == REPORT
+
+
+def test_replaced_section_keeps_its_original_heading():
+    patched, changed = patch_report(REPORT, "## Financial Performance\nRevenue was $391B, up 2%.\n")
+    assert changed == ["Financial Performance"]
+    assert "## 2. Financial Performance\nRevenue was $391B, up 2%.\n\n## 3. Risks" in patched
+    assert "Revenue was $383B" not in patched and "### Margins" not in patched
+    # Sections the analyst did not return are kept verbatim
+    assert patched.startswith(REPORT.split("## 2.")[0])
+    assert patched.endswith("## 3. Risks\nSupply chain concentration.\n")
+
+
+def test_new_section_is_appended_at_the_report_level():
+    patched, changed = patch_report(REPORT, "```markdown\n# Recent Developments\nA new CFO was named.\n```")
+    assert changed == ["Recent Developments"]
+    assert patched == REPORT + "\n## Recent Developments\nA new CFO was named.\n"
+
+
+def test_unchanged_report_is_returned_as_is():
+    assert patch_report(REPORT, NO_CHANGES) == (REPORT, [])
+    assert patch_report(REPORT, "  no changes since the last report\n") == (REPORT, [])
+    assert patch_report(REPORT, "") == (REPORT, [])
+
+
+def test_rewrite_without_a_heading_changes_nothing():
+    patched, changed = patch_report(REPORT, "Revenue was $391B, up 2%.")
+    assert changed == []
+    assert patched == REPORT
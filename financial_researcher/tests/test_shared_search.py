@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from financial_researcher.tools.shared_search import SharedSearchCache, SharedSerperDevTool
+
+
+def test_repeated_queries_use_one_api_call():
+    cache = SharedSearchCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"organic": []}
+
+    assert cache.get(("search", "nvidia"), fetch) is cache.get(("search", "nvidia"), fetch)
+    cache.get(("news", "nvidia"), fetch)
+    assert len(calls) == 2
+    assert cache.stats() == {"requests": 3, "api_calls": 2, "deduplicated": 1}
+
+
+def test_concurrent_requests_wait_for_one_call():
+    cache = SharedSearchCache()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"organic": [{"link": "https://example.com"}]}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(("search", "amd"), fetch)))
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 6 and all(result is results[0] for result in results)
+    assert cache.stats()["deduplicated"] == 5
+
+
+def test_failed_fetch_is_not_cached():
+    cache = SharedSearchCache()
+
+    def failing():
+        raise ConnectionError("serper down")
+
+    with pytest.raises(ConnectionError):
+        cache.get(("search", "intel"), failing)
+    assert cache.get(("search", "intel"), lambda: {"organic": []}) == {"organic": []}
+    assert cache.stats()["api_calls"] == 2
+
+
+def test_sources_skip_results_without_a_link(monkeypatch):
+    response = {"organic": [{"title": "Q3 results", "link": "https://example.com/q3"}, {"title": "No link"}]}
+    monkeypatch.setattr(SharedSerperDevTool, "_request", lambda self, query, search_type: response)
+    monkeypatch.setenv("SERPER_API_KEY", "test")
+    tool = SharedSerperDevTool()
+    tool._run(search_query="acme quarterly results")
+
+    assert tool.searches == 1
+    assert tool.sources == [{"title": "Q3 results", "link": "https://example.com/q3", "date": ""}]
@@ -0,0 +1,108 @@
+"""Python ports of the workflows' JavaScript Code nodes.
+
+Code nodes hold arbitrary JavaScript, which this runner does not execute.
+Each Code node used by a shipped workflow has a port here, keyed by
+``(workflow name, node name)``. A port receives the batch's item JSON
+(``runOnceForAllItems`` mode, as every node here uses) and the run's clock,
+and returns the JSON of its output items. A port that returns an input
+dict unchanged, or mutated in place, keeps that item's pairing, just like
+returning ``item`` in n8n.
+
+The ports reproduce the JavaScript, edge cases included: a Google Sheets
+serial that is not a number fails as ``toISOString`` would, and an unparsable
+date is filtered out since every comparison with ``NaN`` is false.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+CodePort = Callable[[List[Dict], datetime], List[Dict]]
+
+# Day zero of Google Sheets date serials
+SHEETS_EPOCH = datetime(1899, 12, 30)
+
+
+def parse_date(value) -> Optional[datetime]:
+    """``new Date(value)`` for the ISO dates and timestamps the sheets hold; None where JS gives NaN"""
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def iso(moment: datetime) -> str:
+    """``Date.toISOString()``"""
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def serial_dates(items: List[Dict], now: datetime) -> List[Dict]:
+    for item in items:
+        for column in ("Date of Joining", "Birthday"):
+            try:
+                days = float(item[column])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"RangeError: Invalid time value ({column}: {item.get(column)!r})") from None
+            item[column] = (SHEETS_EPOCH + timedelta(days=days)).date().isoformat()
+    return items
+
+
+def orientation_times(items: List[Dict], now: datetime) -> List[Dict]:
+    for item in items:
+        start = parse_date(f"{item.get('Date of Joining')}T09:00:00")
+        if start is None:
+            raise ValueError(f"RangeError: Invalid time value (Date of Joining: {item.get('Date of Joining')!r})")
+        item["Orientation Start"] = iso(start)
+        item["Orientation End"] = iso(start + timedelta(hours=2))
+    return items
+
+
+def reviews_due_this_week(items: List[Dict], now: datetime) -> List[Dict]:
+    week = now + timedelta(days=7)
+    due = [(item, parse_date(item.get("Next Review Due"))) for item in items]
+    return [item for item, date in due if date is not None and now <= date <= week]
+
+
+def review_times(items: List[Dict], now: datetime) -> List[Dict]:
+    for item in items:
+        # String concatenation in JS, so a missing date reads "undefined"
+        day = item.get("Next Review Due", "undefined")
+        item["Review Start"] = f"{day}T10:00:00.000Z"
+        item["Review End"] = f"{day}T11:00:00.000Z"
+    return items
+
+
+def leave_duration(items: List[Dict], now: datetime) -> List[Dict]:
+    for item in items:
+        start, end = parse_date(item.get("Start Date")), parse_date(item.get("End Date"))
+        if start is None or end is None:
+            item["Duration"] = None
+        else:
+            item["Duration"] = math.ceil(abs((end - start).total_seconds()) / 86400) + 1
+    return items
+
+
+def birthdays_and_anniversaries(items: List[Dict], now: datetime) -> List[Dict]:
+    selected = []
+    for item in items:
+        birthday, joined = parse_date(item.get("Birthday")), parse_date(item.get("Date of Joining"))
+        is_birthday = birthday is not None and (birthday.month, birthday.day) == (now.month, now.day)
+        is_anniversary = joined is not None and (joined.month, joined.day) == (now.month, now.day)
+        item["isBirthday"] = is_birthday
+        item["isAnniversary"] = is_anniversary
+        if is_birthday:
+            item["imagePrompt"] = "cute cartoon birthday cake with balloons and confetti"
+        elif is_anniversary:
+            item["imagePrompt"] = "happy work anniversary celebration in office setting"
+        if is_birthday or is_anniversary:
+            selected.append(item)
+    return selected
+
+
+CODE_NODES: Dict[Tuple[str, str], CodePort] = {
+    ("AI_HR", "Code"): serial_dates,
+    ("AI_HR", "Code1"): orientation_times,
+    ("AI_HR", "Code2"): reviews_due_this_week,
+    ("AI_HR", "Code3"): review_times,
+    ("AI_HR", "Calculate Duration"): leave_duration,
+    ("AI_HR", "Get Bday/Anniversary"): birthdays_and_anniversaries,
+}
@@ -0,0 +1,431 @@
+"""Node implementations, registered by n8n node type.
+
+A connector turns one batch of input items into output items, one list per
+output (If has two). Connectors for external services only talk to
+``execution.services``, so swapping in a different services object changes
+what the whole workflow talks to. Registering a class under another node
+type (``CONNECTORS["n8n-nodes-base.slack"] = Slack()``) adds support for
+it.
+
+``batch_size`` sets how the engine splits a node's items: ``None`` uses the
+run's batch size, ``1`` runs every item as its own concurrent call, and
+``0`` hands the connector all the items at once.
+"""
+import base64
+import copy
+import json
+import re
+from typing import Dict, List, Optional
+
+from code_nodes import CODE_NODES
+from engine import Item, NodeError
+from models import ChatRequest, parse_json
+
+CONNECTORS: Dict[str, "Connector"] = {}
+
+CHAT_MODEL_PROVIDERS = {
+    "@n8n/n8n-nodes-langchain.lmChatGroq": "groq",
+    "@n8n/n8n-nodes-langchain.lmChatOpenAi": "openai",
+}
+
+DEFAULT_EXTRACTION_PROMPT = (
+    "You are an expert extraction algorithm.\n"
+    "Only extract relevant information from the text.\n"
+    "If you do not know the value of an attribute asked to extract, you may omit the attribute's value."
+)
+
+
+def register(*node_types: str):
+    def decorate(cls):
+        for node_type in node_types:
+            CONNECTORS[node_type] = cls()
+        return cls
+    return decorate
+
+
+class Connector:
+    outputs = 1
+    batch_size: Optional[int] = None
+
+    def run_batch(self, execution, node, items: List[Item]) -> List[List[Item]]:
+        output = []
+        for item in items:
+            result = self.run_item(execution, node, item)
+            output.extend(result if isinstance(result, list) else [result])
+        return [output]
+
+    def run_item(self, execution, node, item: Item):
+        raise NotImplementedError
+
+
+def resource_name(value) -> str:
+    """Display name of a resource locator such as a spreadsheet, falling back to its id"""
+    if isinstance(value, dict):
+        return str(value.get("cachedResultName") or value.get("value", ""))
+    return str(value)
+
+
+def resource_value(value) -> str:
+    """Id or value of a resource locator, such as a model id"""
+    return str(value.get("value", "")) if isinstance(value, dict) else str(value)
+
+
+def sheet_key(node) -> str:
+    return f"{resource_name(node.parameters.get('documentId'))}/{resource_name(node.parameters.get('sheetName'))}"
+
+
+def lookup(data, path: str):
+    """Value at a property path such as ``data[0].b64_json``"""
+    for part in re.findall(r"[^.\[\]]+", path):
+        data = data[int(part)] if isinstance(data, list) else data[part]
+    return data
+
+
+# Triggers and flow control
+
+
+@register(
+    "n8n-nodes-base.manualTrigger", "n8n-nodes-base.scheduleTrigger", "n8n-nodes-base.formTrigger",
+    "n8n-nodes-base.googleSheetsTrigger", "n8n-nodes-base.googleDriveTrigger",
+)
+class Trigger(Connector):
+    """Emits the scenario's events for this trigger; manual and schedule triggers fire once without any"""
+    batch_size = 0
+
+    def run_batch(self, execution, node, items):
+        events = execution.services.trigger_events(node.name)
+        if events is None:
+            if node.type.endswith(("manualTrigger", "scheduleTrigger")):
+                events = [{"timestamp": execution.services.now().isoformat()}] if "schedule" in node.type else [{}]
+            else:
+                events = []
+        return [[Item(event) for event in events]]
+
+
+@register("n8n-nodes-base.noOp")
+class NoOp(Connector):
+    batch_size = 0
+
+    def run_batch(self, execution, node, items):
+        return [[item.derive() for item in items]]
+
+
+@register("n8n-nodes-base.set")
+class SetFields(Connector):
+    CASTS = {"string": str, "number": float, "boolean": lambda v: str(v).lower() in ("true", "1")}
+
+    def run_item(self, execution, node, item):
+        params = execution.params(node, item)
+        include = params.get("includeOtherFields") or params.get("options", {}).get("includeOtherFields")
+        json_ = dict(item.json) if include else {}
+        for assignment in params.get("assignments", {}).get("assignments", []):
+            value = assignment.get("value")
+            cast = self.CASTS.get(assignment.get("type"))
+            json_[assignment["name"]] = cast(value) if cast and value is not None else value
+        return item.derive(json_)
+
+
+@register("n8n-nodes-base.if")
+class If(Connector):
+    """Filter conditions (version 2): items that pass go to output 0, the rest to output 1"""
+    outputs = 2
+
+    def run_batch(self, execution, node, items):
+        passed, failed = [], []
+        for item in items:
+            conditions = execution.params(node, item).get("conditions", {})
+            (passed if self.matches(conditions) else failed).append(item.derive())
+        return [passed, failed]
+
+    def matches(self, conditions: Dict) -> bool:
+        options = conditions.get("options", {})
+        results = [self.check(c, options.get("caseSensitive", True)) for c in conditions.get("conditions", [])]
+        return any(results) if conditions.get("combinator") == "or" else all(results)
+
+    @staticmethod
+    def check(condition: Dict, case_sensitive: bool) -> bool:
+        kind = condition.get("operator", {}).get("type", "string")
+        operation = condition.get("operator", {}).get("operation", "equals")
+        left, right = condition.get("leftValue"), condition.get("rightValue")
+        if operation == "exists":
+            return left is not None
+        if operation == "notExists":
+            return left is None
+        if operation == "empty":
+            return left in (None, "", [], {})
+        if operation == "notEmpty":
+            return left not in (None, "", [], {})
+
+        if kind == "boolean":
+            value = left if isinstance(left, bool) else str(left).lower() == "true"
+            if operation in ("true", "false"):
+                return value is (operation == "true")
+            other = right if isinstance(right, bool) else str(right).lower() == "true"
+            return (value == other) == (operation == "equals")
+        if kind == "number":
+            try:
+                left, right = float(left), float(right)
+            except (TypeError, ValueError):
+                return False
+            return {
+                "equals": left == right, "notEquals": left != right, "gt": left > right,
+                "gte": left >= right, "lt": left < right, "lte": left <= right,
+            }.get(operation, False)
+
+        left, right = "" if left is None else str(left), "" if right is None else str(right)
+        if not case_sensitive:
+            left, right = left.lower(), right.lower()
+        if operation in ("regex", "notRegex"):
+            return bool(re.search(right, left)) == (operation == "regex")
+        return {
+            "equals": left == right, "notEquals": left != right,
+            "contains": right in left, "notContains": right not in left,
+            "startsWith": left.startswith(right), "notStartsWith": not left.startswith(right),
+            "endsWith": left.endswith(right), "notEndsWith": not left.endswith(right),
+        }.get(operation, False)
+
+
+@register("n8n-nodes-base.code")
+class Code(Connector):
+    """Runs the node's Python port from ``code_nodes.py`` over all its items"""
+    batch_size = 0
+
+    def run_batch(self, execution, node, items):
+        port = CODE_NODES.get((execution.workflow.name, node.name))
+        if port is None:
+            raise NodeError(
+                f"Code node '{node.name}' has no Python port; add one to CODE_NODES "
+                f"under ({execution.workflow.name!r}, {node.name!r})"
+            )
+        # The Code node sandbox gets copies, so earlier nodes' data is never mutated
+        inputs = [copy.deepcopy(item.json) for item in items]
+        by_identity = {id(json_): item for json_, item in zip(inputs, items)}
+        output = []
+        for index, json_ in enumerate(port(inputs, execution.services.now())):
+            paired = by_identity.get(id(json_)) or items[min(index, len(items) - 1)]
+            output.append(paired.derive(json_))
+        return [output]
+
+
+# Files
+
+
+def extract_pdf_text(data: bytes) -> Dict:
+    """``numpages`` and ``text`` of a PDF; plain bytes (inline scenario files) are decoded as text"""
+    if not data.startswith(b"%PDF"):
+        return {"numpages": 1, "text": data.decode("utf-8", errors="replace")}
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise NodeError("extracting text from PDFs needs pypdf (pip install pypdf)") from None
+    import io
+
+    reader = PdfReader(io.BytesIO(data))
+    return {"numpages": len(reader.pages), "text": "\n".join(page.extract_text() or "" for page in reader.pages)}
+
+
+@register("n8n-nodes-base.extractFromFile")
+class ExtractFromFile(Connector):
+    def run_item(self, execution, node, item):
+        params = execution.params(node, item)
+        if params.get("operation", "csv") != "pdf":
+            raise NodeError(f"extractFromFile operation {params.get('operation')!r} is not supported")
+        binary = item.binary.get(params.get("binaryPropertyName") or "data")
+        if binary is None:
+            raise NodeError("item has no binary data to extract")
+        return item.derive(extract_pdf_text(binary["data"]))
+
+
+@register("n8n-nodes-base.convertToFile")
+class ConvertToFile(Connector):
+    def run_item(self, execution, node, item):
+        params = execution.params(node, item)
+        if params.get("operation") != "toBinary":
+            raise NodeError(f"convertToFile operation {params.get('operation')!r} is not supported")
+        data = base64.b64decode(lookup(item.json, params.get("sourceProperty", "data")))
+        mime = "image/png" if data.startswith(b"\x89PNG") else "application/octet-stream"
+        name = params.get("options", {}).get("fileName") or ("file.png" if mime == "image/png" else "file")
+        binary = dict(item.binary, data={"data": data, "mimeType": mime, "fileName": name})
+        return item.derive(binary=binary)
+
+
+# Google services
+
+
+@register("n8n-nodes-base.googleSheets")
+class GoogleSheets(Connector):
+    """Reads once per distinct filter in a batch; appends and updates the whole batch in one call"""
+
+    def run_batch(self, execution, node, items):
+        services = execution.services
+        key = sheet_key(node)
+        operation = node.parameters.get("operation", "read")
+        params = [execution.params(node, item) for item in items]
+
+        if operation == "read":
+            output, reads = [], {}
+            for item, p in zip(items, params):
+                filters = tuple((f["lookupColumn"], f.get("lookupValue", ""))
+                                for f in p.get("filtersUI", {}).get("values", []))
+                first = bool(p.get("options", {}).get("returnFirstMatch"))
+                if (filters, first) not in reads:
+                    reads[(filters, first)] = services.sheet_read(key, list(filters), first)
+                output.extend(item.derive(dict(row)) for row in reads[(filters, first)])
+            return [output]
+
+        rows = [self.row(item, p) for item, p in zip(items, params)]
+        if operation == "append":
+            services.sheet_append(key, rows)
+        elif operation == "update":
+            services.sheet_update(key, rows, node.parameters.get("columns", {}).get("matchingColumns", []))
+        else:
+            raise NodeError(f"googleSheets operation {operation!r} is not supported")
+        return [[item.derive(row) for item, row in zip(items, rows)]]
+
+    @staticmethod
+    def row(item: Item, params: Dict) -> Dict:
+        columns = params.get("columns", {})
+        if columns.get("mappingMode") == "autoMapInputData":
+            return {k: v for k, v in item.json.items() if k != "row_number"}
+        return dict(columns.get("value", {}))
+
+
+@register("n8n-nodes-base.googleDrive")
+class GoogleDrive(Connector):
+    batch_size = 1
+
+    def run_item(self, execution, node, item):
+        params = execution.params(node, item)
+        if params.get("operation") != "download":
+            raise NodeError(f"googleDrive operation {params.get('operation')!r} is not supported")
+        file = execution.services.drive_download(str(params["fileId"]))
+        data = file.pop("data")
+        binary = {"data": {"data": data, "mimeType": file["mimeType"], "fileName": file["name"]}}
+        return item.derive(file, binary)
+
+
+@register("n8n-nodes-base.gmail")
+class Gmail(Connector):
+    batch_size = 1
+
+    def run_item(self, execution, node, item):
+        params = execution.params(node, item)
+        attachments = params.get("options", {}).get("attachmentsUi", {}).get("attachmentsBinary", [])
+        names = [binary["fileName"] for binary in item.binary.values()] if attachments else []
+        return item.derive(execution.services.send_email(
+            params.get("sendTo", ""), params.get("subject", ""), params.get("message", ""), names,
+        ), {})
+
+
+@register("n8n-nodes-base.telegram")
+class Telegram(Connector):
+    batch_size = 1
+
+    def run_item(self, execution, node, item):
+        params = execution.params(node, item)
+        return item.derive(execution.services.send_telegram(str(params.get("chatId", "")), params.get("text", "")), {})
+
+
+@register("n8n-nodes-base.googleCalendar")
+class GoogleCalendar(Connector):
+    batch_size = 1
+
+    def run_item(self, execution, node, item):
+        params = execution.params(node, item)
+        return item.derive(execution.services.create_event(
+            str(params.get("calendar", "")), params.get("start", ""), params.get("end", ""),
+            params.get("additionalFields", {}).get("description", ""),
+        ), {})
+
+
+@register("n8n-nodes-base.httpRequest")
+class HttpRequest(Connector):
+    """Sends the body to the services' HTTP routes; headers (credentials) are never passed on"""
+    batch_size = 1
+
+    def run_item(self, execution, node, item):
+        params = execution.params(node, item)
+        body = None
+        if params.get("sendBody"):
+            if params.get("specifyBody") == "json":
+                body = params.get("jsonBody")
+                body = json.loads(body) if isinstance(body, str) else body
+            else:
+                body = {p["name"]: p.get("value") for p in params.get("bodyParameters", {}).get("parameters", [])}
+        return item.derive(execution.services.http(params.get("method", "GET"), params["url"], body), {})
+
+
+# LLM nodes
+
+
+class LLMNode(Connector):
+    """Renders one ``ChatRequest`` per item and sends the batch to the node's model in one call"""
+
+    def model(self, execution, node):
+        sub_node = execution.workflow.sub_node(node.name)
+        if sub_node is None or sub_node.type not in CHAT_MODEL_PROVIDERS:
+            raise NodeError(f"'{node.name}' has no supported chat model attached")
+        return execution.services.chat_model(
+            CHAT_MODEL_PROVIDERS[sub_node.type], resource_value(sub_node.parameters.get("model", "")),
+        )
+
+    def request(self, params: Dict, item: Item) -> ChatRequest:
+        raise NotImplementedError
+
+    def output(self, request: ChatRequest, reply: str) -> Dict:
+        raise NotImplementedError
+
+    def run_batch(self, execution, node, items):
+        model = self.model(execution, node)
+        requests = [self.request(execution.params(node, item), item) for item in items]
+        replies = model.complete_batch(requests)
+        return [[item.derive(self.output(request, reply), {})
+                 for item, request, reply in zip(items, requests, replies)]]
+
+
+@register("@n8n/n8n-nodes-langchain.informationExtractor")
+class InformationExtractor(LLMNode):
+    def request(self, params, item):
+        attributes = params.get("attributes", {}).get("attributes", [])
+        system = params.get("options", {}).get("systemPromptTemplate") or DEFAULT_EXTRACTION_PROMPT
+        return ChatRequest(
+            [{"role": "system", "content": system}, {"role": "user", "content": str(params.get("text") or "")}],
+            schema={a["name"]: a.get("description", "").strip() for a in attributes},
+        )
+
+    def output(self, request, reply):
+        values = parse_json(reply)
+        return {"output": {name: values.get(name) for name in request.schema}}
+
+
+@register("@n8n/n8n-nodes-langchain.agent")
+class Agent(LLMNode):
+    def request(self, params, item):
+        text = params.get("text") if params.get("promptType") == "define" else item.json.get("chatInput")
+        system = params.get("options", {}).get("systemMessage") or "You are a helpful assistant"
+        return ChatRequest([{"role": "system", "content": system}, {"role": "user", "content": str(text or "")}])
+
+    def output(self, request, reply):
+        return {"output": reply}
+
+
+@register("@n8n/n8n-nodes-langchain.openAi")
+class OpenAIMessage(LLMNode):
+    """The OpenAI node's "message a model" operation"""
+
+    def model(self, execution, node):
+        return execution.services.chat_model("openai", resource_value(node.parameters.get("modelId", "")))
+
+    def request(self, params, item):
+        messages = [{"role": m.get("role", "user"), "content": str(m.get("content", ""))}
+                    for m in params.get("messages", {}).get("values", [])]
+        return ChatRequest(messages, json_output=bool(params.get("jsonOutput")))
+
+    def output(self, request, reply):
+        content = parse_json(reply) if request.json_output else reply
+        return {
+            "index": 0,
+            "message": {"role": "assistant", "content": content, "refusal": None},
+            "logprobs": None,
+            "finish_reason": "stop",
+        }
@@ -0,0 +1,244 @@
+"""Executes a workflow graph locally.
+
+n8n runs a workflow one branch and one item at a time. ``Execution`` runs
+it as a DAG instead. A node starts as soon as every node feeding it has
+finished, so independent branches (the four in AI_HR, the two sides of an
+If) run concurrently on ``concurrency`` threads.
+
+A node's input items are split into batches of ``batch_size``, and the
+batches run concurrently on a separate pool. The connector chooses how a
+batch is processed:
+
+- Sheets writes go out as one bulk call;
+- an LLM node sends a batch of requests;
+- per-call services (Gmail, Telegram, HTTP) use batches of one, so their
+  calls overlap;
+- Code nodes take all their items at once, as in n8n.
+
+Each item keeps the JSON of the item it descends from at every node it has
+passed through. That is what ``$('Node').item`` reads, so paired-item
+expressions resolve the way n8n resolves them. A node that receives no
+items is skipped, and so is everything after it. A failing node stops its
+own branch only, and the error is reported. Pinned data in the workflow
+replaces the node's execution, as in an n8n manual run. For trigger nodes,
+events from the scenario take precedence over pinned data.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from expressions import ExpressionError, JsObject, render, wrap
+from services import StubServices
+from workflow import Node, Workflow
+
+
+class NodeError(Exception):
+    pass
+
+
+@dataclass
+class Item:
+    json: Dict[str, Any]
+    binary: Dict[str, Dict] = field(default_factory=dict)
+    # node name -> JSON of this item's ancestor produced by that node
+    lineage: Dict[str, Dict] = field(default_factory=dict)
+
+    def derive(self, json: Optional[Dict] = None, binary: Optional[Dict] = None) -> "Item":
+        """A new item paired with this one"""
+        return Item(self.json if json is None else json, self.binary if binary is None else binary, dict(self.lineage))
+
+
+@dataclass
+class NodeStats:
+    name: str
+    type: str
+    status: str = "ok"
+    items_in: int = 0
+    items_out: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    error: str = ""
+
+
+class NodeRef:
+    """``$('Node')`` inside an expression"""
+
+    def __init__(self, execution: "Execution", name: str, item: Item):
+        self._execution = execution
+        self._name = name
+        self._item = item
+
+    @property
+    def item(self) -> JsObject:
+        if self._name not in self._item.lineage:
+            raise ExpressionError(f"no item from '{self._name}' is paired with the current item")
+        return JsObject(json=self._item.lineage[self._name])
+
+    def first(self) -> JsObject:
+        items = self.all()
+        return items[0] if items else None
+
+    def all(self) -> List[JsObject]:
+        outputs = self._execution.outputs.get(self._name) or [[]]
+        return wrap([{"json": item.json} for item in outputs[0]])
+
+
+class InputRef:
+    """``$input`` inside an expression"""
+
+    def __init__(self, item: Item):
+        self.item = JsObject(json=item.json)
+
+    def first(self) -> JsObject:
+        return self.item
+
+
+@dataclass
+class RunResult:
+    workflow: str
+    nodes: Dict[str, NodeStats]
+    outputs: Dict[str, List[List[Item]]]
+    seconds: float
+
+    @property
+    def errors(self) -> List[NodeStats]:
+        return [stats for stats in self.nodes.values() if stats.status == "error"]
+
+    def report(self) -> str:
+        header = f"{'node':<32} {'status':<8} {'in':>5} {'out':>5} {'batches':>7} {'seconds':>8}"
+        lines = [f"{self.workflow}: {self.seconds:.2f}s", header, "-" * len(header)]
+        for stats in self.nodes.values():
+            lines.append(
+                f"{stats.name[:32]:<32} {stats.status:<8} {stats.items_in:>5} {stats.items_out:>5} "
+                f"{stats.batches:>7} {stats.seconds:>8.3f}"
+            )
+        for stats in self.errors:
+            lines.append(f"error in {stats.name}: {stats.error}")
+        return "\n".join(lines)
+
+
+def chunks(items: List[Item], size: int) -> List[List[Item]]:
+    if size <= 0:
+        return [items]
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class Execution:
+    def __init__(self, workflow: Workflow, services: Optional[StubServices] = None, batch_size: int = 50,
+                 concurrency: int = 8, connectors: Optional[Dict] = None):
+        from connectors import CONNECTORS
+
+        self.workflow = workflow
+        self.services = services or StubServices()
+        self.batch_size = batch_size
+        self.concurrency = max(1, concurrency)
+        self.connectors = connectors if connectors is not None else CONNECTORS
+        self.outputs: Dict[str, List[List[Item]]] = {}
+        self.stats: Dict[str, NodeStats] = {}
+
+    # Expressions
+
+    def namespace(self, item: Item) -> Callable[[], Dict[str, Any]]:
+        built: List[Dict[str, Any]] = []
+
+        def build():
+            if not built:
+                built.append({
+                    "_json": wrap(item.json),
+                    "_input": InputRef(item),
+                    "_node": lambda name: NodeRef(self, name, item),
+                    "_now": self.services.now(),
+                })
+            return built[0]
+        return build
+
+    def render(self, value: Any, item: Item) -> Any:
+        return render(value, self.namespace(item))
+
+    def params(self, node: Node, item: Item) -> Dict[str, Any]:
+        return self.render(node.parameters, item)
+
+    # Scheduling
+
+    def run(self, starts: Optional[List[str]] = None) -> RunResult:
+        start = time.perf_counter()
+        starts = starts or self.workflow.start_nodes()
+        nodes = {name for name in self.workflow.reachable(starts) if self.workflow.is_executable(name)}
+        remaining = {name: len(self.workflow.predecessors.get(name, set()) & nodes) for name in nodes}
+        inputs: Dict[str, List[Item]] = {name: [] for name in nodes}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as node_pool, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as batch_pool:
+            running = {node_pool.submit(self._execute, name, [Item({})], batch_pool): name for name in starts}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    outputs = future.result()
+                    self.outputs[name] = outputs
+                    for index, target in self.workflow.successors(name):
+                        if target not in nodes:
+                            continue
+                        if index < len(outputs):
+                            # Each successor gets its own copies, so the lineage a branch
+                            # records never shows up in its sibling branches
+                            inputs[target].extend(item.derive() for item in outputs[index])
+                        remaining[target] -= 1
+                        if remaining[target] == 0:
+                            running[node_pool.submit(self._execute, target, inputs.pop(target), batch_pool)] = target
+
+        # Stats are in the order the nodes started
+        return RunResult(self.workflow.name, dict(self.stats), self.outputs, time.perf_counter() - start)
+
+    def _execute(self, name: str, items: List[Item], batch_pool: ThreadPoolExecutor) -> List[List[Item]]:
+        node = self.workflow.nodes[name]
+        stats = self.stats[name] = NodeStats(name, node.type, items_in=len(items))
+        start = time.perf_counter()
+        try:
+            if not items:
+                stats.status = "skipped"
+                return []
+            outputs = self._outputs(node, items, stats, batch_pool)
+        except Exception as e:
+            stats.status, stats.error = "error", f"{type(e).__name__}: {e}"
+            return []
+        finally:
+            stats.seconds = time.perf_counter() - start
+
+        for output in outputs:
+            for item in output:
+                item.lineage[name] = item.json
+        stats.items_out = sum(len(output) for output in outputs)
+        return outputs
+
+    def _outputs(self, node: Node, items: List[Item], stats: NodeStats, batch_pool) -> List[List[Item]]:
+        if node.name in self.workflow.pin_data and self.services.trigger_events(node.name) is None:
+            stats.status = "pinned"
+            return [[Item(dict(json)) for json in self.workflow.pin_data[node.name]]]
+
+        connector = self.connectors.get(node.type)
+        if connector is None:
+            raise NodeError(f"no connector for node type {node.type}")
+        size = connector.batch_size if connector.batch_size is not None else self.batch_size
+        batches = chunks(items, size)
+        stats.batches = len(batches)
+        futures = [batch_pool.submit(self._run_batch, connector, node, batch) for batch in batches]
+        outputs: List[List[Item]] = [[] for _ in range(connector.outputs)]
+        for future in futures:
+            for index, output in enumerate(future.result()):
+                outputs[index].extend(output)
+        return outputs
+
+    def _run_batch(self, connector, node: Node, batch: List[Item]) -> List[List[Item]]:
+        try:
+            return connector.run_batch(self, node, batch)
+        except Exception as e:
+            if not node.continue_on_fail:
+                raise
+            return [[item.derive({"error": f"{type(e).__name__}: {e}"}) for item in batch]]
+
+
+def run_workflow(workflow: Workflow, services: Optional[StubServices] = None, starts: Optional[List[str]] = None,
+                 **kwargs) -> RunResult:
+    return Execution(workflow, services, **kwargs).run(starts)
@@ -0,0 +1,145 @@
+"""n8n expressions evaluated in Python.
+
+A parameter string starting with ``=`` is a template. Each ``{{ ... }}`` in
+it is a JavaScript expression, evaluated against the current item. When the
+whole template is a single expression its value is used as is (a number
+stays a number); otherwise values are formatted into the string.
+
+The expressions these workflows use are a small subset of JavaScript:
+property and index access on ``$json``, ``$('Node').item.json``,
+``$input``, comparisons, ``&&``/``||``/``!``, ternaries and literals. They
+are rewritten into the same Python expression once and evaluated without
+builtins. Attribute access to dunder names is refused.
+"""
+import json
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List
+
+TEMPLATE = re.compile(r"\{\{(.*?)\}\}", re.S)
+STRING = re.compile(r"'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"|`(?:\\.|[^`\\])*`")
+TERNARY = re.compile(r"^(.+?)\?(.+?):(.+)$", re.S)
+
+
+class ExpressionError(Exception):
+    pass
+
+
+class JsObject(dict):
+    """dict with JavaScript-style property access; missing keys are undefined (None)"""
+
+    def __getattribute__(self, name):
+        # Keys win over dict methods, so ``$json.items`` is the "items" field
+        if name.startswith("__"):
+            return object.__getattribute__(self, name)
+        return wrap(dict.get(self, name))
+
+    def __getitem__(self, key):
+        return wrap(dict.get(self, key))
+
+
+class JsArray(list):
+    def __getitem__(self, index):
+        try:
+            return wrap(list.__getitem__(self, index))
+        except (IndexError, TypeError):
+            return None
+
+    @property
+    def length(self):
+        return len(self)
+
+
+def wrap(value):
+    if isinstance(value, dict) and not isinstance(value, JsObject):
+        return JsObject(value)
+    if isinstance(value, list) and not isinstance(value, JsArray):
+        return JsArray(value)
+    return value
+
+
+@lru_cache(maxsize=1024)
+def translate(expression: str) -> Any:
+    """Compile a JavaScript expression into Python code"""
+    strings: List[str] = []
+
+    def keep(match):
+        strings.append(match.group(0))
+        return f"_S{len(strings) - 1}_"
+
+    code = STRING.sub(keep, expression.strip())
+    code = code.replace("$json", "_json").replace("$input", "_input").replace("$now", "_now").replace("$(", "_node(")
+    code = code.replace("!==", "!=").replace("===", "==")
+    code = code.replace("&&", " and ").replace("||", " or ")
+    code = re.sub(r"!(?!=)", " not ", code)
+    code = re.sub(r"\b(null|undefined)\b", "None", code)
+    code = re.sub(r"\btrue\b", "True", code)
+    code = re.sub(r"\bfalse\b", "False", code)
+    ternary = TERNARY.match(code)
+    if ternary:
+        condition, yes, no = ternary.groups()
+        code = f"(({yes}) if ({condition}) else ({no}))"
+    if "__" in code:
+        raise ExpressionError(f"unsupported expression: {expression}")
+    for index, literal in enumerate(strings):
+        if literal.startswith("`"):
+            literal = json.dumps(literal[1:-1])
+        code = code.replace(f"_S{index}_", literal)
+    try:
+        return compile(code, "<expression>", "eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"unsupported expression: {expression} ({e.msg})") from None
+
+
+def evaluate(expression: str, namespace: Dict[str, Any]) -> Any:
+    try:
+        return eval(translate(expression), {"__builtins__": {}}, namespace)
+    except ExpressionError:
+        raise
+    except Exception as e:
+        raise ExpressionError(f"{{{{ {expression.strip()} }}}}: {type(e).__name__}: {e}") from None
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in dict.items(value)}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def render(value: Any, namespace: Callable[[], Dict[str, Any]]) -> Any:
+    """Resolve every expression in a parameter value; ``namespace`` is built on first use"""
+    if isinstance(value, str):
+        if not value.startswith("="):
+            return value
+        template = value[1:]
+        names = namespace()
+        whole = TEMPLATE.fullmatch(template)
+        if whole:
+            return _plain(evaluate(whole.group(1), names))
+        return TEMPLATE.sub(lambda m: _format(_plain(evaluate(m.group(1), names))), template)
+    if isinstance(value, dict):
+        if value.get("__rl"):
+            return render(value.get("value"), namespace)
+        return {k: render(v, namespace) for k, v in value.items()}
+    if isinstance(value, list):
+        return [render(v, namespace) for v in value]
+    return value
+
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
@@ -0,0 +1,321 @@
+"""Batch pipeline for the "Invoice Workflow SBS" flow.
+
+The n8n workflow takes one Drive file per trigger through:
+
+    Download file -> Extract from File -> Information Extractor (Groq)
+        -> Update Invoice DB -> Create Email -> Send email
+
+This pipeline runs the same flow over a whole folder of PDFs:
+
+    python invoices.py ~/invoices --workers 8 --batch-size 20 --db output/invoice_db.json
+
+1. Hash. Each file is hashed with SHA-256, and files whose hash is already
+   in the ledger (``<folder>/.invoice_ledger.json``) are skipped. The ledger
+   also stores each file's size and mtime, so an unchanged file is not even
+   re-read. Re-running on a folder costs one ``stat`` per file, plus the
+   work for new or changed files.
+2. Extract. PDF text extraction runs in parallel across processes, since
+   it is CPU-bound.
+3. Extract fields. Requests go to the chat model in batches of
+   ``batch_size``, through ``ChatModel.complete_batch``.
+4. Upsert. All rows are written to the Invoice DB sheet with one bulk
+   upsert keyed on the invoice number, instead of an append per row.
+5. Email. Drafts are requested in batches and sent concurrently.
+
+The workflow JSON itself is the configuration. The extraction attributes
+and prompt, the sheet column mapping, the email prompt and its recipient
+all come from its nodes, rendered by the same connectors the runner uses.
+Services default to the stubs in ``services.py``, and ``--db`` keeps the
+stub sheet in a JSON file between runs. The sheet is saved right after the
+upsert and before the ledger, and a file is added to the ledger only after
+its row is written, so a failed file is retried on the next run. A failed
+email is reported for its invoice without stopping the others.
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from connectors import extract_pdf_text, sheet_key
+from engine import Execution, Item
+from services import StubServices
+from workflow import Workflow
+
+INVOICE_WORKFLOW = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Invoice Workflow SBS", "Invoice Workflow SBS.json",
+)
+LEDGER_NAME = ".invoice_ledger.json"
+MATCH_COLUMN = "Invoice Number"
+# Below this many files a process pool costs more than it saves
+MIN_FILES_FOR_PROCESSES = 4
+
+
+@dataclass
+class InvoiceFile:
+    path: str
+    name: str
+    size: int
+    mtime_ns: int
+    sha256: str = ""
+    text: str = ""
+    error: str = ""
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_file(path: str) -> Dict:
+    """Text of one invoice; runs in a worker process"""
+    try:
+        with open(path, "rb") as f:
+            return extract_pdf_text(f.read())
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def load_ledger(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {"files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class InvoicePipeline:
+    def __init__(self, services: Optional[StubServices] = None, workflow_path: str = INVOICE_WORKFLOW,
+                 batch_size: int = 20, workers: Optional[int] = None, send_emails: bool = True,
+                 db_path: Optional[str] = None):
+        self.services = services or StubServices()
+        self.workflow = Workflow.load(workflow_path)
+        self.execution = Execution(self.workflow, self.services)
+        self.batch_size = max(1, batch_size)
+        self.workers = workers or os.cpu_count() or 1
+        self.send_emails = send_emails
+        self.db_path = db_path
+        self.timings: Dict[str, float] = {}
+        if db_path and os.path.exists(db_path):
+            with open(db_path, encoding="utf-8") as f:
+                self.services.sheets[self.db_key] = json.load(f)
+
+    def _node(self, name: str):
+        node = self.workflow.nodes[name]
+        return node, self.execution.connectors[node.type]
+
+    def _timed(self, stage: str, start: float) -> None:
+        self.timings[stage] = time.perf_counter() - start
+
+    @property
+    def db_key(self) -> str:
+        return sheet_key(self.workflow.nodes["Update Invoice DB"])
+
+    def save_db(self) -> None:
+        if self.db_path:
+            save_json(self.db_path, self.services.sheets.get(self.db_key, []))
+
+    # Stages
+
+    def scan(self, folder: str, ledger: Dict, pattern: str = "*.pdf") -> List[InvoiceFile]:
+        """Files in ``folder`` with their hashes, reusing the ledger's hash for unchanged files"""
+        known = {entry["name"]: (sha, entry) for sha, entry in ledger["files"].items()}
+        files = []
+        for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+            if not entry.is_file() or not fnmatch.fnmatch(entry.name.lower(), pattern.lower()):
+                continue
+            stat = entry.stat()
+            file = InvoiceFile(entry.path, entry.name, stat.st_size, stat.st_mtime_ns)
+            sha, previous = known.get(entry.name, ("", {}))
+            if previous.get("size") == file.size and previous.get("mtime_ns") == file.mtime_ns:
+                file.sha256 = sha
+            else:
+                file.sha256 = file_hash(entry.path)
+            files.append(file)
+        return files
+
+    def extract(self, files: List[InvoiceFile]) -> None:
+        paths = [file.path for file in files]
+        if len(paths) < MIN_FILES_FOR_PROCESSES or self.workers <= 1:
+            results = map(extract_file, paths)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(extract_file, paths, chunksize=max(1, len(paths) // (self.workers * 4))))
+        for file, result in zip(files, results):
+            file.text = result.get("text", "")
+            file.error = result.get("error", "") or ("" if file.text.strip() else "no text in file")
+
+    def extract_fields(self, files: List[InvoiceFile]) -> List[Tuple[InvoiceFile, Dict]]:
+        """Sheet row for each of ``files``, in batched model calls; failures are recorded on the file"""
+        extractor, extractor_connector = self._node("Information Extractor")
+        sheet, sheet_connector = self._node("Update Invoice DB")
+        model = extractor_connector.model(self.execution, extractor)
+
+        rows = []
+        for start in range(0, len(files), self.batch_size):
+            batch = files[start:start + self.batch_size]
+            items = [Item({"text": file.text}) for file in batch]
+            requests = [extractor_connector.request(self.execution.params(extractor, item), item) for item in items]
+            for file, request, reply in zip(batch, requests, model.complete_batch(requests)):
+                try:
+                    item = Item(extractor_connector.output(request, reply))
+                    row = sheet_connector.row(item, self.execution.params(sheet, item))
+                except Exception as e:
+                    file.error = f"extraction failed: {type(e).__name__}: {e}"
+                    continue
+                if not row.get(MATCH_COLUMN):
+                    file.error = f"no {MATCH_COLUMN} found"
+                    continue
+                rows.append((file, row))
+        return rows
+
+    def upsert(self, rows: List[Dict]) -> Dict[str, int]:
+        return self.services.sheet_upsert(self.db_key, rows, [MATCH_COLUMN])
+
+    def email(self, rows: List[Dict]) -> Tuple[int, Dict[str, str]]:
+        """Draft and send one email per row; returns the number sent and the errors by invoice number"""
+        writer, writer_connector = self._node("Create Email")
+        sender, _ = self._node("Send email")
+        model = writer_connector.model(self.execution, writer)
+
+        drafts, failed = [], {}
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            items = [Item(row) for row in batch]
+            try:
+                requests = [writer_connector.request(self.execution.params(writer, item), item) for item in items]
+                replies = model.complete_batch(requests)
+            except Exception as e:
+                failed.update((row[MATCH_COLUMN], f"draft failed: {type(e).__name__}: {e}") for row in batch)
+                continue
+            for row, request, reply in zip(batch, requests, replies):
+                try:
+                    drafts.append((row[MATCH_COLUMN], Item(writer_connector.output(request, reply))))
+                except Exception as e:
+                    failed[row[MATCH_COLUMN]] = f"draft failed: {type(e).__name__}: {e}"
+
+        def send(draft: Tuple[str, Item]) -> Optional[str]:
+            _, item = draft
+            try:
+                params = self.execution.params(sender, item)
+                self.services.send_email(params.get("sendTo", ""), params.get("subject", ""), params.get("message", ""))
+            except Exception as e:
+                return f"send failed: {type(e).__name__}: {e}"
+            return None
+
+        sent = 0
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(drafts)))) as pool:
+            for (invoice_number, _), error in zip(drafts, pool.map(send, drafts)):
+                if error:
+                    failed[invoice_number] = error
+                else:
+                    sent += 1
+        return sent, failed
+
+    def run(self, folder: str, ledger_path: Optional[str] = None, pattern: str = "*.pdf") -> Dict:
+        ledger_path = ledger_path or os.path.join(folder, LEDGER_NAME)
+        ledger = load_ledger(ledger_path)
+
+        start = time.perf_counter()
+        files = self.scan(folder, ledger, pattern)
+        unique = {file.sha256: file for file in files}
+        new = [file for sha, file in unique.items() if sha not in ledger["files"]]
+        self._timed("scan", start)
+
+        start = time.perf_counter()
+        self.extract(new)
+        extracted = [file for file in new if not file.error]
+        self._timed("extract", start)
+
+        start = time.perf_counter()
+        written = self.extract_fields(extracted)
+        rows = [row for _, row in written]
+        self._timed("llm", start)
+
+        start = time.perf_counter()
+        counts = self.upsert(rows) if rows else {"updated": 0, "appended": 0}
+        if rows:
+            self.save_db()
+        self._timed("upsert", start)
+
+        # Written rows are saved and in the ledger before any email, so a failed send never re-extracts
+        processed_at = datetime.now().isoformat(timespec="seconds")
+        for file, row in written:
+            ledger["files"][file.sha256] = {
+                "name": file.name, "size": file.size, "mtime_ns": file.mtime_ns,
+                "invoice_number": row[MATCH_COLUMN], "processed_at": processed_at,
+            }
+        # Renamed or rewritten files keep only their latest hash
+        names = {file.name: file.sha256 for file in files}
+        ledger["files"] = {sha: entry for sha, entry in ledger["files"].items() if names.get(entry["name"], sha) == sha}
+        save_json(ledger_path, ledger)
+
+        start = time.perf_counter()
+        emails, email_failed = self.email(rows) if rows and self.send_emails else (0, {})
+        self._timed("email", start)
+
+        return {
+            "files": len(files),
+            "skipped": len(files) - len(new),
+            "new": len(new),
+            "written": len(rows),
+            "updated": counts["updated"],
+            "appended": counts["appended"],
+            "emails": emails,
+            "failed": {file.name: file.error for file in new if file.error},
+            "email_failed": email_failed,
+            "seconds": dict(self.timings),
+        }
+
+
+def describe(summary: Dict) -> str:
+    lines = [
+        f"{summary['files']} files: {summary['skipped']} already processed, {summary['new']} new",
+        f"{summary['written']} rows written in one upsert ({summary['appended']} appended, "
+        f"{summary['updated']} updated), {summary['emails']} emails sent",
+        "Stages: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in summary["seconds"].items()),
+    ]
+    lines += [f"failed: {name}: {error}" for name, error in summary["failed"].items()]
+    lines += [f"email failed: {invoice}: {error}" for invoice, error in summary["email_failed"].items()]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Extract every invoice in a folder into the Invoice DB")
+    parser.add_argument("folder")
+    parser.add_argument("--workflow", default=INVOICE_WORKFLOW)
+    parser.add_argument("--pattern", default="*.pdf")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=20, help="Invoices per model batch")
+    parser.add_argument("--ledger", help=f"Processed-file ledger (default: <folder>/{LEDGER_NAME})")
+    parser.add_argument("--db", help="JSON file holding the stub Invoice DB between runs")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency per service call")
+    parser.add_argument("--no-email", action="store_true")
+    parser.add_argument("--live-models", action="store_true", help="Call real LLM endpoints")
+    args = parser.parse_args(argv)
+
+    services = StubServices(latency_ms=args.latency_ms, live_models=args.live_models)
+    pipeline = InvoicePipeline(services, args.workflow, args.batch_size, args.workers, not args.no_email, args.db)
+    summary = pipeline.run(args.folder, args.ledger, args.pattern)
+    print(describe(summary))
+    return 1 if summary["failed"] or summary["email_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""Bulk runner for the LinkedIn content workflow.
+
+The n8n workflow handles one row per execution. "Get row(s) in sheet"
+returns the first "To Do" topic, which then goes through a Tavily search,
+the Groq agent and a single-row update. This runner does the whole content
+calendar in one pass:
+
+    python linkedin.py --scale 25 --latency-ms 400
+    python linkedin.py --limit groq=0.5/5 --limit tavily=2/5 --live-models
+
+- All pending rows are read with one sheet call.
+- Each row is searched and then generated on a thread pool of
+  ``concurrency`` workers. A row's generation starts as soon as its own
+  search returns.
+- Every provider call goes through that provider's token bucket
+  (``--limit provider=rate/burst``, requests per second and burst). The
+  defaults match Groq's free tier (30 requests per minute) and a
+  conservative Tavily rate. Timeouts, connection errors, 429s and 5xx
+  responses are retried with backoff; any other error fails the row at
+  once without spending more of the budget.
+- Search results are cached per topic. Rows sharing a topic share one
+  search, even while it is in flight, and ``--cache`` keeps the results
+  between runs.
+- Finished rows go back in one batched sheet update keyed on Topic. A row
+  that failed stays "To Do" for the next run.
+
+The request body, agent prompt and sheet mapping are rendered from the
+workflow JSON by the runner's connectors. Search and sheets use the stub
+services, and the model is stubbed unless ``--live-models`` is given.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from connectors import sheet_key
+from engine import Execution, Item
+from services import StubServices
+from workflow import Workflow
+
+LINKEDIN_WORKFLOW = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "LinkedIn Content Workflow", "Linkedin Content Creator Workflow.json",
+)
+SCENARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios", "linkedin_content_creator_workflow.json")
+
+READ_NODE = "Get row(s) in sheet"
+SEARCH_NODE = "Tevily Web Search"
+AGENT_NODE = "AI Agent"
+UPDATE_NODE = "Update row in sheet"
+
+# provider: (requests per second, burst)
+DEFAULT_LIMITS: Dict[str, Tuple[float, int]] = {
+    "tavily": (2.0, 5),
+    "groq": (0.5, 5),
+}
+RETRIES = 3
+
+
+class RateLimit:
+    """Token bucket allowing ``rate`` calls per second in bursts of up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.waited = 0.0
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.calls += 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for failures worth retrying: timeouts, dropped connections, 429 and 5xx responses"""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, (urllib.error.URLError, TimeoutError, ConnectionError))
+
+
+def parse_limit(text: str) -> Tuple[str, Tuple[float, int]]:
+    """``groq=0.5/5`` -> ("groq", (0.5, 5))"""
+    match = re.fullmatch(r"(\w+)=([\d.]+)(?:/(\d+))?", text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected provider=rate[/burst], got {text!r}")
+    return match.group(1), (float(match.group(2)), int(match.group(3) or 1))
+
+
+class SearchCache:
+    """Search responses per request body; concurrent lookups of one body share a single call"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.pending: Dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(body: Dict) -> str:
+        body = dict(body, query=" ".join(str(body.get("query", "")).lower().split()))
+        return json.dumps(body, sort_keys=True)
+
+    def get(self, body: Dict, fetch) -> Dict:
+        key = self.key(body)
+        while True:
+            with self.lock:
+                if key in self.entries:
+                    self.hits += 1
+                    return self.entries[key]
+                event = self.pending.get(key)
+                if event is None:
+                    event = self.pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            event.wait()
+        try:
+            result = fetch()
+            with self.lock:
+                self.entries[key] = result
+            return result
+        finally:
+            with self.lock:
+                del self.pending[key]
+            event.set()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with self.lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+
+class ContentRunner:
+    def __init__(self, services: Optional[StubServices] = None, workflow_path: str = LINKEDIN_WORKFLOW,
+                 concurrency: int = 16, limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 cache: Optional[SearchCache] = None):
+        self.services = services or StubServices()
+        self.workflow = Workflow.load(workflow_path)
+        self.execution = Execution(self.workflow, self.services)
+        self.concurrency = max(1, concurrency)
+        self.limits = {name: RateLimit(*limit) for name, limit in {**DEFAULT_LIMITS, **(limits or {})}.items()}
+        self.cache = cache or SearchCache()
+
+    def _node(self, name: str):
+        node = self.workflow.nodes[name]
+        return node, self.execution.connectors[node.type]
+
+    def _call(self, provider: str, fn):
+        """``fn()`` within ``provider``'s rate limit, retrying transient failures with backoff"""
+        limit = self.limits.get(provider)
+        for attempt in range(RETRIES):
+            if limit is not None:
+                limit.acquire()
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == RETRIES - 1 or not is_transient(e):
+                    raise
+                time.sleep(2 ** attempt)
+
+    def pending_rows(self) -> List[Dict]:
+        """Every row the workflow's read node matches, not only the first"""
+        node, _ = self._node(READ_NODE)
+        params = self.execution.params(node, Item({}))
+        filters = [(f["lookupColumn"], f.get("lookupValue", "")) for f in params.get("filtersUI", {}).get("values", [])]
+        return self.services.sheet_read(sheet_key(node), filters)
+
+    def search(self, row_item: Item) -> Dict:
+        node, _ = self._node(SEARCH_NODE)
+        params = self.execution.params(node, row_item)
+        body = params.get("jsonBody")
+        body = json.loads(body) if isinstance(body, str) else body
+        # Only the body goes to the services; the node's Authorization header never leaves the workflow file
+        return self.cache.get(body, lambda: self._call(
+            "tavily", lambda: self.services.http(params.get("method", "POST"), params["url"], body),
+        ))
+
+    def generate(self, search_item: Item) -> Dict:
+        node, connector = self._node(AGENT_NODE)
+        model = connector.model(self.execution, node)
+        request = connector.request(self.execution.params(node, search_item), search_item)
+        return connector.output(request, self._call(model.provider, lambda: model.complete(request)))
+
+    def process(self, row: Dict) -> Dict:
+        """Search and write the post for one row; returns its sheet update"""
+        row_item = Item(row)
+        row_item.lineage[READ_NODE] = row
+        search_item = row_item.derive(self.search(row_item))
+        search_item.lineage[SEARCH_NODE] = search_item.json
+        agent_item = search_item.derive(self.generate(search_item))
+        update, connector = self._node(UPDATE_NODE)
+        return connector.row(agent_item, self.execution.params(update, agent_item))
+
+    def run(self) -> Dict:
+        start = time.perf_counter()
+        rows = self.pending_rows()
+        updates, failed = [], {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [(row, pool.submit(self.process, row)) for row in rows]
+            for row, future in futures:
+                try:
+                    updates.append(future.result())
+                except Exception as e:
+                    failed[str(row.get("Topic"))] = f"{type(e).__name__}: {e}"
+
+        update, _ = self._node(UPDATE_NODE)
+        if updates:
+            match_columns = update.parameters.get("columns", {}).get("matchingColumns", [])
+            self.services.sheet_update(sheet_key(update), updates, match_columns)
+        self.cache.save()
+        return {
+            "pending": len(rows),
+            "written": len(updates),
+            "failed": failed,
+            "searches": self.cache.misses,
+            "cache_hits": self.cache.hits,
+            "throttled": {name: limit.waited for name, limit in self.limits.items() if limit.calls},
+            "seconds": time.perf_counter() - start,
+        }
+
+
+def describe(summary: Dict) -> str:
+    lines = [
+        f"{summary['pending']} pending rows, {summary['written']} posts written back in one update, "
+        f"{len(summary['failed'])} failed, in {summary['seconds']:.1f}s",
+        f"Searches: {summary['searches']} sent, {summary['cache_hits']} served from the topic cache",
+        "Rate-limit waits, summed over workers: " + ", ".join(f"{name} {waited:.1f}s" for name, waited in summary["throttled"].items()),
+    ]
+    lines += [f"failed: {topic}: {error}" for topic, error in summary["failed"].items()]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Write every pending LinkedIn post in the content calendar")
+    parser.add_argument("--workflow", default=LINKEDIN_WORKFLOW)
+    parser.add_argument("--scenario", default=SCENARIO, help="Scenario holding the content calendar sheet")
+    parser.add_argument("--scale", type=int, default=1, help="Multiply the calendar's rows")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--limit", type=parse_limit, action="append", default=[],
+                        help="provider=rate/burst, e.g. groq=0.5/5 (requests per second)")
+    parser.add_argument("--cache", help="JSON file keeping search results between runs")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency per service call")
+    parser.add_argument("--live-models", action="store_true", help="Call the real Groq endpoint")
+    args = parser.parse_args(argv)
+
+    services = StubServices.from_file(args.scenario, latency_ms=args.latency_ms, scale=args.scale,
+                                      live_models=args.live_models)
+    runner = ContentRunner(services, args.workflow, args.concurrency, dict(args.limit), SearchCache(args.cache))
+    summary = runner.run()
+    print(describe(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Chat model adapters for the LLM nodes.
+
+Every LLM node (Information Extractor, AI Agent, OpenAI message) turns its
+items into ``ChatRequest`` objects and hands the whole batch to
+``ChatModel.complete_batch``. The base implementation fans the batch out
+over a small thread pool. An adapter for a provider with a real batch
+endpoint can override it.
+
+``StubChatModel`` answers offline and deterministically, after a simulated
+latency:
+
+- with a ``schema`` it returns a JSON object whose values are read from
+  ``Label: value`` lines in the prompt, so an invoice's fields come back
+  from its own text;
+- with ``json_output`` it returns ``{"subject": ..., "body": ...}`` drawn
+  from the first user message;
+- otherwise it returns a short post built from the prompt's first sentences.
+
+``OpenAICompatibleChatModel`` calls a live chat completions endpoint (Groq
+and OpenAI both expose one), with the key read from the environment.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+BASE_URLS = {
+    "groq": "https://api.groq.com/openai/v1",
+    "openai": "https://api.openai.com/v1",
+}
+API_KEY_ENV = {"groq": "GROQ_API_KEY", "openai": "OPENAI_API_KEY"}
+
+FENCE = re.compile(r"^```\w*\n|\n```\s*$")
+
+
+@dataclass
+class ChatRequest:
+    messages: List[Dict[str, str]]
+    # Attribute name -> description, for structured extraction
+    schema: Optional[Dict[str, str]] = None
+    json_output: bool = False
+
+    @property
+    def prompt(self) -> str:
+        return "\n\n".join(m["content"] for m in self.messages if m.get("role", "user") == "user")
+
+
+def parse_json(text: str):
+    """JSON from a model reply, tolerating a Markdown fence around it"""
+    return json.loads(FENCE.sub("", text.strip()))
+
+
+class ChatModel:
+    provider = ""
+
+    def __init__(self, model: str, max_concurrency: int = 8):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, request: ChatRequest) -> str:
+        raise NotImplementedError
+
+    def complete_batch(self, requests: List[ChatRequest]) -> List[str]:
+        """Replies in request order"""
+        if len(requests) <= 1 or self.max_concurrency <= 1:
+            return [self.complete(request) for request in requests]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(requests))) as pool:
+            return list(pool.map(self.complete, requests))
+
+    def _count(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+
+class StubChatModel(ChatModel):
+    def __init__(self, model: str, provider: str = "", latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 seed: Optional[int] = None, max_concurrency: int = 8):
+        super().__init__(model, max_concurrency)
+        self.provider = provider
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.random = random.Random(seed)
+
+    def _delay(self) -> None:
+        with self._lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        delay = max(0.0, self.latency_ms + jitter) / 1000
+        if delay:
+            time.sleep(delay)
+
+    def complete(self, request: ChatRequest) -> str:
+        self._count()
+        self._delay()
+        prompt = request.prompt
+        if request.schema:
+            return json.dumps({name: self._field(prompt, name) for name in request.schema})
+        if request.json_output:
+            message = next((m["content"] for m in request.messages if m.get("role", "user") == "user"), "")
+            first = next((line.strip() for line in message.splitlines() if line.strip()), "")
+            return json.dumps({"subject": first[:78], "body": message.strip()})
+        return self._summary(prompt)
+
+    @staticmethod
+    def _field(text: str, name: str) -> Optional[str]:
+        words = r"\W+".join(map(re.escape, name.split()))
+        match = re.search(rf"^\W*{words}\W*[:\-]\s*(.+?)\s*$", text, re.I | re.M)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _summary(prompt: str) -> str:
+        sentences = []
+        for line in prompt.splitlines():
+            line = re.sub(r"^[\w ]{1,20}:\s*", "", line.strip())
+            if line:
+                sentences.append(re.split(r"(?<=[.!?])\s", line, maxsplit=1)[0])
+        body = " ".join(sentences)[:600] or "No material to summarise."
+        return f"{body}\n\n#insights #leadership"
+
+
+class OpenAICompatibleChatModel(ChatModel):
+    def __init__(self, model: str, provider: str, max_concurrency: int = 4, timeout: float = 60.0):
+        super().__init__(model, max_concurrency)
+        self.provider = provider
+        self.url = BASE_URLS[provider] + "/chat/completions"
+        self.timeout = timeout
+        self.api_key = os.environ.get(API_KEY_ENV[provider], "")
+        if not self.api_key:
+            raise RuntimeError(f"{API_KEY_ENV[provider]} is not set")
+
+    def complete(self, request: ChatRequest) -> str:
+        self._count()
+        messages = list(request.messages)
+        if request.schema:
+            fields = "\n".join(f"- {name}: {description}" for name, description in request.schema.items())
+            messages.append({
+                "role": "user",
+                "content": f"Return only a JSON object with these keys, null when unknown:\n{fields}",
+            })
+        payload = {"model": self.model, "messages": messages}
+        if request.schema or request.json_output:
+            payload["response_format"] = {"type": "json_object"}
+        req = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode(), method="POST",
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            return json.load(response)["choices"][0]["message"]["content"]
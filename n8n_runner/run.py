@@ -0,0 +1,85 @@
+"""Run an n8n workflow export locally against stub services.
+
+    python run.py "../Invoice Workflow SBS/Invoice Workflow SBS.json"
+    python run.py ../AI_HR\\ System/AI_HR.json --start "On form submission"
+    python run.py "../LinkedIn Content Workflow/Linkedin Content Creator Workflow.json" \\
+        --latency-ms 100 --scale 50 --compare-serial
+
+The scenario (``--scenario``, by default ``scenarios/<workflow name>.json``)
+supplies trigger events, sheet contents, Drive files and the clock; see
+``services.py``. ``--latency-ms`` gives every stubbed call, LLM calls
+included, a simulated round trip. ``--compare-serial`` replays the same
+scenario one item and one node at a time, the way n8n executes, and reports
+the speedup. ``--live-models`` sends LLM nodes to the real Groq/OpenAI
+endpoints (keys from ``GROQ_API_KEY`` / ``OPENAI_API_KEY``), while every
+other service stays stubbed.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+from engine import run_workflow
+from services import StubServices
+from workflow import Workflow
+
+SCENARIOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+
+
+def default_scenario(workflow: Workflow) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "_", workflow.name.lower()).strip("_")
+    return os.path.join(SCENARIOS_DIR, f"{slug}.json")
+
+
+def services_for(args, scenario: str) -> StubServices:
+    options = dict(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed, scale=args.scale,
+                   live_models=args.live_models)
+    if scenario and os.path.exists(scenario):
+        return StubServices.from_file(scenario, **options)
+    return StubServices(**options)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workflow", help="n8n workflow JSON export")
+    parser.add_argument("--scenario", help="Scenario JSON (default: scenarios/<workflow name>.json)")
+    parser.add_argument("--start", action="append", help="Start node; repeat for several (default: every start node)")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency per service call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--scale", type=int, default=1, help="Multiply trigger events and sheet rows")
+    parser.add_argument("--compare-serial", action="store_true", help="Also run one item at a time and compare")
+    parser.add_argument("--live-models", action="store_true", help="Call real LLM endpoints")
+    parser.add_argument("--show", action="append", default=[], help="Print the output items of this node")
+    args = parser.parse_args(argv)
+
+    workflow = Workflow.load(args.workflow)
+    scenario = args.scenario or default_scenario(workflow)
+    for name in args.start or []:
+        if name not in workflow.nodes:
+            parser.error(f"no node named {name!r} in {workflow.name}")
+
+    services = services_for(args, scenario)
+    result = run_workflow(workflow, services, args.start, batch_size=args.batch_size, concurrency=args.concurrency)
+    print(result.report())
+    print()
+    print(services.summary())
+    for name in args.show:
+        for index, output in enumerate(result.outputs.get(name, [])):
+            print(f"\n{name} output {index}:")
+            for item in output:
+                print(json.dumps(item.json, indent=2, default=str))
+
+    if args.compare_serial:
+        serial = run_workflow(workflow, services_for(args, scenario), args.start, batch_size=1, concurrency=1)
+        print()
+        print(f"Serial, one item at a time: {serial.seconds:.2f}s")
+        print(f"Batched and concurrent:     {result.seconds:.2f}s ({serial.seconds / max(result.seconds, 1e-9):.1f}x)")
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
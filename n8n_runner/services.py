@@ -0,0 +1,258 @@
+"""In-memory stand-ins for the services the workflows call.
+
+``StubServices`` is built from a scenario file:
+
+    {
+      "now": "2025-05-12T08:00:00",
+      "triggers": {"Google Drive Trigger": [{"id": "inv-1", "name": "a.pdf"}]},
+      "sheets": {"HR Department/Employee Review Schedule": [{"Name": "Ana", ...}]},
+      "drive": {"inv-1": {"name": "a.pdf", "mimeType": "application/pdf", "path": "invoices/a.pdf"}},
+      "scale_keys": ["id", "Topic"]
+    }
+
+Sheets are keyed ``<document>/<sheet>`` by their names in the workflow. A
+drive file has either ``path`` (read from disk, relative to the scenario) or
+inline ``text``. ``now`` pins the clock for date-dependent Code nodes.
+
+Every call sleeps ``latency_ms`` (plus jitter) and is counted. Sheet reads
+and writes take a whole batch of rows per call, like the Sheets batch API.
+Sent mail, Telegram messages and calendar events go to in-memory outboxes.
+HTTP requests are answered by routes: Tavily search and OpenAI image
+generation have built-in fakes, and ``services.routes[host] = fn`` adds more.
+
+``scale`` multiplies trigger events and sheet rows for benchmarking. Copies
+get ``-<n>`` appended to the fields named in ``scale_keys``, and drive files
+are cloned under the new ids, so each copy stays distinct.
+"""
+import base64
+import copy
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from models import ChatModel, OpenAICompatibleChatModel, StubChatModel
+
+# 1x1 transparent PNG, what the image stub "generates"
+PIXEL_PNG = base64.b64encode(
+    bytes.fromhex(
+        "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+        "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+    )
+).decode()
+
+
+ANGLES = ["Adoption costs", "Team skills", "Customer outcomes", "Regulatory changes", "Early pilots"]
+
+
+def tavily_search(body: Dict) -> Dict:
+    query = str(body.get("query", "")).strip()
+    results = [
+        {
+            "title": f"{query} — perspective {n}",
+            "url": f"https://example.com/{zlib.crc32(f'{query}/{n}'.encode()):08x}",
+            "content": (
+                f"{ANGLES[n % len(ANGLES)]} are where {query.lower()} is moving fastest. "
+                f"Source {n} highlights practical lessons and measurable results."
+            ),
+            "score": round(1 - n / 10, 2),
+        }
+        for n in range(1, int(body.get("max_results") or 5) + 1)
+    ]
+    return {"query": query, "answer": f"Recent coverage of {query}.", "results": results, "response_time": 0.0}
+
+
+def openai_images(body: Dict) -> Dict:
+    return {"created": int(time.time()), "data": [{"b64_json": PIXEL_PNG}]}
+
+
+DEFAULT_ROUTES: Dict[str, Callable[[str, str, Dict], Dict]] = {
+    "api.tavily.com": lambda method, path, body: tavily_search(body),
+    "api.openai.com": lambda method, path, body: openai_images(body) if path.startswith("/v1/images") else {},
+}
+
+
+class ServiceError(Exception):
+    pass
+
+
+class StubServices:
+    def __init__(self, scenario: Optional[Dict] = None, base_dir: str = ".", latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, seed: Optional[int] = None, scale: int = 1, live_models: bool = False):
+        scenario = copy.deepcopy(scenario or {})
+        self.base_dir = base_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.seed = seed
+        self.live_models = live_models
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.clock = datetime.fromisoformat(scenario["now"]) if scenario.get("now") else None
+
+        keys = scenario.get("scale_keys", ["id"])
+        self.triggers: Dict[str, List[Dict]] = {
+            name: self._scaled(events, keys, scale) for name, events in (scenario.get("triggers") or {}).items()
+        }
+        self.sheets: Dict[str, List[Dict]] = {
+            name: self._scaled(rows, keys, scale) for name, rows in (scenario.get("sheets") or {}).items()
+        }
+        self.drive: Dict[str, Dict] = dict(scenario.get("drive") or {})
+        for file_id, meta in list(self.drive.items()):
+            for n in range(1, scale):
+                self.drive[f"{file_id}-{n}"] = meta
+
+        self.routes = dict(DEFAULT_ROUTES)
+        self.outbox: List[Dict] = []
+        self.telegram_messages: List[Dict] = []
+        self.calendar_events: List[Dict] = []
+        self.models: Dict[Tuple[str, str], ChatModel] = {}
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "StubServices":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), base_dir=os.path.dirname(os.path.abspath(path)), **kwargs)
+
+    @staticmethod
+    def _scaled(rows: List[Dict], keys: List[str], scale: int) -> List[Dict]:
+        scaled = [dict(row) for row in rows]
+        for n in range(1, scale):
+            for row in rows:
+                scaled.append({k: f"{v}-{n}" if k in keys else v for k, v in row.items()})
+        return scaled
+
+    def now(self) -> datetime:
+        return self.clock or datetime.now()
+
+    def _call(self, service: str) -> None:
+        with self.lock:
+            self.calls[service] += 1
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        delay = max(0.0, self.latency_ms + jitter) / 1000
+        if delay:
+            time.sleep(delay)
+
+    def trigger_events(self, node_name: str) -> Optional[List[Dict]]:
+        events = self.triggers.get(node_name)
+        return [dict(event) for event in events] if events is not None else None
+
+    # Google Sheets
+
+    def sheet_read(self, key: str, filters: List[Tuple[str, str]], first_match: bool = False) -> List[Dict]:
+        self._call("sheets.read")
+        with self.lock:
+            rows = self.sheets.get(key, [])
+            matches = [
+                dict(row, row_number=index + 2) for index, row in enumerate(rows)
+                if all(str(row.get(column, "")) == str(value) for column, value in filters)
+            ]
+        return matches[:1] if first_match else matches
+
+    def sheet_append(self, key: str, rows: List[Dict]) -> List[Dict]:
+        self._call("sheets.append")
+        with self.lock:
+            self.sheets.setdefault(key, []).extend(dict(row) for row in rows)
+        return rows
+
+    def sheet_update(self, key: str, rows: List[Dict], match_columns: List[str]) -> List[Dict]:
+        """Update the row matching each of ``rows`` on ``match_columns``; rows that match nothing are ignored"""
+        self._call("sheets.update")
+        with self.lock:
+            sheet = self.sheets.setdefault(key, [])
+            index = {tuple(str(row.get(c, "")) for c in match_columns): row for row in sheet}
+            for row in rows:
+                target = index.get(tuple(str(row.get(c, "")) for c in match_columns))
+                if target is not None:
+                    target.update(row)
+        return rows
+
+    def sheet_upsert(self, key: str, rows: List[Dict], match_columns: List[str]) -> Dict[str, int]:
+        """Update rows matching on ``match_columns`` and append the rest, all in one call"""
+        self._call("sheets.upsert")
+        counts = {"updated": 0, "appended": 0}
+        with self.lock:
+            sheet = self.sheets.setdefault(key, [])
+            index = {tuple(str(row.get(c, "")) for c in match_columns): row for row in sheet}
+            for row in rows:
+                match = tuple(str(row.get(c, "")) for c in match_columns)
+                if match in index:
+                    index[match].update(row)
+                    counts["updated"] += 1
+                else:
+                    index[match] = dict(row)
+                    sheet.append(index[match])
+                    counts["appended"] += 1
+        return counts
+
+    # Google Drive, Gmail, Telegram, Calendar
+
+    def drive_download(self, file_id: str) -> Dict:
+        self._call("drive.download")
+        meta = self.drive.get(file_id)
+        if meta is None:
+            raise ServiceError(f"Drive file {file_id} not found")
+        if "path" in meta:
+            with open(os.path.join(self.base_dir, meta["path"]), "rb") as f:
+                data = f.read()
+        else:
+            data = meta.get("text", "").encode("utf-8")
+        return {"id": file_id, "name": meta.get("name", file_id), "mimeType": meta.get("mimeType", ""), "data": data}
+
+    def send_email(self, to: str, subject: str, body: str, attachments: Optional[List[str]] = None) -> Dict:
+        self._call("gmail.send")
+        with self.lock:
+            message_id = f"msg-{len(self.outbox) + 1}"
+            self.outbox.append({"id": message_id, "to": to, "subject": subject, "body": body,
+                                "attachments": attachments or []})
+        return {"id": message_id, "threadId": message_id, "labelIds": ["SENT"]}
+
+    def send_telegram(self, chat_id: str, text: str) -> Dict:
+        self._call("telegram.send")
+        with self.lock:
+            self.telegram_messages.append({"chat_id": chat_id, "text": text})
+            message_id = len(self.telegram_messages)
+        return {"ok": True, "result": {"message_id": message_id, "chat": {"id": chat_id}, "text": text}}
+
+    def create_event(self, calendar: str, start: str, end: str, description: str = "") -> Dict:
+        self._call("calendar.create")
+        with self.lock:
+            event = {"id": f"evt-{len(self.calendar_events) + 1}", "organizer": {"email": calendar},
+                     "start": {"dateTime": start}, "end": {"dateTime": end}, "description": description}
+            self.calendar_events.append(event)
+        return event
+
+    # HTTP and models
+
+    def http(self, method: str, url: str, body: Optional[Dict] = None) -> Dict:
+        parsed = urlparse(url)
+        route = self.routes.get(parsed.hostname or "")
+        if route is None:
+            raise ServiceError(f"No stub route for {parsed.hostname}; add one to services.routes")
+        self._call(f"http.{parsed.hostname}")
+        return route(method, parsed.path, body or {})
+
+    def chat_model(self, provider: str, model: str) -> ChatModel:
+        with self.lock:
+            key = (provider, model)
+            if key not in self.models:
+                if self.live_models:
+                    self.models[key] = OpenAICompatibleChatModel(model, provider)
+                else:
+                    self.models[key] = StubChatModel(model, provider, self.latency_ms, self.jitter_ms, self.seed)
+            return self.models[key]
+
+    def summary(self) -> str:
+        lines = ["Service calls:"]
+        lines += [f"  {name:<36} {count:>6}" for name, count in sorted(self.calls.items())]
+        lines += [f"  {f'llm.{provider}/{model}':<36} {m.calls:>6}" for (provider, model), m in sorted(self.models.items())]
+        lines.append(
+            f"Side effects: {len(self.outbox)} emails, {len(self.telegram_messages)} Telegram messages, "
+            f"{len(self.calendar_events)} calendar events"
+        )
+        return "\n".join(lines)
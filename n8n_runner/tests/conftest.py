@@ -0,0 +1,5 @@
+import os
+import sys
+
+# n8n_runner is a flat set of modules run from its own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
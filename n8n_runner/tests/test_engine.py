@@ -0,0 +1,45 @@
+from connectors import CONNECTORS, Connector
+from engine import run_workflow
+from workflow import Workflow
+
+
+class PassThrough(Connector):
+    """Hands its input items on unchanged, as a custom connector may"""
+    batch_size = 0
+
+    def run_batch(self, execution, node, items):
+        return [items]
+
+
+def node(name, node_type="test.passThrough"):
+    return {"name": name, "type": node_type, "parameters": {}}
+
+
+def to(*names):
+    return {"main": [[{"node": name, "type": "main", "index": 0} for name in names]]}
+
+
+def test_fan_out_branches_keep_their_own_lineage():
+    workflow = Workflow({
+        "name": "fan-out",
+        "nodes": [node("Trigger", "n8n-nodes-base.manualTrigger"), node("Split"), node("Left"), node("Right"),
+                  node("After Right", "n8n-nodes-base.set")],
+        "connections": {"Trigger": to("Split"), "Split": to("Left", "Right"), "Right": to("After Right")},
+        "pinData": {"Trigger": [{"json": {"id": 1}}]},
+    })
+    workflow.nodes["After Right"].parameters = {"assignments": {"assignments": [
+        {"name": "left", "value": "={{ $('Left').item.json.id }}"},
+    ]}}
+    connectors = dict(CONNECTORS, **{"test.passThrough": PassThrough()})
+    result = run_workflow(workflow, connectors=connectors)
+
+    left, = result.outputs["Left"][0]
+    right, = result.outputs["Right"][0]
+    assert left is not right
+    assert set(left.lineage) == {"Trigger", "Split", "Left"}
+    assert set(right.lineage) == {"Trigger", "Split", "Right"}
+    assert set(result.outputs["Split"][0][0].lineage) == {"Trigger", "Split"}
+
+    # $('Left') is not an ancestor of the right branch, so it cannot be paired
+    assert result.nodes["After Right"].status == "error"
+    assert "no item from 'Left'" in result.nodes["After Right"].error
@@ -0,0 +1,81 @@
+import pytest
+
+from expressions import ExpressionError, JsArray, JsObject, evaluate, render, translate, wrap
+
+
+def names(**values):
+    namespace = {"_json": wrap(values)}
+    return lambda: namespace
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("$json.total > 100 && $json.status === 'open'", True),
+    ("$json.total > 100 || !$json.flagged", True),
+    ("$json.status !== 'open'", False),
+    ("$json.missing === undefined", True),
+    ("$json.missing == null", True),
+    ("$json.total > 500 ? 'large' : 'small'", "small"),
+    ("$json.tags.length", 2),
+    ("$json.tags[5]", None),
+    ("$json.customer.name", "Ana"),
+    ("$json.items", 3),
+    ("'a && b || !c'", "a && b || !c"),
+    ("`$json === null`", "$json === null"),
+    ("true && !false", True),
+])
+def test_translate_follows_javascript(expression, expected):
+    assert evaluate(expression, names(total=250, status="open", flagged=False, tags=["x", "y"],
+                                      customer={"name": "Ana"}, items=3)()) == expected
+
+
+def test_translate_is_cached():
+    assert translate("$json.total + 1") is translate("$json.total + 1")
+
+
+@pytest.mark.parametrize("expression", [
+    "$json.__class__",
+    "().__class__.__bases__",
+    "$json.total +",
+])
+def test_translate_refuses_dunders_and_bad_syntax(expression):
+    with pytest.raises(ExpressionError):
+        translate(expression)
+
+
+def test_evaluation_errors_name_the_expression():
+    with pytest.raises(ExpressionError, match="isBirthday"):
+        evaluate('isBirthday ? "Birthday" : "Anniversary"', names()())
+
+
+def test_missing_properties_are_undefined():
+    value = wrap({"a": {"b": [1, {"c": 2}]}})
+    assert isinstance(value, JsObject) and isinstance(value.a.b, JsArray)
+    assert value.a.b[1].c == 2
+    assert value.nope is None and value["nope"] is None
+
+
+def test_render_keeps_the_type_of_a_single_expression():
+    namespace = names(total=250, customer={"name": "Ana"}, tags=["x"])
+    assert render("={{ $json.total }}", namespace) == 250
+    assert render("={{ $json.customer }}", namespace) == {"name": "Ana"}
+    assert type(render("={{ $json.customer }}", namespace)) is dict
+    assert render("={{ $json.tags }}", namespace) == ["x"]
+
+
+def test_render_formats_values_into_text():
+    namespace = names(total=250.0, paid=True, missing=None, tags=["x"])
+    assert render("=Total {{ $json.total }} paid={{ $json.paid }}", namespace) == "Total 250 paid=true"
+    assert render("=[{{ $json.missing }}] {{ $json.tags }}", namespace) == '[] ["x"]'
+
+
+def test_render_leaves_literals_and_walks_containers():
+    calls = []
+
+    def namespace():
+        calls.append(1)
+        return {"_json": wrap({"id": 7})}
+
+    assert render("plain {{ $json.id }}", namespace) == "plain {{ $json.id }}"
+    assert calls == []
+    value = {"a": ["={{ $json.id }}", 1], "sheet": {"__rl": True, "mode": "list", "value": "={{ $json.id }}"}}
+    assert render(value, namespace) == {"a": [7, 1], "sheet": 7}
@@ -0,0 +1,76 @@
+import pytest
+
+from connectors import If
+
+
+def condition(left, operation, right=None, kind="string"):
+    return {"leftValue": left, "rightValue": right, "operator": {"type": kind, "operation": operation}}
+
+
+@pytest.mark.parametrize("left, operation, right, expected", [
+    ("Sick Leave", "equals", "Sick Leave", True),
+    ("Sick Leave", "notEquals", "Vacation", True),
+    ("Sick Leave", "contains", "Leave", True),
+    ("Sick Leave", "notContains", "Leave", False),
+    ("Sick Leave", "startsWith", "Sick", True),
+    ("Sick Leave", "notStartsWith", "Sick", False),
+    ("Sick Leave", "endsWith", "Leave", True),
+    ("Sick Leave", "notEndsWith", "Leave", False),
+    ("INV-1001", "regex", r"^INV-\d+$", True),
+    ("INV-1001", "notRegex", r"^INV-\d+$", False),
+    (None, "equals", "", True),
+    ("a", "unknownOperation", "a", False),
+])
+def test_string_operators(left, operation, right, expected):
+    assert If.check(condition(left, operation, right), case_sensitive=True) is expected
+
+
+def test_string_case_sensitivity():
+    assert not If.check(condition("Vacation", "equals", "vacation"), case_sensitive=True)
+    assert If.check(condition("Vacation", "equals", "vacation"), case_sensitive=False)
+    assert If.check(condition("VACATION", "regex", "^vac"), case_sensitive=False)
+
+
+@pytest.mark.parametrize("left, operation, right, expected", [
+    (2, "lte", 3, True),
+    ("5", "gt", 3, True),
+    (3, "gte", "3", True),
+    (1.5, "lt", 1, False),
+    (2, "equals", 2.0, True),
+    (2, "notEquals", 2, False),
+    ("two", "gt", 1, False),
+    (None, "lt", 1, False),
+])
+def test_number_operators(left, operation, right, expected):
+    assert If.check(condition(left, operation, right, "number"), case_sensitive=True) is expected
+
+
+@pytest.mark.parametrize("left, operation, right, expected", [
+    (True, "true", None, True),
+    ("false", "false", None, True),
+    ("TRUE", "true", None, True),
+    (True, "equals", "true", True),
+    (False, "notEquals", True, True),
+])
+def test_boolean_operators(left, operation, right, expected):
+    assert If.check(condition(left, operation, right, "boolean"), case_sensitive=True) is expected
+
+
+@pytest.mark.parametrize("left, operation, expected", [
+    (None, "exists", False),
+    (0, "exists", True),
+    (None, "notExists", True),
+    ("", "empty", True),
+    ([], "empty", True),
+    ({"a": 1}, "notEmpty", True),
+    (0, "empty", False),
+])
+def test_presence_operators(left, operation, expected):
+    assert If.check(condition(left, operation), case_sensitive=True) is expected
+
+
+def test_combinators():
+    passing, failing = condition(1, "equals", 1, "number"), condition(1, "equals", 2, "number")
+    assert If().matches({"combinator": "and", "conditions": [passing, passing]})
+    assert not If().matches({"combinator": "and", "conditions": [passing, failing]})
+    assert If().matches({"combinator": "or", "conditions": [failing, passing]})
@@ -0,0 +1,90 @@
+"""Each workflow replayed end to end against its scenario, checking the side effects"""
+import os
+
+import pytest
+
+from engine import run_workflow
+from run import default_scenario, main
+from services import StubServices
+from workflow import Workflow
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+AI_HR = os.path.join(ROOT, "AI_HR System", "AI_HR.json")
+INVOICE = os.path.join(ROOT, "Invoice Workflow SBS", "Invoice Workflow SBS.json")
+LINKEDIN = os.path.join(ROOT, "LinkedIn Content Workflow", "Linkedin Content Creator Workflow.json")
+
+
+def replay(path, **kwargs):
+    workflow = Workflow.load(path)
+    services = StubServices.from_file(default_scenario(workflow))
+    return run_workflow(workflow, services, **kwargs), services
+
+
+def ids(items, field="Employee ID"):
+    return [item.json.get(field) for item in items]
+
+
+def test_invoice_workflow():
+    result, services = replay(INVOICE)
+
+    assert result.errors == []
+    rows = services.sheets["Invoice DB/Sheet1"]
+    assert [row["Invoice Number"] for row in rows] == ["INV-1001", "INV-1002", "INV-1003"]
+    assert rows[0]["Client Email"] == "billing@acme.example"
+    assert len(services.outbox) == 3
+    # One batched append for all three invoices, not one call per row
+    assert services.calls["sheets.append"] == 1
+    assert services.calls["drive.download"] == 3
+
+
+def test_ai_hr_workflow():
+    result, services = replay(AI_HR)
+
+    # The workflow references an undefined isBirthday in both greeting emails, as n8n would fail on too
+    assert sorted(stats.name for stats in result.errors) == ["Gmail2", "Gmail3"]
+    assert all("isBirthday" in stats.error for stats in result.errors)
+
+    assert len(services.outbox) == 5
+    assert len(services.telegram_messages) == 5
+    assert len(services.calendar_events) == 2
+
+    approved, pending = result.outputs["If"]
+    assert ids(approved) == ["E-117"] and approved[0].json["Leave Type"] == "Sick Leave"
+    assert ids(pending) == ["E-140"] and pending[0].json["Leave Type"] == "Vacation"
+
+    updated = {item.json["Employee ID"]: item.json for item in result.outputs["Update Sheet"][0]}
+    assert updated["E-201"]["Birthday"] == "1992-05-16\n"
+    assert updated["E-201"]["Date of Joining"] == "2025-05-26"
+
+    # The Code node concatenates an undefined date, and the port keeps JavaScript's result
+    reviews = result.outputs["Code3"][0]
+    assert [item.json["Review Start"] for item in reviews] == ["undefinedT10:00:00.000Z"] * 2
+
+
+def test_linkedin_workflow():
+    result, services = replay(LINKEDIN)
+
+    assert result.errors == []
+    rows = {row["Topic"]: row for row in services.sheets["LinkedIn Posts/Sheet1"]}
+    assert rows["AI in healthcare"]["Status"] == "Done"
+    assert "ai in healthcare" in rows["AI in healthcare"]["Content"].lower()
+    assert rows["Remote team leadership"]["Content"] == "Posted earlier"
+    assert [topic for topic, row in rows.items() if row["Status"] == "To Do"][0] == "Sustainable supply chains"
+    assert services.calls == {"sheets.read": 1, "http.api.tavily.com": 1, "sheets.update": 1}
+
+
+@pytest.mark.parametrize("path", [INVOICE, AI_HR, LINKEDIN])
+def test_serial_replay_has_the_same_side_effects(path):
+    batched, batched_services = replay(path)
+    serial, serial_services = replay(path, batch_size=1, concurrency=1)
+
+    assert sorted(s.name for s in serial.errors) == sorted(s.name for s in batched.errors)
+    assert serial_services.sheets == batched_services.sheets
+    assert sorted(m["to"] for m in serial_services.outbox) == sorted(m["to"] for m in batched_services.outbox)
+    assert len(serial_services.telegram_messages) == len(batched_services.telegram_messages)
+
+
+def test_cli_exit_status(capsys):
+    assert main([INVOICE]) == 0
+    assert main([AI_HR]) == 1
+    assert "error in Gmail2" in capsys.readouterr().out
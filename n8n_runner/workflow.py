@@ -0,0 +1,97 @@
+"""n8n workflow graphs loaded from their exported JSON.
+
+Only ``main`` connections carry items between nodes. Other connection types
+(``ai_languageModel`` and friends) attach sub-nodes such as "Groq Chat
+Model" to the root node that uses them. Sub-nodes and sticky notes are
+never executed on their own.
+"""
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+STICKY_NOTE = "n8n-nodes-base.stickyNote"
+
+
+@dataclass
+class Node:
+    name: str
+    type: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    type_version: float = 1
+    continue_on_fail: bool = False
+
+    @property
+    def is_trigger(self) -> bool:
+        return self.type.lower().endswith("trigger")
+
+
+class Workflow:
+    def __init__(self, data: Dict[str, Any]):
+        self.name: str = data.get("name", "")
+        self.nodes: Dict[str, Node] = {}
+        for raw in data.get("nodes", []):
+            self.nodes[raw["name"]] = Node(
+                raw["name"], raw["type"], raw.get("parameters") or {}, raw.get("typeVersion", 1),
+                raw.get("continueOnFail", False) or raw.get("onError") == "continueRegularOutput",
+            )
+        self.pin_data: Dict[str, List[Dict]] = {
+            name: [entry.get("json", {}) for entry in items] for name, items in (data.get("pinData") or {}).items()
+        }
+
+        # main[source][output index] -> target node names; sub_nodes[target][connection type] -> source names
+        self.main: Dict[str, List[List[str]]] = {}
+        self.sub_nodes: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        self.predecessors: Dict[str, Set[str]] = defaultdict(set)
+        for source, kinds in (data.get("connections") or {}).items():
+            for kind, outputs in kinds.items():
+                for index, targets in enumerate(outputs):
+                    for target in targets or []:
+                        if kind == "main":
+                            self.main.setdefault(source, [])
+                            while len(self.main[source]) <= index:
+                                self.main[source].append([])
+                            self.main[source][index].append(target["node"])
+                            self.predecessors[target["node"]].add(source)
+                        else:
+                            self.sub_nodes[target["node"]][kind].append(source)
+
+    @classmethod
+    def load(cls, path: str) -> "Workflow":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def is_executable(self, name: str) -> bool:
+        """False for sticky notes and for sub-nodes that only feed other nodes"""
+        node = self.nodes[name]
+        if node.type == STICKY_NOTE:
+            return False
+        is_sub_node = any(name in sources for kinds in self.sub_nodes.values() for sources in kinds.values())
+        return not (is_sub_node and name not in self.main and not self.predecessors.get(name))
+
+    def successors(self, name: str) -> List[Tuple[int, str]]:
+        return [(index, target) for index, targets in enumerate(self.main.get(name, [])) for target in targets]
+
+    def start_nodes(self) -> List[str]:
+        """Nodes with no incoming items: triggers, plus roots such as a sheet read nothing triggers"""
+        return [name for name in self.nodes if self.is_executable(name) and not self.predecessors.get(name)]
+
+    def reachable(self, starts: List[str]) -> Set[str]:
+        seen, stack = set(), list(starts)
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            stack.extend(target for _, target in self.successors(name))
+        return seen
+
+    def sub_node(self, name: str, kind: str = "ai_languageModel") -> Optional[Node]:
+        sources = self.sub_nodes.get(name, {}).get(kind, [])
+        return self.nodes[sources[0]] if sources else None
+
+    def describe(self) -> str:
+        lines = [f"{self.name}: {len(self.nodes)} nodes"]
+        for name in self.start_nodes():
+            lines.append(f"  start: {name} ({self.nodes[name].type})")
+        return "\n".join(lines)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Import-time budget for the app and crew entry points.
+
+Imports each entry module in a fresh interpreter under ``-X importtime`` and
+fails if its cumulative import time exceeds the budget, or if it pulls in a
+heavy dependency that should only be loaded on first use.
+
+    python scripts/check_import_time.py
+"""
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (module, directory put on sys.path, budget in milliseconds)
+TARGETS = [
+    ("app", "stock_view", 150),
+    ("stock_picker.main", "stock_picker/src", 100),
+    ("financial_researcher.main", "financial_researcher/src", 100),
+    ("engineering_team.main", "engineering_team/src", 100),
+]
+
+# Packages that must not be imported just by loading an entry module
+DEFERRED = {"gradio", "yfinance", "praw", "pandas", "crewai", "crewai_tools", "litellm", "requests"}
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str, path: str):
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.join(ROOT, path),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(2))))
+    total = next((cumulative for name, cumulative in imports if name == module), 0)
+    return total / 1000, imports
+
+
+def main() -> int:
+    failed = False
+    for module, path, budget in TARGETS:
+        try:
+            elapsed, imports = measure(module, path)
+        except RuntimeError as e:
+            print(f"FAIL {module}: {e}")
+            failed = True
+            continue
+
+        loaded = sorted({name.split(".")[0] for name, _ in imports} & DEFERRED)
+        status = "ok" if elapsed <= budget and not loaded else "FAIL"
+        print(f"{status:<4} {module:<28} {elapsed:7.1f} ms  (budget {budget} ms)")
+        if loaded:
+            print(f"     eagerly imports: {', '.join(loaded)}")
+        if status == "FAIL":
+            failed = True
+            slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:5]
+            for name, cumulative in slowest:
+                print(f"     {cumulative / 1000:7.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Durable per-task checkpoints for the StockPicker crew.
+
+The hierarchical crew can be cut short by the manager's ``max_iter`` or by
+``max_execution_time``. Each completed task is written to
+``output/checkpoints/`` as soon as it finishes, so a later ``resume`` call
+restores those outputs and continues with the first unfinished task instead
+of paying for the trending search and research again.
+
+A plain ``run`` always starts over: its before_kickoff callback deletes the
+previous run's checkpoints, resumable or not. Use ``resume`` to continue.
+
+``resume_crew`` restarts the crew through private ``Crew`` methods, the way
+``Crew.replay`` does. Those change between crewAI releases, so it checks
+they exist and refuses to run on a crewAI without them.
+"""
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import crewai
+from crewai import Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from pydantic import ValidationError
+
+CHECKPOINT_DIR = "output/checkpoints"
+
+# Private Crew methods resume_crew calls; checked against crewAI 0.165.1
+CREW_INTERNALS = ("_interpolate_inputs", "_set_tasks_callbacks", "_create_manager_agent", "_execute_tasks")
+
+
+class CheckpointStore:
+    """Stores one snapshot per completed task, tied to the run's inputs"""
+
+    def __init__(self, checkpoint_dir: str = CHECKPOINT_DIR):
+        self.checkpoint_dir = Path(checkpoint_dir)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.checkpoint_dir / "run.json"
+
+    def begin(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Start a fresh run; used as a before_kickoff callback so it returns the
+        inputs. This discards the previous run's checkpoints even if that run
+        did not finish.
+        """
+        if self.checkpoint_dir.exists():
+            done = [path.stem for path in self.checkpoint_dir.glob("*.json") if path != self.manifest_path]
+            if done:
+                print(f"Starting over: discarding checkpoints for {', '.join(sorted(done))} "
+                      f"(use resume to continue the previous run instead)")
+            shutil.rmtree(self.checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {"inputs": inputs, "started_at": datetime.now().isoformat()}
+        self.manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        return inputs
+
+    def save(self, output: TaskOutput) -> None:
+        """Task callback: snapshot the output of a task that just completed"""
+        snapshot = {
+            "task": output.name,
+            "agent": output.agent,
+            "raw": output.raw,
+            "model": type(output.pydantic).__name__ if output.pydantic else None,
+            "data": output.pydantic.model_dump() if output.pydantic else output.json_dict,
+            "completed_at": datetime.now().isoformat(),
+        }
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        path = self.checkpoint_dir / f"{output.name}.json"
+        path.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+        print(f"Checkpoint saved: {path}")
+
+    def load(self, task: Task) -> Optional[TaskOutput]:
+        """Return the task's checkpointed output, or None if missing or invalid"""
+        path = self.checkpoint_dir / f"{task.name}.json"
+        if not path.exists():
+            return None
+        try:
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        pydantic_output = None
+        if task.output_pydantic:
+            # Only a snapshot that still validates against the task's model counts as done
+            try:
+                if snapshot.get("data") is not None:
+                    pydantic_output = task.output_pydantic.model_validate(snapshot["data"])
+                else:
+                    pydantic_output = task.output_pydantic.model_validate_json(snapshot["raw"])
+            except ValidationError as e:
+                print(f"Ignoring checkpoint for {task.name}: {e.error_count()} validation errors")
+                return None
+
+        return TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=snapshot["raw"],
+            pydantic=pydantic_output,
+            json_dict=pydantic_output.model_dump() if pydantic_output else None,
+            agent=snapshot.get("agent", ""),
+            output_format=task._get_output_format(),
+        )
+
+    def restore(self, tasks: List[Task], inputs: Dict[str, Any]) -> int:
+        """
+        Put checkpointed outputs back on the leading completed tasks.
+        Returns the index of the first task that still has to run.
+        """
+        if not self.manifest_path.exists():
+            return 0
+        manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("inputs") != inputs:
+            print("Checkpoints belong to a run with different inputs, starting over")
+            return 0
+
+        for index, task in enumerate(tasks):
+            output = self.load(task)
+            if output is None:
+                return index
+            task.output = output
+        return len(tasks)
+
+
+def check_crew_internals(crew: Crew) -> None:
+    """Fail before touching ``crew`` if this crewAI lacks a method ``resume_crew`` relies on"""
+    missing = [name for name in CREW_INTERNALS if not callable(getattr(crew, name, None))]
+    if missing:
+        raise RuntimeError(
+            f"resume_crew does not support crewAI {crewai.__version__}: Crew has no {', '.join(missing)}. "
+            f"Run the crew from the start, or install the crewAI version in uv.lock."
+        )
+
+
+def resume_crew(crew: Crew, inputs: Dict[str, Any], store: Optional[CheckpointStore] = None) -> CrewOutput:
+    """
+    Continue a crew from its last completed task.
+
+    Falls back to a normal kickoff when there is nothing to resume. The
+    restart mirrors crewAI's own ``Crew.replay``, with checkpoints in place
+    of its task output database.
+    """
+    check_crew_internals(crew)
+    store = store or CheckpointStore()
+    start_index = store.restore(crew.tasks, inputs)
+
+    if start_index == 0:
+        return crew.kickoff(inputs=inputs)
+
+    if start_index == len(crew.tasks):
+        print("All tasks already completed, returning checkpointed result")
+        final = crew.tasks[-1].output
+        return CrewOutput(
+            raw=final.raw,
+            pydantic=final.pydantic,
+            json_dict=final.json_dict,
+            tasks_output=[task.output for task in crew.tasks],
+        )
+
+    print(f"Resuming from task {start_index + 1}/{len(crew.tasks)}: {crew.tasks[start_index].name}")
+    crew._inputs = inputs
+    crew._interpolate_inputs(inputs)
+    crew._set_tasks_callbacks()
+    for agent in crew.agents:
+        agent.crew = crew
+    if crew.process == Process.hierarchical:
+        crew._create_manager_agent()
+
+    return crew._execute_tasks(crew.tasks, start_index, True)
@@ -1,9 +1,14 @@
-from crewai import Agent, Crew, Process, Task
+from pathlib import Path
+from crewai import Agent, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from pydantic import BaseModel, Field
 from typing import List
 from crewai_tools import SerperDevTool
+from crew_common.context import CompactingCrew, ContextCompactor
+from crew_common.knowledge import crew_knowledge
+from crew_common.routing import ModelRouter
 from .tools.push_tool import PushNotificationTool
+from .checkpoint import CheckpointStore
 
 class TrendingCompany(BaseModel):
     """ A company that is in the news and attracting attention """
@@ -70,7 +75,7 @@ class StockPicker():
         )
 
     @crew
-    def crew(self) -> Crew:
+    def crew(self) -> CompactingCrew:
         """Creates the StockPicker crew"""
 
         manager = Agent(
@@ -78,7 +83,13 @@ class StockPicker():
             allow_delegation=True
         )
 
-        return Crew(
+        # Snapshot every completed task so a timed-out run can be resumed
+        checkpoints = CheckpointStore()
+
+        # Budgeted agents and tasks get a model tier; failed output_pydantic escalates to a larger one
+        self.router = ModelRouter.from_yaml(Path(__file__).parent / "config/routing.yaml")
+
+        crew = CompactingCrew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.hierarchical,
@@ -86,5 +97,10 @@ class StockPicker():
             manager_agent=manager,
             # Add timeout and max iterations to prevent infinite loops
             max_iter=5,  # Reduced iterations
-            max_execution_time=900  # 15 minutes total timeout
-        )
\ No newline at end of file
+            max_execution_time=900,  # 15 minutes total timeout
+            before_kickoff_callbacks=[checkpoints.begin],
+            task_callback=checkpoints.save,
+            knowledge=crew_knowledge("stock_picker"),
+            compactor=ContextCompactor.from_yaml(Path(__file__).parent / "config/compaction.yaml"),
+        )
+        return self.router.apply(crew, self.agents_config)
\ No newline at end of file
@@ -4,24 +4,73 @@ import warnings
 
 from datetime import datetime
 
-from stock_picker.crew import StockPicker
-
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 
 def run():
     """
-    Run the crew.
+    Run the crew from the start. This discards the checkpoints of an
+    unfinished run; use ``resume`` to continue one instead.
     """
+    # crewAI takes seconds to import, so it is loaded only once a crew is actually run
+    from stock_picker.crew import StockPicker
+    from crew_common.profiler import CrewProfiler
+
     inputs = {
         'sector': 'Technology',
     }
     
-    result = StockPicker().crew().kickoff(inputs=inputs)
+    picker = StockPicker()
+    crew = picker.crew()
+    profiler = CrewProfiler()
+    result = crew.kickoff(inputs=inputs)
+    profiler.export("output/trace.json")
+
+
+    print("\n\n=== FINAL DECISION ===\n\n")
+    print(result.raw)
+    print(crew.compactor.summary())
+    print(profiler.summary())
+    print(picker.router.summary())
+    report_notifications()
+
+
+def report_notifications():
+    """
+    Wait for queued push notifications and print their delivery metrics.
+    """
+    from stock_picker.tools.outbox import get_outbox
+
+    outbox = get_outbox()
+    if not outbox.flush():
+        print(f"{outbox.pending()} notifications still pending, they will be retried on the next run")
+    print(f"Notifications: {outbox.metrics()}")
+
+
+def resume():
+    """
+    Continue the last run from its most recent checkpoint.
+    """
+    from stock_picker.crew import StockPicker
+    from stock_picker.checkpoint import resume_crew
+    from crew_common.profiler import CrewProfiler
+
+    inputs = {
+        'sector': 'Technology',
+    }
 
+    picker = StockPicker()
+    crew = picker.crew()
+    profiler = CrewProfiler()
+    result = resume_crew(crew, inputs)
+    profiler.export("output/trace.json")
 
     print("\n\n=== FINAL DECISION ===\n\n")
     print(result.raw)
+    print(crew.compactor.summary())
+    print(profiler.summary())
+    print(picker.router.summary())
+    report_notifications()
 
 
 if __name__  == "__main__":
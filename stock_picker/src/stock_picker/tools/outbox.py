@@ -0,0 +1,285 @@
+"""Background outbox for push notifications.
+
+Messages are written to a small SQLite file and delivered by a worker
+thread, so the agent that sends them never waits on the network. Messages
+that arrive close together are coalesced into a single push, failed
+deliveries are retried with exponential backoff, and pending messages
+survive a crash and are picked up by the next process. A message longer
+than Pushover's limit is split into several pushes when it is queued.
+Delivered messages are deleted, and messages dropped after ``max_attempts`` are kept for
+``failed_retention`` seconds for inspection, so the file stays small.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+OUTBOX_PATH = "output/notification_outbox.db"
+PUSHOVER_URL = "https://api.pushover.net/1/messages.json"
+PUSHOVER_MAX_LENGTH = 1024
+
+
+def split_message(message: str, limit: int = PUSHOVER_MAX_LENGTH) -> List[str]:
+    """Cut ``message`` into parts of at most ``limit`` characters, at a line break or space where possible"""
+    parts: List[str] = []
+    while len(message) > limit:
+        cut = message.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = message.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        parts.append(message[:cut])
+        message = message[cut:].lstrip("\n ")
+    if message or not parts:
+        parts.append(message)
+    return parts
+
+
+class PushoverEndpoint:
+    """Delivers a message to Pushover; raises on any failure so the outbox retries"""
+
+    def __init__(self, url: str = PUSHOVER_URL, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, message: str) -> None:
+        payload = {
+            "user": os.getenv("PUSHOVER_USER"),
+            "token": os.getenv("PUSHOVER_TOKEN"),
+            "message": message,
+        }
+        response = requests.post(self.url, data=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class NotificationOutbox:
+    """
+    Persistent queue of notifications drained by a background thread.
+
+    ``endpoint`` is any callable taking the message text; point it at a local
+    stub to exercise the outbox without Pushover.
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[Callable[[str], None]] = None,
+        path: str = OUTBOX_PATH,
+        batch_window: float = 2.0,
+        max_attempts: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        failed_retention: float = 7 * 24 * 3600,
+    ):
+        self.endpoint = endpoint or PushoverEndpoint()
+        self.path = path
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failed_retention = failed_retention
+
+        self._lock = threading.Lock()
+        self._delivering = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._latencies: List[float] = []
+        self._delivered = 0
+        self._failed = 0
+        self._worker: Optional[threading.Thread] = None
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending'
+            )"""
+        )
+        self._prune()
+        self._db.commit()
+
+    def start(self) -> "NotificationOutbox":
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+            self._worker.start()
+        return self
+
+    def enqueue(self, message: str) -> int:
+        """Persist a message for delivery and return immediately; returns the id of its first part"""
+        now = time.time()
+        ids = []
+        with self._lock:
+            for part in split_message(message):
+                cursor = self._db.execute(
+                    "INSERT INTO outbox (message, enqueued_at, next_attempt_at) VALUES (?, ?, ?)",
+                    (part, now, now + self.batch_window),
+                )
+                ids.append(cursor.lastrowid)
+            self._db.commit()
+        self._wakeup.set()
+        return ids[0]
+
+    def pending(self) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()
+        return row[0]
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Try every pending message now, including those backing off, and keep
+        retrying until ``timeout``. Returns False as soon as the only messages
+        left are not due again before the deadline.
+        """
+        deadline = time.time() + timeout
+        with self._lock:
+            self._db.execute("UPDATE outbox SET next_attempt_at = ? WHERE status = 'pending'", (time.time(),))
+            self._db.commit()
+        while True:
+            self._deliver_due()
+            if self.pending() == 0:
+                return True
+            wait = self._seconds_until_next()
+            if time.time() + wait >= deadline:
+                return False
+            time.sleep(max(wait, 0.01))
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def metrics(self) -> Dict[str, float]:
+        """Delivery latency (enqueue to successful push) and outcome counters"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        summary: Dict[str, float] = {
+            "delivered": self._delivered,
+            "failed": self._failed,
+            "pending": self.pending(),
+        }
+        if latencies:
+            summary["latency_p50"] = latencies[len(latencies) // 2]
+            summary["latency_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            summary["latency_max"] = latencies[-1]
+        return summary
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._deliver_due()
+            self._wakeup.wait(timeout=self._seconds_until_next())
+            self._wakeup.clear()
+
+    def _seconds_until_next(self) -> float:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+        if row[0] is None:
+            return 60.0
+        return max(0.0, row[0] - time.time())
+
+    def _deliver_due(self) -> None:
+        # The worker and flush() may both drain; only one may send at a time
+        with self._delivering:
+            self._deliver_due_locked()
+
+    def _deliver_due_locked(self) -> None:
+        now = time.time()
+        with self._lock:
+            due = self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?", (now,)
+            ).fetchone()[0]
+            if not due:
+                return
+            # Once the oldest message's window closes, sweep up every fresh message with it
+            rows = self._db.execute(
+                "SELECT id, message, enqueued_at, attempts FROM outbox "
+                "WHERE status = 'pending' AND (next_attempt_at <= ? OR attempts = 0) ORDER BY id",
+                (now,),
+            ).fetchall()
+
+        for batch in self._coalesce(rows):
+            ids = [row[0] for row in batch]
+            text = "\n".join(dict.fromkeys(row[1] for row in batch))
+            try:
+                self.endpoint(text)
+            except Exception as e:
+                self._reschedule(batch, e)
+                continue
+
+            delivered_at = time.time()
+            with self._lock:
+                self._db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+                self._db.commit()
+                self._latencies.extend(delivered_at - row[2] for row in batch)
+                self._delivered += len(batch)
+
+    def _prune(self) -> None:
+        """Drop delivered rows (older files kept them as 'sent') and expired failures"""
+        self._db.execute(
+            "DELETE FROM outbox WHERE status = 'sent' OR (status = 'failed' AND enqueued_at < ?)",
+            (time.time() - self.failed_retention,),
+        )
+
+    def _coalesce(self, rows: List[tuple]) -> List[List[tuple]]:
+        """Group due messages into pushes that fit Pushover's length limit; duplicates collapse"""
+        batches: List[List[tuple]] = []
+        current: List[tuple] = []
+        seen: set = set()
+        length = 0
+        for row in rows:
+            message = row[1]
+            extra = 0 if message in seen else len(message) + (1 if current else 0)
+            if current and length + extra > PUSHOVER_MAX_LENGTH:
+                batches.append(current)
+                current, seen, length, extra = [], set(), 0, len(message)
+            current.append(row)
+            seen.add(message)
+            length += extra
+        if current:
+            batches.append(current)
+        return batches
+
+    def _reschedule(self, batch: List[tuple], error: Exception) -> None:
+        now = time.time()
+        with self._lock:
+            for row_id, _, _, attempts in batch:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    self._db.execute(
+                        "UPDATE outbox SET status = 'failed', attempts = ? WHERE id = ?", (attempts, row_id)
+                    )
+                    self._failed += 1
+                    print(f"Push notification {row_id} dropped after {attempts} attempts: {error}")
+                else:
+                    delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+                    self._db.execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt_at = ? WHERE id = ?",
+                        (attempts, now + delay, row_id),
+                    )
+            self._db.commit()
+
+
+_outbox: Optional[NotificationOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> NotificationOutbox:
+    """Process-wide outbox, started on first use and flushed at exit"""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = NotificationOutbox().start()
+            atexit.register(_outbox.flush)
+        return _outbox
@@ -1,8 +1,8 @@
 from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
-import os
-import requests
+import json
+from .outbox import get_outbox
 
 
 class PushNotificationInput(BaseModel):
@@ -17,11 +17,7 @@ class PushNotificationTool(BaseTool):
     args_schema: Type[BaseModel] = PushNotificationInput
 
     def _run(self, message: str) -> str:
-        pushover_user = os.getenv("PUSHOVER_USER")
-        pushover_token = os.getenv("PUSHOVER_TOKEN")
-        pushover_url = "https://api.pushover.net/1/messages.json"
-
         print(f"Push: {message}")
-        payload = {"user": pushover_user, "token": pushover_token, "message": message}
-        requests.post(pushover_url, data=payload)
-        return '{"notification": "ok"}'
+        # Delivery happens on the outbox thread so the agent is not blocked on Pushover
+        notification_id = get_outbox().enqueue(message)
+        return json.dumps({"notification": "queued", "id": notification_id})
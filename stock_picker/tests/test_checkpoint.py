@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from crewai import Agent, Crew, Process, Task
+from pydantic import BaseModel
+
+from stock_picker.checkpoint import CheckpointStore, check_crew_internals, resume_crew
+
+INPUTS = {"sector": "Technology"}
+
+
+class Pick(BaseModel):
+    symbol: str
+
+
+def make_crew(store):
+    analyst = Agent(role="analyst", goal="Pick a {sector} stock", backstory="Veteran analyst", llm="gpt-4o-mini")
+    tasks = [
+        Task(name="find_trending", description="Find trending {sector} companies", expected_output="Companies",
+             agent=analyst),
+        Task(name="pick_best", description="Pick the best one", expected_output="A symbol", agent=analyst,
+             output_pydantic=Pick),
+        Task(name="report", description="Write the report", expected_output="A report", agent=analyst),
+    ]
+    return Crew(agents=[analyst], tasks=tasks, process=Process.sequential,
+                before_kickoff_callbacks=[store.begin], task_callback=store.save)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints"))
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Stands in for the agent's LLM calls; tasks named in ``failing`` raise"""
+    calls, failing = [], set()
+
+    def execute_task(self, task, context=None, tools=None):
+        calls.append((task.name, context))
+        if task.name in failing:
+            raise RuntimeError("max_execution_time exceeded")
+        return json.dumps({"symbol": "NVDA"}) if task.output_pydantic else f"{task.name} by {self.role}"
+
+    monkeypatch.setattr(Agent, "execute_task", execute_task)
+    return calls, failing
+
+
+def test_resume_skips_tasks_finished_before_a_failure(store, llm):
+    calls, failing = llm
+    failing.add("report")
+    with pytest.raises(RuntimeError):
+        make_crew(store).kickoff(inputs=INPUTS)
+    assert [name for name, _ in calls] == ["find_trending", "pick_best", "report"]
+    assert sorted(path.name for path in store.checkpoint_dir.iterdir()) == \
+        ["find_trending.json", "pick_best.json", "run.json"]
+
+    failing.clear()
+    calls.clear()
+    crew = make_crew(store)
+    result = resume_crew(crew, INPUTS, store)
+    assert [name for name, _ in calls] == ["report"]
+    # The restored pick is the report's context
+    assert "NVDA" in calls[0][1]
+    assert crew.tasks[0].output.raw == "find_trending by analyst"
+    assert crew.tasks[1].output.pydantic == Pick(symbol="NVDA")
+    assert result.raw == "report by analyst"
+
+
+def test_resume_of_a_finished_run_runs_nothing(store, llm):
+    calls, _ = llm
+    make_crew(store).kickoff(inputs=INPUTS)
+    calls.clear()
+    result = resume_crew(make_crew(store), INPUTS, store)
+    assert calls == []
+    assert result.raw == "report by analyst"
+
+
+def test_checkpoints_from_other_inputs_start_over(store, llm):
+    calls, failing = llm
+    failing.add("pick_best")
+    with pytest.raises(RuntimeError):
+        make_crew(store).kickoff(inputs=INPUTS)
+
+    failing.clear()
+    calls.clear()
+    resume_crew(make_crew(store), {"sector": "Energy"}, store)
+    assert [name for name, _ in calls] == ["find_trending", "pick_best", "report"]
+
+
+def test_plain_run_discards_previous_checkpoints(store, llm, capsys):
+    _, failing = llm
+    failing.add("pick_best")
+    with pytest.raises(RuntimeError):
+        make_crew(store).kickoff(inputs=INPUTS)
+    assert (store.checkpoint_dir / "find_trending.json").exists()
+
+    with pytest.raises(RuntimeError):
+        make_crew(store).kickoff(inputs=INPUTS)
+    assert "discarding checkpoints for find_trending" in capsys.readouterr().out
+
+
+def test_crewai_without_the_private_api_fails_loudly(store, monkeypatch):
+    crew = make_crew(store)
+    check_crew_internals(crew)
+    monkeypatch.delattr(Crew, "_execute_tasks")
+    with pytest.raises(RuntimeError, match="_execute_tasks"):
+        resume_crew(crew, INPUTS, store)
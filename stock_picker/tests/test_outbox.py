@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from stock_picker.tools.outbox import PUSHOVER_MAX_LENGTH, NotificationOutbox, PushoverEndpoint, split_message
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+class StubPushover:
+    """Local stand-in for the Pushover API; answers with queued statuses, then 200"""
+
+    def __init__(self):
+        self.messages = []
+        self.statuses = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                if status == 200:
+                    stub.messages.append(parse_qs(body)["message"][0])
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/1/messages.json"
+
+    def close(self):
+        self.server.shutdown()
+
+
+@pytest.fixture
+def stub():
+    stub = StubPushover()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "outbox.db")
+
+
+def rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT message, attempts, status FROM outbox ORDER BY id").fetchall()
+
+
+def test_messages_in_one_window_are_coalesced(stub, db_path):
+    outbox = NotificationOutbox(PushoverEndpoint(stub.url), db_path, batch_window=60)
+    for message in ("Picked NVDA", "Picked AMD", "Picked NVDA"):
+        outbox.enqueue(message)
+    assert outbox.flush(timeout=5)
+
+    assert stub.messages == ["Picked NVDA\nPicked AMD"]
+    assert outbox.metrics()["delivered"] == 3
+    assert rows(db_path) == []
+
+
+def test_pushes_are_split_at_the_length_limit(stub, db_path):
+    outbox = NotificationOutbox(PushoverEndpoint(stub.url), db_path, batch_window=60)
+    messages = [letter * 400 for letter in "abc"]
+    for message in messages:
+        outbox.enqueue(message)
+    assert outbox.flush(timeout=5)
+
+    assert stub.messages == ["\n".join(messages[:2]), messages[2]]
+    assert all(len(message) <= PUSHOVER_MAX_LENGTH for message in stub.messages)
+
+
+def test_long_messages_are_split_before_queueing(stub, db_path):
+    outbox = NotificationOutbox(PushoverEndpoint(stub.url), db_path, batch_window=60)
+    report = "\n".join(f"{i}. " + "x" * 300 for i in range(5))
+    outbox.enqueue(report)
+    assert all(len(message) <= PUSHOVER_MAX_LENGTH for message, _, _ in rows(db_path))
+    assert outbox.flush(timeout=5)
+
+    assert "\n".join(stub.messages) == report
+    assert all(len(message) <= PUSHOVER_MAX_LENGTH for message in stub.messages)
+
+
+def test_split_message():
+    assert split_message("short") == ["short"]
+    assert split_message("") == [""]
+    assert split_message("aaaa bbbb cc", limit=9) == ["aaaa bbbb", "cc"]
+    assert split_message("aaaa\nbbbb cccc", limit=9) == ["aaaa", "bbbb cccc"]
+    assert split_message("x" * 20, limit=8) == ["x" * 8, "x" * 8, "x" * 4]
+
+
+def test_failed_pushes_back_off_then_deliver(stub, db_path):
+    stub.statuses = [500, 503]
+    outbox = NotificationOutbox(PushoverEndpoint(stub.url), db_path, batch_window=0, base_backoff=0.2)
+    outbox.enqueue("Picked NVDA")
+
+    outbox._deliver_due()
+    assert rows(db_path) == [("Picked NVDA", 1, "pending")]
+    outbox._deliver_due()  # still inside the 0.2s backoff
+    assert rows(db_path) == [("Picked NVDA", 1, "pending")]
+
+    assert outbox.flush(timeout=5)
+    assert stub.messages == ["Picked NVDA"]
+    assert rows(db_path) == []
+
+
+def test_messages_are_dropped_after_max_attempts(stub, db_path):
+    stub.statuses = [500] * 2
+    outbox = NotificationOutbox(PushoverEndpoint(stub.url), db_path, batch_window=0, max_attempts=2,
+                                base_backoff=0)
+    outbox.enqueue("Picked NVDA")
+    assert outbox.flush(timeout=5)
+
+    assert stub.messages == []
+    assert rows(db_path) == [("Picked NVDA", 2, "failed")]
+    assert NotificationOutbox(PushoverEndpoint(stub.url), db_path, failed_retention=0).pending() == 0
+    assert rows(db_path) == []
+
+
+def test_flush_retries_backed_off_messages(stub, db_path):
+    stub.statuses = [500]
+    outbox = NotificationOutbox(PushoverEndpoint(stub.url), db_path, batch_window=0, base_backoff=30)
+    outbox.enqueue("Picked NVDA")
+    outbox._deliver_due()
+    assert rows(db_path) == [("Picked NVDA", 1, "pending")]
+
+    started = time.time()
+    assert outbox.flush(timeout=5)
+    assert time.time() - started < 2
+    assert stub.messages == ["Picked NVDA"]
+
+
+def test_flush_gives_up_early_when_nothing_is_due_before_the_deadline(stub, db_path):
+    stub.statuses = [500, 500]
+    outbox = NotificationOutbox(PushoverEndpoint(stub.url), db_path, batch_window=0, base_backoff=30)
+    outbox.enqueue("Picked NVDA")
+
+    started = time.time()
+    assert not outbox.flush(timeout=10)
+    assert time.time() - started < 2
+    assert rows(db_path) == [("Picked NVDA", 1, "pending")]
+
+
+def test_pending_messages_are_flushed_at_exit(stub, tmp_path):
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {SRC!r})
+        from stock_picker.tools import outbox
+
+        endpoint = outbox.PushoverEndpoint({stub.url!r})
+        outbox.PushoverEndpoint = lambda: endpoint
+        outbox.get_outbox().enqueue("Picked NVDA")
+    """)
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, check=True, timeout=30)
+
+    assert stub.messages == ["Picked NVDA"]
+    assert rows(str(tmp_path / "output" / "notification_outbox.db")) == []
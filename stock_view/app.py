@@ -1,20 +1,20 @@
-import gradio as gr
-import yfinance as yf
-import pandas as pd
 from datetime import datetime, timedelta
 import json
-from typing import Dict, List, Tuple
-import asyncio
-import aiohttp
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 import re
-
-# Enhanced imports for current news and discussions
-import praw
-import time
+import threading
 from urllib.parse import quote
-import requests
-from bs4 import BeautifulSoup
+
+from lazy import LazyModule
+from memtrace import get_allocation_tracker
+from ratelimit import get_rate_limiter
+
+# Heavy dependencies are imported on first use, not at module load
+gr = LazyModule("gradio")
+yf = LazyModule("yfinance")
+np = LazyModule("numpy")
+praw = LazyModule("praw")
 
 @dataclass
 class StockAnalysis:
@@ -30,6 +30,8 @@ class StockAnalysis:
     reddit_links: List[str]
     twitter_links: List[str]
     financial_news: List[str]  # New field for trusted financial news
+    technicals: Dict = field(default_factory=dict)
+    peers: Dict = field(default_factory=dict)
 
 class StockAnalysisAgent:
     def __init__(self):
@@ -39,17 +41,37 @@ class StockAnalysisAgent:
         self.reddit_client_id = "YOUR_REDDIT_CLIENT_ID"
         self.reddit_client_secret = "YOUR_REDDIT_CLIENT_SECRET"
         
-        # Enhanced Reddit client initialization for latest posts
-        try:
-            self.reddit = praw.Reddit(
-                client_id="dummy",
-                client_secret=None,
-                user_agent="StockAnalysis:v1.0",
-                check_for_async=False
-            )
-            self.reddit.read_only = True
-        except:
-            self.reddit = None
+        # The Reddit client is built on first use; see the reddit property
+        self._reddit = None
+        self._reddit_initialized = False
+        self._indicator_engine = None
+        self._screener = None
+        self._peer_comparison = None
+        # Report exports call these lazy properties from several threads at once
+        self._lazy_lock = threading.RLock()
+
+    @property
+    def reddit(self):
+        """Enhanced Reddit client for latest posts, or None if it cannot be created"""
+        if not self._reddit_initialized:
+            with self._lazy_lock:
+                if not self._reddit_initialized:
+                    try:
+                        self._reddit = praw.Reddit(
+                            client_id="dummy",
+                            client_secret=None,
+                            user_agent="StockAnalysis:v1.0",
+                            check_for_async=False
+                        )
+                        self._reddit.read_only = True
+                    except:
+                        self._reddit = None
+                    self._reddit_initialized = True
+        return self._reddit
+
+    def _upstream(self, host: str, fn, *args, **kwargs):
+        """Run an upstream call through the shared per-host rate limiter (see ratelimit.py)"""
+        return get_rate_limiter().call(host, fn, *args, **kwargs)
 
     def get_stock_symbol(self, user_input: str) -> str:
         """Convert company name to stock symbol or validate symbol"""
@@ -97,7 +119,7 @@ class StockAnalysisAgent:
                 for test_symbol in test_symbols:
                     try:
                         stock = yf.Ticker(test_symbol)
-                        info = stock.info
+                        info = self._upstream("yahoo", lambda: stock.info)
                         if info and 'symbol' in info and info.get('regularMarketPrice') is not None:
                             return test_symbol
                     except:
@@ -106,11 +128,16 @@ class StockAnalysisAgent:
 
         return user_input
 
-    def get_fundamentals(self, symbol: str) -> Dict:
-        """Get fundamental analysis data"""
+    def get_info(self, symbol: str) -> Dict:
+        """Yahoo Finance info for a symbol, the one upstream call behind fundamentals and financial health"""
+        stock = yf.Ticker(symbol)
+        return self._upstream("yahoo", lambda: stock.info)
+
+    def get_fundamentals(self, symbol: str, info: Optional[Dict] = None) -> Dict:
+        """Get fundamental analysis data, from ``info`` when it has already been fetched"""
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            if info is None:
+                info = self.get_info(symbol)
 
             fundamentals = {
                 'market_cap': info.get('marketCap', 'N/A'),
@@ -139,14 +166,14 @@ class StockAnalysisAgent:
         """Get recent trading session statistics"""
         try:
             stock = yf.Ticker(symbol)
-            info = stock.info
-            hist = stock.history(period="5d")
-
-            if not hist.empty:
-                latest_price = hist['Close'].iloc[-1]
-                prev_close = hist['Close'].iloc[-2] if len(hist) > 1 else latest_price
-                volume = hist['Volume'].iloc[-1]
-                avg_volume = hist['Volume'].mean()
+            info = self._upstream("yahoo", lambda: stock.info)
+            history = self.get_price_history(symbol)
+
+            if len(history.close):
+                latest_price = float(history.close[-1])
+                prev_close = float(history.close[-2]) if len(history.close) > 1 else latest_price
+                volume = float(history.volume[-1])
+                avg_volume = float(history.volume[-5:].mean())
             else:
                 latest_price = info.get('currentPrice', 'N/A')
                 prev_close = info.get('previousClose', 'N/A')
@@ -172,11 +199,11 @@ class StockAnalysisAgent:
         except Exception as e:
             return {'error': f'Failed to get trading stats: {str(e)}'}
 
-    def get_financial_health(self, symbol: str) -> Dict:
-        """Get financial health metrics"""
+    def get_financial_health(self, symbol: str, info: Optional[Dict] = None) -> Dict:
+        """Get financial health metrics, from ``info`` when it has already been fetched"""
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            if info is None:
+                info = self.get_info(symbol)
 
             financial_health = {
                 'total_cash': info.get('totalCash', 'N/A'),
@@ -197,17 +224,28 @@ class StockAnalysisAgent:
         except Exception as e:
             return {'error': f'Failed to get financial health: {str(e)}'}
 
+    def get_price_history(self, symbol: str):
+        """One year of closes and volumes as shared, read-only arrays (see history.py)"""
+        from history import get_history_cache
+
+        def fetch():
+            frame = self._upstream("yahoo", yf.Ticker(symbol).history, period="1y")
+            self._feed_indicators(symbol, frame)
+            return frame
+
+        return get_history_cache().get(symbol, "1y", fetch)
+
     def get_risk_metrics(self, symbol: str) -> Dict:
         """Calculate risk management metrics"""
         try:
             stock = yf.Ticker(symbol)
-            hist = stock.history(period="1y")
-            info = stock.info
+            close = self.get_price_history(symbol).close
+            info = self._upstream("yahoo", lambda: stock.info)
 
-            if not hist.empty:
-                returns = hist['Close'].pct_change().dropna()
-                volatility = returns.std() * (252 ** 0.5)  # Annualized volatility
-                max_drawdown = self.calculate_max_drawdown(hist['Close'])
+            if len(close) > 1:
+                returns = np.diff(close) / close[:-1]
+                volatility = float(returns.std(ddof=1)) * (252 ** 0.5)  # Annualized volatility
+                max_drawdown = self.calculate_max_drawdown(close)
             else:
                 volatility = 'N/A'
                 max_drawdown = 'N/A'
@@ -227,12 +265,86 @@ class StockAnalysisAgent:
         except Exception as e:
             return {'error': f'Failed to get risk metrics: {str(e)}'}
 
+    @property
+    def indicator_engine(self):
+        """Rolling technical-indicator state, loaded from disk on first use"""
+        if self._indicator_engine is None:
+            with self._lazy_lock:
+                if self._indicator_engine is None:
+                    from indicators import IndicatorEngine
+                    self._indicator_engine = IndicatorEngine.load()
+        return self._indicator_engine
+
+    def _feed_indicators(self, symbol: str, frame) -> None:
+        """Bring the indicator state up to date from a freshly fetched 1y frame before it is dropped"""
+        try:
+            engine = self.indicator_engine
+            last_bar = engine.last_bar(symbol)
+            if last_bar is None:
+                engine.backfill({symbol: frame})
+            elif not engine.is_current(symbol):
+                for day, bar in frame[frame.index.date > last_bar].iterrows():
+                    engine.update(symbol, day, bar['Close'], bar['High'], bar['Low'], bar['Volume'])
+            else:
+                return
+            engine.save()
+        except Exception:
+            # The price history is still good; get_technical_indicators reports its own failures
+            pass
+
+    def get_technical_indicators(self, symbol: str) -> Dict:
+        """Get technical indicators, fetching only the bars added since the last request"""
+        try:
+            engine = self.indicator_engine
+            if not engine.is_current(symbol):
+                # A miss in the shared 1y history feeds the engine from that same frame
+                self.get_price_history(symbol)
+
+            last_bar = engine.last_bar(symbol)
+            if last_bar is not None and not engine.is_current(symbol):
+                hist = self._upstream("yahoo", yf.Ticker(symbol).history, start=last_bar + timedelta(days=1))
+                for day, bar in hist.iterrows():
+                    engine.update(symbol, day, bar['Close'], bar['High'], bar['Low'], bar['Volume'])
+                engine.save()
+
+            return engine.snapshot(symbol)
+        except Exception as e:
+            return {'error': f'Failed to get technical indicators: {str(e)}'}
+
+    @property
+    def screener(self):
+        """The fundamentals store shared by peer ranking and screens, loaded on first use"""
+        if self._screener is None:
+            with self._lazy_lock:
+                if self._screener is None:
+                    from screener import FundamentalsScreener
+                    self._screener = FundamentalsScreener.load()
+        return self._screener
+
+    @property
+    def peer_comparison(self):
+        """Peer ranking backed by the screener's cached fundamentals, loaded on first use"""
+        if self._peer_comparison is None:
+            with self._lazy_lock:
+                if self._peer_comparison is None:
+                    from peers import PeerComparison
+                    self._peer_comparison = PeerComparison(self.screener)
+        return self._peer_comparison
+
+    def get_peer_comparison(self, symbol: str, info: Dict, fundamentals: Dict, financial_health: Dict) -> Dict:
+        """Get percentile ranks against industry peers, reusing the fundamentals already fetched"""
+        try:
+            fields = {k: v for part in (fundamentals, financial_health) if 'error' not in part for k, v in part.items()}
+            return self.peer_comparison.compare(self, symbol, info, fields)
+        except Exception as e:
+            return {'error': f'Failed to compare peers: {str(e)}'}
+
     def calculate_max_drawdown(self, prices) -> float:
         """Calculate maximum drawdown"""
         try:
-            peak = prices.expanding().max()
+            peak = np.maximum.accumulate(prices)
             drawdown = (prices - peak) / peak
-            return drawdown.min()
+            return float(drawdown.min())
         except:
             return 'N/A'
 
@@ -240,7 +352,7 @@ class StockAnalysisAgent:
         """Get dividend policy information"""
         try:
             stock = yf.Ticker(symbol)
-            info = stock.info
+            info = self._upstream("yahoo", lambda: stock.info)
 
             dividend_info = {
                 'dividend_yield': info.get('dividendYield', 'N/A'),
@@ -260,7 +372,7 @@ class StockAnalysisAgent:
         try:
             # Using yfinance news (free alternative)
             stock = yf.Ticker(symbol)
-            news = stock.news
+            news = self._upstream("yahoo", lambda: stock.news)
 
             news_links = []
             for article in news[:5]:  # Get top 5 articles
@@ -293,25 +405,19 @@ class StockAnalysisAgent:
             else:
                 target_subreddits = ['stocks', 'wallstreetbets', 'investing', 'SecurityAnalysis', 'StockMarket']
                 
-            request_count = 0
-            max_requests = 6
+            # Pacing and 429 backoff are handled by the shared rate limiter
             current_time = datetime.now()
             
             for subreddit_name in target_subreddits:
-                if request_count >= max_requests:
-                    break
-                    
                 try:
                     subreddit = self.reddit.subreddit(subreddit_name)
                     
                     # Search for posts from last 24 hours first (trending/hot)
                     for search_term in keywords[:2]:  # Use top 2 keywords
-                        if request_count >= max_requests:
-                            break
-                            
                         # Get hot posts first (trending)
-                        hot_submissions = list(subreddit.search(search_term, limit=3, sort='hot', time_filter='day'))
-                        request_count += 1
+                        hot_submissions = self._upstream(
+                            "reddit", lambda: list(subreddit.search(search_term, limit=3, sort='hot', time_filter='day'))
+                        )
                         
                         for submission in hot_submissions:
                             # Check if post is from last 48 hours
@@ -323,7 +429,6 @@ class StockAnalysisAgent:
                                 time_str = f"{int(hours_ago)}h ago" if hours_ago < 24 else f"{int(hours_ago/24)}d ago"
                                 discussions.append(f"🔥 **{title}** (r/{subreddit_name}) - {submission.score} upvotes - {time_str} - https://reddit.com{submission.permalink}")
                         
-                        time.sleep(0.1)  # Small delay
                         break  # Only use first keyword per subreddit to stay within limits
                     
                 except Exception as e:
@@ -333,14 +438,12 @@ class StockAnalysisAgent:
             if len(discussions) < 3:
                 try:
                     for subreddit_name in target_subreddits[:2]:  # Check top 2 subreddits
-                        if request_count >= max_requests:
-                            break
-                            
                         subreddit = self.reddit.subreddit(subreddit_name)
                         main_keyword = company_name if company_name else base_symbol
                         
-                        new_submissions = list(subreddit.search(main_keyword, limit=2, sort='new', time_filter='week'))
-                        request_count += 1
+                        new_submissions = self._upstream(
+                            "reddit", lambda: list(subreddit.search(main_keyword, limit=2, sort='new', time_filter='week'))
+                        )
                         
                         for submission in new_submissions:
                             post_time = datetime.fromtimestamp(submission.created_utc)
@@ -354,8 +457,6 @@ class StockAnalysisAgent:
                                     time_str = f"{int(hours_ago/24)}d ago"
                                 discussions.append(f"📝 **{title}** (r/{subreddit_name}) - {submission.score} upvotes - {time_str} - https://reddit.com{submission.permalink}")
                         
-                        time.sleep(0.1)
-                        
                 except:
                     pass
                     
@@ -546,19 +647,31 @@ class StockAnalysisAgent:
             except (ValueError, TypeError):
                 return str(value) if value else 'N/A'
 
+        def peer_rank(metric):
+            """Inline percentile against industry peers, empty when there is nothing to rank against"""
+            percentile = analysis.peers.get('percentiles', {}).get(metric)
+            if percentile is None:
+                return ''
+            return f" · *peer percentile {percentile:.0f} ({analysis.peers['peer_count'][metric]} peers)*"
+
+        def peer_line(label, metric):
+            median = analysis.peers.get('medians', {}).get(metric)
+            value = {**analysis.fundamentals, **analysis.financial_health}.get(metric)
+            return f"- **{label}**: {format_value(value, False)} (peer median {format_value(median, False)}){peer_rank(metric)}\n"
+
         report = f"""
 # 📊 Stock Analysis Report: {analysis.company_name} ({analysis.symbol})
 
 ## 🔍 Fundamental Analysis
-- **Market Cap**: {format_value(analysis.fundamentals.get('market_cap'))}
-- **P/E Ratio**: {format_value(analysis.fundamentals.get('pe_ratio'), False)}
-- **Forward P/E**: {format_value(analysis.fundamentals.get('forward_pe'), False)}
-- **PEG Ratio**: {format_value(analysis.fundamentals.get('peg_ratio'), False)}
-- **Price-to-Book**: {format_value(analysis.fundamentals.get('price_to_book'), False)}
-- **Price-to-Sales**: {format_value(analysis.fundamentals.get('price_to_sales'), False)}
+- **Market Cap**: {format_value(analysis.fundamentals.get('market_cap'))}{peer_rank('market_cap')}
+- **P/E Ratio**: {format_value(analysis.fundamentals.get('pe_ratio'), False)}{peer_rank('pe_ratio')}
+- **Forward P/E**: {format_value(analysis.fundamentals.get('forward_pe'), False)}{peer_rank('forward_pe')}
+- **PEG Ratio**: {format_value(analysis.fundamentals.get('peg_ratio'), False)}{peer_rank('peg_ratio')}
+- **Price-to-Book**: {format_value(analysis.fundamentals.get('price_to_book'), False)}{peer_rank('price_to_book')}
+- **Price-to-Sales**: {format_value(analysis.fundamentals.get('price_to_sales'), False)}{peer_rank('price_to_sales')}
 - **Enterprise Value**: {format_value(analysis.fundamentals.get('enterprise_value'))}
-- **EV/Revenue**: {format_value(analysis.fundamentals.get('ev_to_revenue'), False)}
-- **EV/EBITDA**: {format_value(analysis.fundamentals.get('ev_to_ebitda'), False)}
+- **EV/Revenue**: {format_value(analysis.fundamentals.get('ev_to_revenue'), False)}{peer_rank('ev_to_revenue')}
+- **EV/EBITDA**: {format_value(analysis.fundamentals.get('ev_to_ebitda'), False)}{peer_rank('ev_to_ebitda')}
 
 ## 📈 Trading Statistics
 - **Current Price**: {format_value(analysis.trading_stats.get('current_price'))}
@@ -573,13 +686,13 @@ class StockAnalysisAgent:
 ## 💰 Financial Health
 - **Total Cash**: {format_value(analysis.financial_health.get('total_cash'))}
 - **Total Debt**: {format_value(analysis.financial_health.get('total_debt'))}
-- **Debt-to-Equity**: {format_value(analysis.financial_health.get('debt_to_equity'), False)}
-- **Current Ratio**: {format_value(analysis.financial_health.get('current_ratio'), False)}
-- **Quick Ratio**: {format_value(analysis.financial_health.get('quick_ratio'), False)}
+- **Debt-to-Equity**: {format_value(analysis.financial_health.get('debt_to_equity'), False)}{peer_rank('debt_to_equity')}
+- **Current Ratio**: {format_value(analysis.financial_health.get('current_ratio'), False)}{peer_rank('current_ratio')}
+- **Quick Ratio**: {format_value(analysis.financial_health.get('quick_ratio'), False)}{peer_rank('quick_ratio')}
 - **Revenue (TTM)**: {format_value(analysis.financial_health.get('revenue_ttm'))}
 - **Gross Profit**: {format_value(analysis.financial_health.get('gross_profit'))}
 - **EBITDA**: {format_value(analysis.financial_health.get('ebitda'))}
-- **Free Cash Flow**: {format_value(analysis.financial_health.get('free_cash_flow'))}
+- **Free Cash Flow**: {format_value(analysis.financial_health.get('free_cash_flow'))}{peer_rank('free_cash_flow')}
 
 ## ⚠️ Risk Management
 - **Beta**: {format_value(analysis.risk_metrics.get('beta'), False)}
@@ -588,13 +701,39 @@ class StockAnalysisAgent:
 - **Analyst Rating**: {analysis.risk_metrics.get('analyst_rating', 'N/A')}
 - **Price Targets**: {format_value(analysis.risk_metrics.get('target_low_price'))} - {format_value(analysis.risk_metrics.get('target_high_price'))} (Mean: {format_value(analysis.risk_metrics.get('target_mean_price'))})
 
+## 📐 Technical Indicators
+- **SMA 20 / 50**: {format_value(analysis.technicals.get('sma_20'))} / {format_value(analysis.technicals.get('sma_50'))}
+- **EMA 12 / 26**: {format_value(analysis.technicals.get('ema_12'))} / {format_value(analysis.technicals.get('ema_26'))}
+- **RSI (14)**: {format_value(analysis.technicals.get('rsi_14'), False, 1)}
+- **MACD**: {format_value(analysis.technicals.get('macd'), False)} (Signal: {format_value(analysis.technicals.get('macd_signal'), False)}, Histogram: {format_value(analysis.technicals.get('macd_histogram'), False)})
+- **Bollinger Bands (20, 2)**: {format_value(analysis.technicals.get('bollinger_lower'))} - {format_value(analysis.technicals.get('bollinger_upper'))}
+- **ATR (14)**: {format_value(analysis.technicals.get('atr_14'))}
+- **Volume Point of Control**: {format_value(analysis.technicals.get('volume_poc'))}
+- **As of**: {analysis.technicals.get('last_bar', 'N/A')}
+
 ## 💎 Dividend Policy
 - **Dividend Yield**: {format_value(analysis.dividend_info.get('dividend_yield'), False)}%
 - **Dividend Rate**: {format_value(analysis.dividend_info.get('dividend_rate'))}
 - **Ex-Dividend Date**: {analysis.dividend_info.get('ex_dividend_date', 'N/A')}
 - **Payout Ratio**: {format_value(analysis.dividend_info.get('payout_ratio'), False)}%
 - **5-Year Avg Yield**: {format_value(analysis.dividend_info.get('five_year_avg_yield'), False)}%
+"""
 
+        if analysis.peers.get('percentiles'):
+            report += f"""
+## 👥 Peer Comparison
+- **Peers**: {', '.join(analysis.peers['peers'])}
+"""
+            report += peer_line("Profit Margin", 'profit_margin')
+            report += peer_line("Operating Margin", 'operating_margin')
+            report += peer_line("Return on Equity", 'return_on_equity')
+            report += peer_line("Return on Assets", 'return_on_assets')
+            report += peer_line("Revenue Growth", 'revenue_growth')
+            report += peer_line("Earnings Growth", 'earnings_growth')
+        if analysis.peers.get('refreshing'):
+            report += f"- *Fetching fundamentals for {analysis.peers['refreshing']} more peers in the background; the next report includes them*\n"
+
+        report += f"""
 ## 📰 Latest News Articles
 """
 
@@ -629,69 +768,95 @@ class StockAnalysisAgent:
 
         return report
 
-    def analyze_stock(self, user_input: str, progress=gr.Progress()) -> str:
-        """Main function to perform comprehensive stock analysis with latest data"""
+    def collect_analysis(self, symbol: str, info: Optional[Dict] = None, progress=None) -> StockAnalysis:
+        """Gather every section of the analysis for a resolved symbol, without formatting it"""
+        if progress is None:
+            progress = lambda *args, **kwargs: None
 
-        if not user_input.strip():
-            return "❌ Please enter a stock symbol or company name."
+        if info is None:
+            stock = yf.Ticker(symbol)
+            info = self._upstream("yahoo", lambda: stock.info)
+            if not info or len(info) < 5:
+                raise LookupError(f"Could not find data for '{symbol}'")
 
-        progress(0.1, desc="Resolving stock symbol...")
-        symbol = self.get_stock_symbol(user_input)
+        company_name = info.get('longName', info.get('shortName', symbol))
 
-        try:
+        progress(0.15, desc="Gathering fundamental data...")
+        fundamentals = self.get_fundamentals(symbol, info)
 
-            stock = yf.Ticker(symbol)
-            info = stock.info
+        progress(0.3, desc="Analyzing trading statistics...")
+        trading_stats = self.get_trading_stats(symbol)
 
-            if not info or len(info) < 5:
-                return f"❌ Could not find data for '{user_input}'. Please check the symbol.\n\n**Suggestions:**\n- For Indian stocks, try adding .NS (e.g., RELIANCE.NS)\n- For US stocks, use the ticker symbol (e.g., AAPL for Apple)\n- Check if the company is publicly traded"
+        progress(0.45, desc="Evaluating financial health...")
+        financial_health = self.get_financial_health(symbol, info)
+
+        progress(0.55, desc="Calculating risk metrics...")
+        risk_metrics = self.get_risk_metrics(symbol)
+
+        progress(0.6, desc="Updating technical indicators...")
+        technicals = self.get_technical_indicators(symbol)
 
-            company_name = info.get('longName', info.get('shortName', symbol))
+        progress(0.65, desc="Getting dividend information...")
+        dividend_info = self.get_dividend_info(symbol)
 
-            progress(0.15, desc="Gathering fundamental data...")
-            fundamentals = self.get_fundamentals(symbol)
+        progress(0.7, desc="Comparing against industry peers...")
+        peers = self.get_peer_comparison(symbol, info, fundamentals, financial_health)
 
-            progress(0.3, desc="Analyzing trading statistics...")
-            trading_stats = self.get_trading_stats(symbol)
+        progress(0.75, desc="Searching for latest news...")
+        news_links = self.search_news_articles(symbol, company_name)
 
-            progress(0.45, desc="Evaluating financial health...")
-            financial_health = self.get_financial_health(symbol)
+        progress(0.8, desc="Gathering trusted financial news...")
+        financial_news = self.search_trusted_financial_news(symbol, company_name)
 
-            progress(0.55, desc="Calculating risk metrics...")
-            risk_metrics = self.get_risk_metrics(symbol)
+        progress(0.9, desc="Finding trending Reddit discussions...")
+        reddit_links = self.search_reddit_discussions_enhanced(symbol, company_name)
 
-            progress(0.65, desc="Getting dividend information...")
-            dividend_info = self.get_dividend_info(symbol)
+        progress(0.95, desc="Collecting current Twitter mentions...")
+        twitter_links = self.search_twitter_mentions_enhanced(symbol, company_name)
+
+        progress(1.0, desc="Generating comprehensive report...")
+
+        # Create analysis object with new financial_news field
+        return StockAnalysis(
+            symbol=symbol,
+            company_name=company_name,
+            fundamentals=fundamentals,
+            trading_stats=trading_stats,
+            financial_health=financial_health,
+            risk_metrics=risk_metrics,
+            dividend_info=dividend_info,
+            news_links=news_links,
+            reddit_links=reddit_links,
+            twitter_links=twitter_links,
+            financial_news=financial_news,
+            technicals=technicals,
+            peers=peers
+        )
+
+    def analyze_stock(self, user_input: str, progress=None) -> str:
+        """Main function to perform comprehensive stock analysis with latest data"""
+        with get_allocation_tracker().track("analyze_stock", user_input.strip()):
+            return self._analyze_stock(user_input, progress)
 
-            progress(0.75, desc="Searching for latest news...")
-            news_links = self.search_news_articles(symbol, company_name)
+    def _analyze_stock(self, user_input: str, progress=None) -> str:
+        if progress is None:
+            progress = lambda *args, **kwargs: None
 
-            progress(0.8, desc="Gathering trusted financial news...")
-            financial_news = self.search_trusted_financial_news(symbol, company_name)
+        if not user_input.strip():
+            return "❌ Please enter a stock symbol or company name."
 
-            progress(0.9, desc="Finding trending Reddit discussions...")
-            reddit_links = self.search_reddit_discussions_enhanced(symbol, company_name)
+        progress(0.1, desc="Resolving stock symbol...")
+        symbol = self.get_stock_symbol(user_input)
 
-            progress(0.95, desc="Collecting current Twitter mentions...")
-            twitter_links = self.search_twitter_mentions_enhanced(symbol, company_name)
+        try:
 
-            progress(1.0, desc="Generating comprehensive report...")
+            stock = yf.Ticker(symbol)
+            info = self._upstream("yahoo", lambda: stock.info)
 
-            # Create analysis object with new financial_news field
-            analysis = StockAnalysis(
-                symbol=symbol,
-                company_name=company_name,
-                fundamentals=fundamentals,
-                trading_stats=trading_stats,
-                financial_health=financial_health,
-                risk_metrics=risk_metrics,
-                dividend_info=dividend_info,
-                news_links=news_links,
-                reddit_links=reddit_links,
-                twitter_links=twitter_links,
-                financial_news=financial_news
-            )
+            if not info or len(info) < 5:
+                return f"❌ Could not find data for '{user_input}'. Please check the symbol.\n\n**Suggestions:**\n- For Indian stocks, try adding .NS (e.g., RELIANCE.NS)\n- For US stocks, use the ticker symbol (e.g., AAPL for Apple)\n- Check if the company is publicly traded"
 
+            analysis = self.collect_analysis(symbol, info, progress)
             return self.format_analysis_report(analysis)
 
         except Exception as e:
@@ -701,6 +866,23 @@ def create_gradio_interface():
     """Create a chat-style interface similar to your second app"""
     
     agent = StockAnalysisAgent()
+
+    def screen_stocks(query: str) -> str:
+        """Run a screen over the stored fundamentals (see screener.py) and format it for chat"""
+        from screener import format_results
+
+        # Shared with peer ranking; sync rereads the store only after the screener CLI rewrote it
+        screener = agent.screener
+        screener.sync()
+        try:
+            return format_results(screener.query(query), len(screener))
+        except ValueError as e:
+            return f"❌ {e}"
+
+    def screen_api(query: str) -> List[Dict]:
+        """API endpoint returning screen results as a list of {symbol, metric: value} rows"""
+        agent.screener.sync()
+        return agent.screener.query(query)
     
     def chat_analyze_stock(message, history):
         """Chat function that analyzes stock based on user message"""
@@ -710,6 +892,10 @@ def create_gradio_interface():
         # Extract stock symbol/name from the message
         # You could make this more sophisticated with NLP
         stock_input = message.strip()
+
+        # "screen pe_ratio < 15 and ..." runs a fundamentals screen instead
+        if stock_input.lower().startswith("screen "):
+            return screen_stocks(stock_input[len("screen "):])
         
         # Perform the analysis
         result = agent.analyze_stock(stock_input)
@@ -728,14 +914,37 @@ def create_gradio_interface():
             "What's the latest on Microsoft?",
             "RELIANCE.NS analysis",
             "Show me NVIDIA fundamentals",
-            "Bitcoin related stocks"
+            "Bitcoin related stocks",
+            "screen pe_ratio < 15 and return_on_equity > 0.2 order by free_cash_flow desc"
         ]
     )
+
+    def rate_limit_metrics() -> Dict:
+        """API endpoint with per-host queue depth, wait times and throttling"""
+        return get_rate_limiter().metrics()
+
+    def memory_metrics() -> Dict:
+        """API endpoint with per-request allocation stats (STOCK_VIEW_TRACEMALLOC=1) and history cache size"""
+        from history import get_history_cache
+        return {"allocations": get_allocation_tracker().stats(), "history_cache": get_history_cache().stats()}
+
+    with interface:
+        gr.api(screen_api, api_name="screen")
+        gr.api(rate_limit_metrics, api_name="rate_limits")
+        gr.api(memory_metrics, api_name="memory")
     
     return interface
 
 # Launch configuration
 if __name__ == "__main__":
+    # STOCK_VIEW_FIXTURES=record:<dir> or replay:<dir|stub url>, see fixtures.py
+    import os
+    import sys
+    if os.environ.get("STOCK_VIEW_FIXTURES"):
+        import fixtures
+        # Patch this module: `import app` from here would load a second copy
+        fixtures.install_from_env(app_module=sys.modules[__name__])
+
     demo = create_gradio_interface()
     demo.launch()
 
@@ -0,0 +1,287 @@
+"""Benchmarks for stock_view against recorded upstream fixtures.
+
+Record fixtures once against the live services, then benchmark offline
+through the stub server:
+
+    python bench.py record AAPL MSFT NVDA JPM XOM
+    python bench.py run --stub-latency-ms 80 --stub-jitter-ms 20
+    python bench.py run --suite concurrency --users 8 --duration 30
+    python bench.py run --save-baseline
+
+Suites:
+
+- ``latency``: single-report latency, cold then warm, broken down per stage;
+- ``concurrency``: concurrent users against the running Gradio app, both the
+  chat path (``/chat``) and the API path (``/screen``), reporting QPS and
+  latency percentiles;
+- ``batch``: screener refresh throughput at batch priority.
+
+Every run is compared with ``bench_baseline.json`` when it exists; a metric
+more than ``--tolerance`` worse than its baseline fails the run. State
+(screener, indicators, peers) lives in a temporary directory, so benchmarks
+never touch ``data/``.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+STAGES = [
+    "get_stock_symbol", "get_fundamentals", "get_trading_stats", "get_financial_health",
+    "get_risk_metrics", "get_technical_indicators", "get_dividend_info", "get_peer_comparison",
+    "search_news_articles", "search_trusted_financial_news", "search_reddit_discussions_enhanced",
+    "search_twitter_mentions_enhanced", "format_analysis_report",
+]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def recorded_symbols(fixtures_dir: str) -> List[str]:
+    yahoo = os.path.join(fixtures_dir, "yahoo")
+    if not os.path.isdir(yahoo):
+        return []
+    return sorted(d for d in os.listdir(yahoo) if os.path.exists(os.path.join(yahoo, d, "info.json")))
+
+
+def instrument(agent) -> Dict[str, List[float]]:
+    """Time each top-level stage of analyze_stock; nested stage calls count towards their caller"""
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    local = threading.local()
+
+    def timed(name, method):
+        def wrapper(*args, **kwargs):
+            depth = getattr(local, "depth", 0)
+            local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                local.depth = depth
+                if depth == 0:
+                    timings[name].append(time.perf_counter() - start)
+        return wrapper
+
+    for stage in STAGES:
+        setattr(agent, stage, timed(stage, getattr(agent, stage)))
+    return timings
+
+
+def bench_latency(symbols: List[str]) -> Dict[str, float]:
+    from app import StockAnalysisAgent
+
+    agent = StockAnalysisAgent()
+    timings = instrument(agent)
+    metrics = {}
+    for phase in ("cold", "warm"):
+        for values in timings.values():
+            values.clear()
+        totals = []
+        for symbol in symbols:
+            start = time.perf_counter()
+            agent.analyze_stock(symbol)
+            totals.append(time.perf_counter() - start)
+        metrics[f"latency.{phase}.p50_ms"] = percentile(totals, 0.5) * 1000
+        metrics[f"latency.{phase}.p95_ms"] = percentile(totals, 0.95) * 1000
+        for stage, values in timings.items():
+            if values:
+                metrics[f"latency.{phase}.stage.{stage}.mean_ms"] = sum(values) / len(values) * 1000
+    return metrics
+
+
+def bench_concurrency(symbols: List[str], users: int, duration: float) -> Dict[str, float]:
+    from gradio_client import Client
+
+    import app
+    from screener import FundamentalsScreener
+
+    FundamentalsScreener.load().refresh(app.StockAnalysisAgent(), symbols)
+
+    demo = app.create_gradio_interface()
+    port = free_port()
+    demo.queue(default_concurrency_limit=users)
+    demo.launch(server_port=port, prevent_thread_lock=True, quiet=True)
+    url = f"http://127.0.0.1:{port}/"
+    metrics = {}
+    try:
+        for path, argument in (("/chat", lambda i: symbols[i % len(symbols)]), ("/screen", lambda i: "pe_ratio > 0 order by market_cap desc")):
+            clients = [Client(url, verbose=False) for _ in range(users)]
+            latencies: List[float] = []
+            errors = [0]
+            lock = threading.Lock()
+            deadline = time.perf_counter() + duration
+
+            def user(client, offset):
+                i = offset
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        client.predict(argument(i), api_name=path)
+                    except Exception:
+                        with lock:
+                            errors[0] += 1
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+                    i += users
+
+            threads = [threading.Thread(target=user, args=(client, n)) for n, client in enumerate(clients)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+
+            name = path.strip("/")
+            metrics[f"concurrency.{name}.qps"] = len(latencies) / elapsed
+            metrics[f"concurrency.{name}.p50_ms"] = percentile(latencies, 0.5) * 1000
+            metrics[f"concurrency.{name}.p95_ms"] = percentile(latencies, 0.95) * 1000
+            metrics[f"concurrency.{name}.errors"] = errors[0]
+    finally:
+        demo.close()
+    return metrics
+
+
+def bench_batch(symbols: List[str], rounds: int = 3) -> Dict[str, float]:
+    from app import StockAnalysisAgent
+    from ratelimit import Priority, priority
+    from screener import FundamentalsScreener
+
+    agent = StockAnalysisAgent()
+    screener = FundamentalsScreener(os.path.join(os.environ["STOCK_VIEW_DATA"], "batch.npz"))
+    start = time.perf_counter()
+    with priority(Priority.BATCH):
+        for _ in range(rounds):
+            screener.refresh(agent, symbols, max_age=0)
+    elapsed = time.perf_counter() - start
+    return {"batch.screener_refresh.symbols_per_s": len(symbols) * rounds / elapsed}
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith(("qps", "per_s"))
+
+
+def compare(metrics: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    regressions = []
+    for metric, value in metrics.items():
+        base = baseline.get(metric)
+        if not base or metric.endswith("errors"):
+            continue
+        change = (value - base) / base
+        worse = -change if higher_is_better(metric) else change
+        if worse > tolerance:
+            regressions.append(f"{metric}: {value:.2f} vs baseline {base:.2f} ({worse:+.0%} worse)")
+    return regressions
+
+
+def record(symbols: List[str], fixtures_dir: str) -> None:
+    import fixtures
+    from app import StockAnalysisAgent
+
+    fixtures.install("record", fixtures_dir)
+    agent = StockAnalysisAgent()
+    for symbol in symbols:
+        start = time.perf_counter()
+        agent.analyze_stock(symbol)
+        print(f"recorded {symbol} in {time.perf_counter() - start:.1f}s")
+
+
+def run(args) -> int:
+    import fixtures
+    from ratelimit import RateLimiter, set_rate_limiter
+    from stub_server import StubConfig, serve
+
+    symbols = args.symbols or recorded_symbols(args.fixtures)
+    if not symbols:
+        print(f"No fixtures in {args.fixtures}; record some first with: python bench.py record AAPL MSFT")
+        return 1
+
+    stub = serve(StubConfig(args.fixtures, args.stub_latency_ms, args.stub_jitter_ms,
+                            args.stub_error_rate, args.stub_throttle_rate, seed=0), port=free_port())
+    fixtures.install("replay", f"http://127.0.0.1:{stub.server_address[1]}")
+    if not args.real_limits:
+        # Measure our own code, not the production pacing of Yahoo and Reddit
+        set_rate_limiter(RateLimiter({"yahoo": (1000.0, 100), "reddit": (1000.0, 100)}))
+
+    metrics: Dict[str, float] = {}
+    try:
+        if args.suite in ("latency", "all"):
+            metrics.update(bench_latency(symbols))
+        if args.suite in ("batch", "all"):
+            metrics.update(bench_batch(symbols))
+        if args.suite in ("concurrency", "all"):
+            metrics.update(bench_concurrency(symbols, args.users, args.duration))
+    finally:
+        stub.shutdown()
+
+    width = max(len(m) for m in metrics)
+    for metric, value in metrics.items():
+        print(f"{metric:<{width}}  {value:>10.2f}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    if args.save_baseline:
+        baseline.update(metrics)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(metrics, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    import fixtures
+
+    parser = argparse.ArgumentParser(description="stock_view benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = sub.add_parser("record", help="analyze symbols live and save their responses as fixtures")
+    record_parser.add_argument("symbols", nargs="+")
+    record_parser.add_argument("--fixtures", default=fixtures.FIXTURES_DIR)
+
+    run_parser = sub.add_parser("run", help="benchmark against the stub server")
+    run_parser.add_argument("--suite", choices=["latency", "concurrency", "batch", "all"], default="all")
+    run_parser.add_argument("--symbols", nargs="*")
+    run_parser.add_argument("--fixtures", default=fixtures.FIXTURES_DIR)
+    run_parser.add_argument("--users", type=int, default=4)
+    run_parser.add_argument("--duration", type=float, default=20.0)
+    run_parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    run_parser.add_argument("--stub-jitter-ms", type=float, default=10.0)
+    run_parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    run_parser.add_argument("--stub-throttle-rate", type=float, default=0.0)
+    run_parser.add_argument("--real-limits", action="store_true", help="keep production rate limits")
+    run_parser.add_argument("--baseline", default=BASELINE_PATH)
+    run_parser.add_argument("--save-baseline", action="store_true")
+    run_parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record([s.upper() for s in args.symbols], args.fixtures)
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            os.environ["STOCK_VIEW_DATA"] = data_dir
+            sys.exit(run(args))
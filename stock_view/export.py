@@ -0,0 +1,204 @@
+"""Incremental static export of watchlist reports.
+
+    python export.py watchlist.txt --out site --formats html,md
+
+For every symbol the data behind its report (fundamentals, trading stats,
+financial health, risk, technicals, dividends, peers and news links) is
+hashed. Floats are rounded to ``--precision`` significant digits first, so
+tick-level noise does not count as a change. A page is only re-rendered and
+rewritten when its hash differs from the one in ``manifest.json``. Reddit
+and Twitter links are left out of the hash, because they embed relative
+times and today's date. They refresh whenever the page is re-rendered.
+
+The output is plain files (one page per symbol, ``index.html`` /
+``index.md`` and the manifest), ready to be served from a CDN.
+"""
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List
+
+HASHED_FIELDS = [
+    "symbol", "company_name", "fundamentals", "trading_stats", "financial_health", "risk_metrics",
+    "dividend_info", "technicals", "peers", "news_links",
+]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ font-family: system-ui, sans-serif; max-width: 920px; margin: 2rem auto; padding: 0 1rem; line-height: 1.5; }}
+table {{ border-collapse: collapse; }} td, th {{ padding: 0.25rem 0.75rem; border-bottom: 1px solid #ddd; text-align: left; }}
+a {{ word-break: break-all; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def _normalize(value, precision: int):
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return str(value)
+        return float(f"{value:.{precision}g}")
+    if isinstance(value, dict):
+        return {str(k): _normalize(v, precision) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, precision) for v in value]
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+    # NumPy scalars and the like
+    try:
+        return _normalize(float(value), precision)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def content_hash(analysis, precision: int = 3) -> str:
+    data = asdict(analysis)
+    payload = {name: _normalize(data.get(name), precision) for name in HASHED_FIELDS}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def markdown_to_html(markdown: str) -> str:
+    from markdown_it import MarkdownIt
+
+    # Bare URLs in the report become autolinks
+    linked = re.sub(r"(?<![(<])(https?://[^\s)]+)", r"<\1>", markdown)
+    return MarkdownIt("commonmark").enable("table").render(linked)
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+    return True
+
+
+class StaticExporter:
+    """Renders watchlist reports to static files, rewriting only what changed"""
+
+    def __init__(self, agent, out_dir: str, formats: List[str] = ("html", "md"), precision: int = 3):
+        self.agent = agent
+        self.out_dir = out_dir
+        self.formats = list(formats)
+        self.precision = precision
+        self.manifest_path = os.path.join(out_dir, "manifest.json")
+        self.manifest: Dict[str, Dict] = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def export_symbol(self, symbol: str, force: bool = False) -> str:
+        """Returns 'written', 'unchanged' or 'failed: <reason>'"""
+        try:
+            analysis = self.agent.collect_analysis(symbol)
+        except Exception as e:
+            return f"failed: {e}"
+
+        digest = content_hash(analysis, self.precision)
+        previous = self.manifest.get(symbol, {})
+        pages_exist = all(os.path.exists(os.path.join(self.out_dir, f"{symbol}.{fmt}")) for fmt in self.formats)
+        if not force and previous.get("hash") == digest and pages_exist:
+            return "unchanged"
+
+        markdown = self.agent.format_analysis_report(analysis)
+        if "md" in self.formats:
+            _write_if_changed(os.path.join(self.out_dir, f"{symbol}.md"), markdown)
+        if "html" in self.formats:
+            page = PAGE_TEMPLATE.format(
+                title=html.escape(f"{analysis.company_name} ({symbol})"),
+                body='<p><a href="index.html">&larr; Watchlist</a></p>\n' + markdown_to_html(markdown),
+            )
+            _write_if_changed(os.path.join(self.out_dir, f"{symbol}.html"), page)
+
+        self.manifest[symbol] = {
+            "hash": digest,
+            "company_name": analysis.company_name,
+            "current_price": _normalize(analysis.trading_stats.get("current_price"), 6),
+            "day_change_percent": _normalize(analysis.trading_stats.get("day_change_percent"), 3),
+            "rendered_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        return "written"
+
+    def export(self, symbols: List[str], workers: int = 4, force: bool = False) -> Dict[str, str]:
+        from ratelimit import Priority, priority
+
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        def run(symbol):
+            with priority(Priority.BATCH):
+                return symbol, self.export_symbol(symbol, force)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = dict(pool.map(run, symbols))
+
+        self._write_index(symbols)
+        _write_if_changed(self.manifest_path, json.dumps(self.manifest, indent=2, sort_keys=True))
+        return results
+
+    def _write_index(self, symbols: List[str]) -> None:
+        def cell(value, suffix=""):
+            return "N/A" if not isinstance(value, (int, float)) else f"{value:,.2f}{suffix}"
+
+        rows = [(s, self.manifest[s]) for s in symbols if s in self.manifest]
+        link_format = "html" if "html" in self.formats else "md"
+
+        lines = ["# 📋 Watchlist Reports", "", "| Symbol | Company | Price | Day change | Updated |", "|---|---|---|---|---|"]
+        for symbol, entry in rows:
+            lines.append(
+                f"| [{symbol}]({symbol}.{link_format}) | {entry['company_name']} | {cell(entry['current_price'])} "
+                f"| {cell(entry['day_change_percent'], '%')} | {entry['rendered_at']} |"
+            )
+        markdown = "\n".join(lines) + "\n"
+
+        if "md" in self.formats:
+            _write_if_changed(os.path.join(self.out_dir, "index.md"), markdown.replace(".html)", ".md)"))
+        if "html" in self.formats:
+            page = PAGE_TEMPLATE.format(title="Watchlist Reports", body=markdown_to_html(markdown))
+            _write_if_changed(os.path.join(self.out_dir, "index.html"), page)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export watchlist reports as static pages")
+    parser.add_argument("watchlist", help="file with one symbol per line")
+    parser.add_argument("--out", default="site")
+    parser.add_argument("--formats", default="html,md")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--precision", type=int, default=3, help="significant digits compared when hashing")
+    parser.add_argument("--force", action="store_true", help="re-render every page")
+    args = parser.parse_args()
+
+    from app import StockAnalysisAgent
+
+    with open(args.watchlist, encoding="utf-8") as f:
+        watchlist = list(dict.fromkeys(line.strip().upper() for line in f if line.strip()))
+
+    start = time.perf_counter()
+    exporter = StaticExporter(StockAnalysisAgent(), args.out, args.formats.split(","), args.precision)
+    results = exporter.export(watchlist, args.workers, args.force)
+
+    written = [s for s, r in results.items() if r == "written"]
+    failed = {s: r for s, r in results.items() if r.startswith("failed")}
+    print(f"{len(written)} written, {len(results) - len(written) - len(failed)} unchanged, "
+          f"{len(failed)} failed in {time.perf_counter() - start:.1f}s")
+    for symbol, reason in failed.items():
+        print(f"  {symbol}: {reason}")
@@ -0,0 +1,248 @@
+"""Record and replay upstream responses.
+
+``install(mode, target, app_module)`` swaps the ``yf`` and ``praw`` modules
+used by ``app`` and ``peers`` for proxies:
+
+- ``record``: calls go to Yahoo/Reddit as usual and every response is written
+  under ``target`` (one JSON file per call, e.g. ``yahoo/AAPL/info.json``);
+- ``replay``: responses are read back from ``target``, which is either a
+  fixture directory or the URL of ``stub_server.py``. Nothing touches the
+  network except the stub server.
+
+Reddit timestamps are shifted by the fixture's age on replay so "last 48
+hours" filters behave as they did when recording.
+
+From the command line the app picks this up from the environment:
+
+    STOCK_VIEW_FIXTURES=record:fixtures python app.py
+    STOCK_VIEW_FIXTURES=replay:http://127.0.0.1:8765 python app.py
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import time
+import types
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class FixtureMissing(LookupError):
+    """No recorded response for this call"""
+
+
+class StubHTTPError(Exception):
+    """Error status injected by the stub server; shaped like requests' HTTPError"""
+
+    def __init__(self, status_code: int, headers: Dict[str, str]):
+        super().__init__(f"stub server returned {status_code}")
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def fixture_key(service: str, target: str, method: str, kwargs: Optional[Dict] = None) -> str:
+    """Relative fixture path, readable for the common cases and hashed for arguments"""
+    safe_target = re.sub(r"[^A-Za-z0-9._-]+", "_", target) or "_"
+    name = method
+    if kwargs:
+        digest = hashlib.sha1(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()[:10]
+        name = f"{method}-{digest}"
+    return f"{service}/{safe_target}/{name}.json"
+
+
+def encode(value: Any) -> Dict:
+    """JSON-safe envelope for the response types the agent uses"""
+    if hasattr(value, "to_json") and hasattr(value, "index"):
+        return {
+            "type": "frame",
+            "data": value.to_json(orient="split", date_format="iso"),
+            "datetime_index": hasattr(value.index, "tz"),
+        }
+    if isinstance(value, list) and value and hasattr(value[0], "permalink"):
+        return {"type": "submissions", "data": [
+            {"title": s.title, "score": s.score, "created_utc": s.created_utc, "permalink": s.permalink}
+            for s in value
+        ]}
+    return {"type": "json", "data": value}
+
+
+def decode(envelope: Dict) -> Any:
+    if envelope["type"] == "frame":
+        import pandas as pd
+
+        frame = pd.read_json(io.StringIO(envelope["data"]), orient="split", convert_dates=False)
+        if envelope.get("datetime_index"):
+            frame.index = pd.to_datetime(frame.index, utc=True)
+        return frame
+    if envelope["type"] == "submissions":
+        age = time.time() - envelope.get("recorded_at", time.time())
+        return [SimpleNamespace(**{**s, "created_utc": s["created_utc"] + age}) for s in envelope["data"]]
+    return envelope["data"]
+
+
+class FixtureStore:
+    """Fixture files on disk, or fetched from a stub server when ``source`` is a URL"""
+
+    def __init__(self, source: str = FIXTURES_DIR, timeout: float = 30.0):
+        self.source = source
+        self.timeout = timeout
+        self.remote = source.startswith(("http://", "https://"))
+
+    def save(self, key: str, value: Any) -> Any:
+        envelope = {**encode(value), "recorded_at": time.time()}
+        path = os.path.join(self.source, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(envelope, f, default=str)
+        return value
+
+    def load(self, key: str) -> Any:
+        if self.remote:
+            try:
+                with urllib.request.urlopen(f"{self.source.rstrip('/')}/fixture/{key}", timeout=self.timeout) as r:
+                    envelope = json.load(r)
+            except urllib.error.HTTPError as e:
+                if e.code == 404:
+                    raise FixtureMissing(key) from None
+                raise StubHTTPError(e.code, dict(e.headers)) from None
+        else:
+            path = os.path.join(self.source, key)
+            if not os.path.exists(path):
+                raise FixtureMissing(key)
+            with open(path, encoding="utf-8") as f:
+                envelope = json.load(f)
+        return decode(envelope)
+
+
+class _Call:
+    """Runs one upstream call live-and-record or from fixtures"""
+
+    def __init__(self, store: FixtureStore, recording: bool):
+        self.store = store
+        self.recording = recording
+
+    def __call__(self, key: str, live):
+        if self.recording:
+            return self.store.save(key, live())
+        return self.store.load(key)
+
+
+class _Ticker:
+    def __init__(self, call: _Call, real_yf, symbol: str):
+        self._call, self._real_yf, self._symbol = call, real_yf, symbol
+        self._ticker = None
+
+    def _live(self):
+        if self._ticker is None:
+            self._ticker = self._real_yf.Ticker(self._symbol)
+        return self._ticker
+
+    @property
+    def info(self):
+        return self._call(fixture_key("yahoo", self._symbol, "info"), lambda: self._live().info)
+
+    @property
+    def news(self):
+        return self._call(fixture_key("yahoo", self._symbol, "news"), lambda: self._live().news)
+
+    def history(self, **kwargs):
+        return self._call(fixture_key("yahoo", self._symbol, "history", kwargs), lambda: self._live().history(**kwargs))
+
+
+class _Domain:
+    def __init__(self, call: _Call, real_yf, kind: str, key: str):
+        self._call, self._real_yf, self._kind, self._key = call, real_yf, kind, key
+
+    @property
+    def top_companies(self):
+        live = lambda: getattr(self._real_yf, self._kind)(self._key).top_companies
+        return self._call(fixture_key("yahoo", f"{self._kind}-{self._key}", "top_companies"), live)
+
+
+class FixtureYFinance:
+    """Stands in for the yfinance module"""
+
+    def __init__(self, call: _Call, real_yf):
+        self._call, self._real_yf = call, real_yf
+
+    def Ticker(self, symbol: str) -> _Ticker:
+        return _Ticker(self._call, self._real_yf, symbol)
+
+    def Industry(self, key: str) -> _Domain:
+        return _Domain(self._call, self._real_yf, "Industry", key)
+
+    def Sector(self, key: str) -> _Domain:
+        return _Domain(self._call, self._real_yf, "Sector", key)
+
+    def __getattr__(self, name):
+        return getattr(self._real_yf, name)
+
+
+class _Subreddit:
+    def __init__(self, call: _Call, live_reddit, name: str):
+        self._call, self._live_reddit, self._name = call, live_reddit, name
+
+    def search(self, query: str, **kwargs):
+        live = lambda: list(self._live_reddit().subreddit(self._name).search(query, **kwargs))
+        return iter(self._call(fixture_key("reddit", self._name, "search", {"q": query, **kwargs}), live))
+
+
+class _Reddit:
+    def __init__(self, call: _Call, real_praw, args, kwargs):
+        self._call, self._real_praw, self._args, self._kwargs = call, real_praw, args, kwargs
+        self._reddit = None
+        self.read_only = True
+
+    def _live(self):
+        if self._reddit is None:
+            self._reddit = self._real_praw.Reddit(*self._args, **self._kwargs)
+            self._reddit.read_only = self.read_only
+        return self._reddit
+
+    def subreddit(self, name: str) -> _Subreddit:
+        return _Subreddit(self._call, self._live, name)
+
+
+class FixturePraw:
+    """Stands in for the praw module"""
+
+    def __init__(self, call: _Call, real_praw):
+        self._call, self._real_praw = call, real_praw
+
+    def Reddit(self, *args, **kwargs) -> _Reddit:
+        return _Reddit(self._call, self._real_praw, args, kwargs)
+
+
+def install(mode: str, target: str = FIXTURES_DIR, app_module: Optional[types.ModuleType] = None) -> FixtureStore:
+    """Route app's and peers' upstream calls through fixtures; mode is 'record' or 'replay'
+
+    ``app_module`` is the loaded app.py. Under ``python app.py`` that is
+    ``__main__``, and ``import app`` would patch a second, unused copy.
+    """
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Unknown fixture mode '{mode}' (expected record or replay)")
+    import peers
+
+    if app_module is None:
+        import app as app_module
+
+    store = FixtureStore(target)
+    call = _Call(store, recording=mode == "record")
+    fake_yf = FixtureYFinance(call, app_module.yf)
+    app_module.yf = peers.yf = fake_yf
+    app_module.praw = FixturePraw(call, app_module.praw)
+    return store
+
+
+def install_from_env(variable: str = "STOCK_VIEW_FIXTURES",
+                     app_module: Optional[types.ModuleType] = None) -> Optional[FixtureStore]:
+    """Install from ``mode:target``, e.g. ``replay:http://127.0.0.1:8765``"""
+    spec = os.environ.get(variable)
+    if not spec:
+        return None
+    mode, _, target = spec.partition(":")
+    return install(mode, target or FIXTURES_DIR, app_module)
@@ -0,0 +1,100 @@
+"""Lean, shared price history.
+
+yfinance returns a full OHLCV + dividends/splits DataFrame for every
+``history()`` call. The report only needs closes and volumes, so
+``HistoryCache`` keeps just those two columns as contiguous arrays (float32
+closes, float64 volumes, which float32 cannot hold exactly past 2**24) and
+drops the frame straight away. Arrays are marked read-only and handed to
+every request that asks for the same symbol within ``ttl`` seconds, so
+concurrent requests share one buffer instead of each building a frame.
+
+The cache is an LRU bounded by ``max_entries``, which keeps a long-running
+worker's footprint flat however many symbols it sees. Concurrent misses for
+the same symbol wait for a single fetch.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+class PriceHistory(NamedTuple):
+    close: np.ndarray
+    volume: np.ndarray
+
+
+def _readonly(values, dtype) -> np.ndarray:
+    array = np.ascontiguousarray(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+def lean_history(frame) -> PriceHistory:
+    """Close and Volume columns of a yfinance frame as read-only float32 and float64 arrays"""
+    if frame is None or frame.empty:
+        return PriceHistory(_readonly([], np.float32), _readonly([], np.float64))
+    return PriceHistory(
+        _readonly(frame["Close"].to_numpy(), np.float32),
+        _readonly(frame["Volume"].to_numpy(), np.float64),
+    )
+
+
+class HistoryCache:
+    """Process-wide LRU of lean price histories keyed by (symbol, period)"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, PriceHistory]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str, period: str, fetch: Callable[[], object]) -> PriceHistory:
+        """Cached history, or ``lean_history(fetch())`` on a miss"""
+        key = (symbol, period)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            waiting.wait()
+
+        try:
+            history = lean_history(fetch())
+            with self._lock:
+                self._entries[key] = (time.monotonic(), history)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return history
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            nbytes = sum(h.close.nbytes + h.volume.nbytes for _, h in self._entries.values())
+            return {"entries": len(self._entries), "bytes": nbytes, "hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[HistoryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_history_cache() -> HistoryCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HistoryCache()
+        return _cache
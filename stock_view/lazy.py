@@ -0,0 +1,32 @@
+"""Deferred imports for heavy optional dependencies.
+
+gradio, yfinance and praw together take seconds to import. Binding them as
+``LazyModule`` proxies keeps call sites unchanged (``yf.Ticker(...)``) while
+the real import happens on first attribute access, so workers and CLIs that
+never touch a dependency never pay for it.
+"""
+import importlib
+import threading
+
+
+class LazyModule:
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
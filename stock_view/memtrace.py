@@ -0,0 +1,86 @@
+"""Per-request allocation accounting with tracemalloc.
+
+Off by default, since tracing slows allocation down. Enable it with
+``STOCK_VIEW_TRACEMALLOC=1`` (or ``get_allocation_tracker().start()``) and
+every tracked request prints its net and peak allocation, with running
+totals available from ``stats()``.
+
+tracemalloc counts the whole process, so figures for requests that overlap
+include each other's allocations. Run one request at a time when you need
+exact per-request numbers. The net figure is what a request leaves behind.
+If it stays near zero under sustained load, the worker's memory stays flat.
+"""
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class AllocationTracker:
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    @contextmanager
+    def track(self, label: str, detail: str = ""):
+        """Record net and peak traced memory for the enclosed block"""
+        if not self.enabled:
+            yield
+            return
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            after, peak = tracemalloc.get_traced_memory()
+            net, peak = after - before, max(0, peak - before)
+            with self._lock:
+                stats = self._stats.setdefault(label, {"count": 0, "net_bytes": 0, "max_peak_bytes": 0})
+                stats["count"] += 1
+                stats["net_bytes"] += net
+                stats["max_peak_bytes"] = max(stats["max_peak_bytes"], peak)
+            print(f"[mem] {label} {detail}: net {net / 1024:+.1f} KiB, peak {peak / 1024:.1f} KiB, traced {after / 1024 / 1024:.1f} MiB")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {
+                label: {**s, "mean_net_kib": round(s["net_bytes"] / s["count"] / 1024, 1)}
+                for label, s in self._stats.items()
+            }
+        if self.enabled:
+            current, _ = tracemalloc.get_traced_memory()
+            result["process"] = {"traced_mib": round(current / 1024 / 1024, 2)}
+        return result
+
+    def top_allocations(self, limit: int = 10) -> List[str]:
+        """Source lines holding the most traced memory right now"""
+        if not self.enabled:
+            return []
+        return [str(stat) for stat in tracemalloc.take_snapshot().statistics("lineno")[:limit]]
+
+
+_tracker: Optional[AllocationTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_allocation_tracker() -> AllocationTracker:
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = AllocationTracker()
+            if os.environ.get("STOCK_VIEW_TRACEMALLOC") == "1":
+                _tracker.start()
+        return _tracker
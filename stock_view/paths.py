@@ -0,0 +1,9 @@
+"""Where stock_view keeps its on-disk state.
+
+Every store (indicators, screener, peers) lives under ``DATA_DIR``, which is
+``data/`` next to the code unless ``STOCK_VIEW_DATA`` points elsewhere. The
+variable is read at import, so set it before importing the stores.
+"""
+import os
+
+DATA_DIR = os.environ.get("STOCK_VIEW_DATA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
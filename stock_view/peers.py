@@ -0,0 +1,158 @@
+"""Peer comparison for the analysis report.
+
+Peers are the top companies of the symbol's Yahoo Finance industry (falling
+back to its sector). Peer lists are cached in ``data/peers.json`` for a week
+and peer fundamentals live in the screener's columnar store, which is only
+refetched for peers that are missing or older than a day. A warm report
+therefore adds no upstream calls for its peer section.
+
+Percentile ranks for every metric are computed in one vectorised pass over a
+(metrics x peers) matrix.
+
+A cold peer section takes one ``.info`` call per peer, which both the
+fundamentals and the financial health are read from. The report never waits
+for them: it ranks against the peers already in the store while the missing
+or stale ones are refetched on a background thread at prefetch priority, and
+the next report includes them. The peer-list lookup itself runs at batch
+priority (see ratelimit.py).
+"""
+import json
+import math
+import os
+import threading
+import time
+import warnings
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from lazy import LazyModule
+from paths import DATA_DIR
+from ratelimit import Priority, current_priority, get_rate_limiter, priority
+
+yf = LazyModule("yfinance")
+
+PEERS_PATH = os.path.join(DATA_DIR, "peers.json")
+
+RANKED_METRICS = [
+    'pe_ratio', 'forward_pe', 'peg_ratio', 'price_to_book', 'price_to_sales',
+    'ev_to_revenue', 'ev_to_ebitda', 'profit_margin', 'operating_margin',
+    'return_on_equity', 'return_on_assets', 'revenue_growth', 'earnings_growth',
+    'debt_to_equity', 'current_ratio', 'quick_ratio', 'market_cap', 'free_cash_flow',
+]
+
+
+def percentile_ranks(target: np.ndarray, peers: np.ndarray) -> np.ndarray:
+    """
+    Percentile of each target value within its row of peers (ties count half).
+    ``target`` has shape (metrics,), ``peers`` (metrics x peers); NaNs are ignored.
+    """
+    column = target[:, None]
+    count = (~np.isnan(peers)).sum(axis=1)
+    below = (peers < column).sum(axis=1)
+    equal = (peers == column).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ranks = (below + 0.5 * equal) / count * 100
+    return np.where((count > 0) & ~np.isnan(target), ranks, math.nan)
+
+
+class PeerComparison:
+    """Derives peer sets and ranks a symbol's fundamentals against them"""
+
+    def __init__(self, screener, path: str = PEERS_PATH, max_peers: int = 15,
+                 peers_max_age: float = 7 * 24 * 3600, fundamentals_max_age: float = 24 * 3600):
+        self.screener = screener
+        self.path = path
+        self.max_peers = max_peers
+        self.peers_max_age = peers_max_age
+        self.fundamentals_max_age = fundamentals_max_age
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict] = {}
+        self._refreshing: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._cache = json.load(f)
+
+    def peers_for(self, symbol: str, info: Dict) -> List[str]:
+        """Top companies in the symbol's industry (or sector), cached per industry"""
+        for kind, key in (("industry", info.get('industryKey')), ("sector", info.get('sectorKey'))):
+            if not key:
+                continue
+            cache_key = f"{kind}:{key}"
+            with self._lock:
+                cached = self._cache.get(cache_key)
+            if cached is None or time.time() - cached["fetched_at"] > self.peers_max_age:
+                try:
+                    domain = yf.Industry(key) if kind == "industry" else yf.Sector(key)
+                    companies = get_rate_limiter().call("yahoo", lambda: domain.top_companies)
+                    symbols = [] if companies is None else [str(s) for s in companies.index]
+                except Exception:
+                    symbols = []
+                cached = {"symbols": symbols, "fetched_at": time.time()}
+                with self._lock:
+                    self._cache[cache_key] = cached
+                    self._save()
+
+            peers = [s for s in cached["symbols"] if s != symbol][:self.max_peers]
+            if peers:
+                return peers
+        return []
+
+    def compare(self, agent, symbol: str, info: Dict, fields: Dict) -> Dict:
+        """
+        Rank ``fields`` (the symbol's already-fetched fundamentals and financial
+        health) against the peers already in the store. Returns peers,
+        per-metric percentile and peer median, and how many peers are still
+        being fetched in the background.
+        """
+        self.screener.upsert(symbol, fields)
+        # Never raise the caller's priority, only lower it
+        level = current_priority()
+        with priority(max(level, Priority.BATCH)):
+            peers = self.peers_for(symbol, info)
+        if not peers:
+            return {}
+        self.refresh_in_background(agent, peers)
+
+        matrix = self.screener.values(peers, RANKED_METRICS)
+        target = self.screener.values([symbol], RANKED_METRICS)[:, 0]
+        ranks = percentile_ranks(target, matrix)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            medians = np.nanmedian(matrix, axis=1)
+
+        return {
+            'peers': peers,
+            'percentiles': {m: float(r) for m, r in zip(RANKED_METRICS, ranks) if not math.isnan(r)},
+            'medians': {m: float(v) for m, v in zip(RANKED_METRICS, medians) if not math.isnan(v)},
+            'peer_count': {m: int(c) for m, c in zip(RANKED_METRICS, (~np.isnan(matrix)).sum(axis=1))},
+            'refreshing': len(self.screener.stale(peers, self.fundamentals_max_age)),
+        }
+
+    def refresh_in_background(self, agent, peers: List[str]) -> Optional[threading.Thread]:
+        """Refetch missing or stale peers at prefetch priority; None when there is nothing new to fetch"""
+        with self._lock:
+            todo = [s for s in self.screener.stale(peers, self.fundamentals_max_age) if s not in self._refreshing]
+            if not todo:
+                return None
+            self._refreshing.update(todo)
+
+        def run():
+            try:
+                # A new thread starts at interactive priority, so lower it explicitly
+                with priority(Priority.PREFETCH):
+                    self.screener.refresh(agent, todo, max_age=self.fundamentals_max_age)
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(todo)
+
+        thread = threading.Thread(target=run, name="peer-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp, self.path)
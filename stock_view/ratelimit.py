@@ -0,0 +1,228 @@
+"""Shared, priority-aware rate limiting for upstream calls.
+
+Every Yahoo Finance and Reddit call made by ``StockAnalysisAgent`` goes
+through ``RateLimiter.call(host, fn)``. Each host has a token bucket; when a
+call fails with HTTP 429 the bucket pauses (honouring ``Retry-After`` when
+given), halves its rate and then recovers it gradually on success.
+
+Callers waiting on the same host are served by priority class. Interactive
+chat requests (the default) go first and may use the whole bucket; batch and
+prefetch work queue behind them and leave one and two tokens respectively in
+reserve, so an interactive request arriving next finds a token waiting.
+Background code marks itself with ``with priority(Priority.BATCH): ...``;
+the peer fundamentals fan-out in ``peers.py`` runs at ``PREFETCH``.
+
+``metrics()`` reports per-host queue depth, wait-time percentiles per
+priority, current rate and throttle counts.
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, Dict, Optional, Tuple
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+    PREFETCH = 2
+
+
+# Tokens each class must leave in the bucket for higher-priority callers
+RESERVE = {Priority.INTERACTIVE: 0, Priority.BATCH: 1, Priority.PREFETCH: 2}
+
+# host: (requests per second, burst)
+DEFAULT_LIMITS: Dict[str, Tuple[float, int]] = {
+    "yahoo": (2.0, 5),
+    "reddit": (0.5, 4),
+}
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("upstream_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def priority(level: Priority):
+    """Run upstream calls in this block (and this thread) at the given priority"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True for 429s from requests, prawcore or yfinance, without importing them"""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    return type(error).__name__ in ("YFRateLimitError", "TooManyRequests")
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class HostBucket:
+    """Token bucket for one host, with an adaptive rate and a priority queue of waiters"""
+
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttle_streak = 0
+        self.waiters = []
+        self.calls = 0
+        self.throttled = 0
+        self.max_queue_depth = 0
+        self.waits = {level: deque(maxlen=1000) for level in Priority}
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """Per-host token buckets shared by every agent in the process"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 default: Tuple[float, int] = (1.0, 2), max_retries: int = 3, max_pause: float = 60.0):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.default = default
+        self.max_retries = max_retries
+        self.max_pause = max_pause
+        self._hosts: Dict[str, HostBucket] = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+
+    def _bucket(self, host: str) -> HostBucket:
+        bucket = self._hosts.get(host)
+        if bucket is None:
+            bucket = self._hosts[host] = HostBucket(*self.limits.get(host, self.default))
+        return bucket
+
+    def acquire(self, host: str, level: Optional[Priority] = None) -> float:
+        """Block until a token for ``host`` is granted; returns seconds waited"""
+        level = current_priority() if level is None else level
+        start = time.monotonic()
+        with self._cond:
+            bucket = self._bucket(host)
+            entry = (level, next(self._seq))
+            heapq.heappush(bucket.waiters, entry)
+            bucket.max_queue_depth = max(bucket.max_queue_depth, len(bucket.waiters))
+            needed = 1 + min(RESERVE[level], bucket.burst - 1)
+            try:
+                while True:
+                    now = time.monotonic()
+                    bucket.refill(now)
+                    if now < bucket.paused_until:
+                        self._cond.wait(bucket.paused_until - now)
+                    elif bucket.waiters[0] == entry and bucket.tokens >= needed:
+                        bucket.tokens -= 1
+                        bucket.calls += 1
+                        break
+                    else:
+                        self._cond.wait(max((needed - bucket.tokens) / bucket.rate, 0.005))
+            finally:
+                bucket.waiters.remove(entry)
+                heapq.heapify(bucket.waiters)
+                self._cond.notify_all()
+        waited = time.monotonic() - start
+        bucket.waits[level].append(waited)
+        return waited
+
+    def throttled(self, host: str, pause: Optional[float] = None) -> None:
+        """Record a 429: pause the host, then resume at half the rate"""
+        with self._cond:
+            bucket = self._bucket(host)
+            bucket.throttled += 1
+            bucket.throttle_streak += 1
+            bucket.rate = max(bucket.base_rate / 16, bucket.rate / 2)
+            bucket.tokens = 0.0
+            if pause is None:
+                pause = 2 ** (bucket.throttle_streak - 1)
+            bucket.paused_until = time.monotonic() + min(pause, self.max_pause)
+            self._cond.notify_all()
+
+    def succeeded(self, host: str) -> None:
+        """Recover the rate additively after a throttle"""
+        with self._cond:
+            bucket = self._bucket(host)
+            bucket.throttle_streak = 0
+            if bucket.rate < bucket.base_rate:
+                bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate / 10)
+
+    def call(self, host: str, fn: Callable, *args, **kwargs):
+        """Run ``fn`` under the host's limit, retrying after 429s"""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(host)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                self.throttled(host, retry_after(e))
+                continue
+            self.succeeded(host)
+            return result
+
+    def metrics(self) -> Dict[str, Dict]:
+        def summarize(waits) -> Dict[str, float]:
+            ordered = sorted(waits)
+            if not ordered:
+                return {"count": 0}
+            return {
+                "count": len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+
+        with self._cond:
+            return {
+                host: {
+                    "rate_per_s": round(bucket.rate, 3),
+                    "base_rate_per_s": bucket.base_rate,
+                    "queue_depth": len(bucket.waiters),
+                    "max_queue_depth": bucket.max_queue_depth,
+                    "calls": bucket.calls,
+                    "throttled": bucket.throttled,
+                    "paused_for_s": round(max(0.0, bucket.paused_until - time.monotonic()), 1),
+                    "wait": {level.name.lower(): summarize(bucket.waits[level]) for level in Priority},
+                }
+                for host, bucket in self._hosts.items()
+            }
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter, so concurrent requests share each host's budget"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def set_rate_limiter(limiter: RateLimiter) -> None:
+    """Replace the process-wide limiter, e.g. with looser limits when replaying fixtures"""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
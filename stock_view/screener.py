@@ -0,0 +1,280 @@
+"""Columnar fundamentals screener.
+
+Holds the numeric fields of ``get_fundamentals`` and ``get_financial_health``
+for many symbols as one NumPy array per metric, persisted to a single
+``.npz`` file. Queries such as
+
+    pe_ratio < 15 and return_on_equity > 0.2 order by free_cash_flow desc limit 20
+
+are evaluated as vectorised masks over those arrays, so they take
+milliseconds even for thousands of symbols. ``refresh`` only refetches
+symbols that are missing or older than ``max_age``. ``save`` first merges
+in any row another writer (the CLI, another app) stored more recently, so
+concurrent writers keep each other's rows. ``sync`` only rereads the file
+when it has been replaced since this process last loaded or saved it.
+
+Command line:
+
+    python screener.py refresh watchlist.txt
+    python screener.py query "pe_ratio < 15 order by free_cash_flow desc"
+"""
+import math
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from paths import DATA_DIR
+from ratelimit import Priority, current_priority, priority
+
+STORE_PATH = os.path.join(DATA_DIR, "screener.npz")
+
+OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "=": np.equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+CONDITION = re.compile(r"^\s*([a-z_0-9]+)\s*(<=|>=|==|!=|<|>|=)\s*(-?[\d.]+(?:e-?\d+)?)\s*$", re.IGNORECASE)
+ORDER_BY = re.compile(r"\border\s+by\s+([a-z_0-9]+)(?:\s+(asc|desc))?", re.IGNORECASE)
+LIMIT = re.compile(r"\blimit\s+(\d+)", re.IGNORECASE)
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    """Changes whenever the store is rewritten; ``save`` replaces the file, so the inode changes too"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _to_float(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return math.nan
+    return float(value)
+
+
+class FundamentalsScreener:
+    """Per-metric float64 columns for a universe of symbols"""
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self.symbols = np.array([], dtype=object)
+        self.updated_at = np.array([], dtype=np.float64)
+        self.columns: Dict[str, np.ndarray] = {}
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._stamp: Optional[Tuple[int, int, int]] = None
+
+    @classmethod
+    def load(cls, path: str = STORE_PATH) -> "FundamentalsScreener":
+        screener = cls(path)
+        screener._stamp = _file_stamp(path)
+        if screener._stamp is not None:
+            with np.load(path, allow_pickle=False) as data:
+                screener.symbols = data["symbols"].astype(object)
+                screener.updated_at = data["updated_at"]
+                screener.columns = {
+                    name[4:]: data[name] for name in data.files if name.startswith("col_")
+                }
+            screener._rows = {symbol: i for i, symbol in enumerate(screener.symbols)}
+        return screener
+
+    def sync(self) -> int:
+        """Take rows from the store on disk that are newer than ours; returns how many"""
+        with self._lock:
+            stamp = _file_stamp(self.path)
+            if stamp is None or stamp == self._stamp:
+                return 0
+            disk = type(self).load(self.path)
+            self._stamp = disk._stamp
+            taken = 0
+            for row, symbol in enumerate(disk.symbols):
+                mine = self._rows.get(symbol)
+                if mine is None or disk.updated_at[row] > self.updated_at[mine]:
+                    fields = {name: column[row] for name, column in disk.columns.items()}
+                    self.upsert(symbol, fields, updated_at=float(disk.updated_at[row]))
+                    taken += 1
+            return taken
+
+    def save(self) -> None:
+        with self._lock:
+            self.sync()
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp.npz", delete=False) as f:
+                np.savez(
+                    f,
+                    symbols=self.symbols.astype(str),
+                    updated_at=self.updated_at,
+                    **{f"col_{name}": column for name, column in self.columns.items()},
+                )
+            os.replace(f.name, self.path)
+            self._stamp = _file_stamp(self.path)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def metrics(self) -> List[str]:
+        return sorted(self.columns)
+
+    def upsert(self, symbol: str, fields: Dict, updated_at: Optional[float] = None) -> None:
+        """Write one symbol's fields into the columns, growing them if needed"""
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None:
+                row = len(self.symbols)
+                self._rows[symbol] = row
+                self.symbols = np.append(self.symbols, symbol).astype(object)
+                self.updated_at = np.append(self.updated_at, 0.0)
+                for name in self.columns:
+                    self.columns[name] = np.append(self.columns[name], math.nan)
+
+            for name, value in fields.items():
+                if name not in self.columns:
+                    self.columns[name] = np.full(len(self.symbols), math.nan)
+                self.columns[name][row] = _to_float(value)
+            self.updated_at[row] = time.time() if updated_at is None else updated_at
+
+    def stale(self, symbols: List[str], max_age: float) -> List[str]:
+        now = time.time()
+        return [
+            s for s in symbols
+            if s not in self._rows or now - self.updated_at[self._rows[s]] > max_age
+        ]
+
+    def refresh(self, agent, symbols: List[str], max_age: float = 24 * 3600, workers: int = 8) -> int:
+        """Fetch missing or stale symbols through a StockAnalysisAgent; returns how many were fetched"""
+        todo = self.stale(symbols, max_age)
+        # Pool threads do not inherit the caller's upstream priority, so pass it on
+        level = current_priority()
+
+        def fetch(symbol: str) -> Tuple[str, Dict]:
+            fields = {}
+            with priority(level):
+                # Both parts are read from the same info dict, so it is fetched once per symbol
+                try:
+                    info = agent.get_info(symbol)
+                except Exception:
+                    return symbol, fields
+                parts = (agent.get_fundamentals(symbol, info), agent.get_financial_health(symbol, info))
+            for part in parts:
+                if "error" not in part:
+                    fields.update(part)
+            return symbol, fields
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for symbol, fields in pool.map(fetch, todo):
+                if fields:
+                    self.upsert(symbol, fields)
+        if todo:
+            self.save()
+        return len(todo)
+
+    def query(self, text: str) -> List[Dict]:
+        """
+        Run a screen. Conditions are joined with ``and``; ``order by <metric>
+        [asc|desc]`` and ``limit <n>`` are optional. Raises ValueError on an
+        unknown metric or malformed condition.
+        """
+        limit_match = LIMIT.search(text)
+        limit = int(limit_match.group(1)) if limit_match else 25
+        text = LIMIT.sub("", text)
+
+        order_match = ORDER_BY.search(text)
+        text = ORDER_BY.sub("", text)
+
+        mask = np.ones(len(self.symbols), dtype=bool)
+        used = []
+        for clause in filter(None, (c.strip() for c in re.split(r"\band\b", text, flags=re.IGNORECASE))):
+            match = CONDITION.match(clause)
+            if not match:
+                raise ValueError(f"Cannot parse condition '{clause}' (expected e.g. 'pe_ratio < 15')")
+            metric, op, value = match.group(1).lower(), match.group(2), float(match.group(3))
+            mask &= OPERATORS[op](self._column(metric), value)
+            used.append(metric)
+
+        rows = np.flatnonzero(mask)
+        if order_match:
+            metric = order_match.group(1).lower()
+            descending = (order_match.group(2) or "desc").lower() == "desc"
+            values = self._column(metric)[rows]
+            # Missing values sort last in either direction
+            keys = np.where(np.isnan(values), -np.inf if descending else np.inf, values)
+            order = np.argsort(-keys if descending else keys, kind="stable")
+            rows = rows[order]
+            used.append(metric)
+
+        results = []
+        for row in rows[:limit]:
+            result = {"symbol": str(self.symbols[row])}
+            result.update({metric: float(self.columns[metric][row]) for metric in dict.fromkeys(used)})
+            results.append(result)
+        return results
+
+    def values(self, symbols: List[str], metrics: List[str]) -> np.ndarray:
+        """(metrics x symbols) matrix; NaN for unknown symbols, metrics or missing values"""
+        matrix = np.full((len(metrics), len(symbols)), math.nan)
+        with self._lock:
+            known = [(j, self._rows[s]) for j, s in enumerate(symbols) if s in self._rows]
+            if known:
+                cols, rows = (np.array(x) for x in zip(*known))
+                for i, metric in enumerate(metrics):
+                    if metric in self.columns:
+                        matrix[i, cols] = self.columns[metric][rows]
+        return matrix
+
+    def _column(self, metric: str) -> np.ndarray:
+        if metric not in self.columns:
+            raise ValueError(f"Unknown metric '{metric}'. Available: {', '.join(self.metrics)}")
+        return self.columns[metric]
+
+
+def format_results(results: List[Dict], universe: Optional[int] = None) -> str:
+    """Markdown table for the chat"""
+    if not results:
+        return "No symbols match this screen."
+    headers = list(results[0])
+    lines = [
+        f"## 🔎 Screen results ({len(results)} shown" + (f" of {universe} symbols screened)" if universe else ")"),
+        "| " + " | ".join(headers) + " |",
+        "|" + "---|" * len(headers),
+    ]
+    for result in results:
+        cells = [result["symbol"]] + [
+            "N/A" if math.isnan(result[h]) else f"{result[h]:,.4g}" for h in headers[1:]
+        ]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("refresh", "query"):
+        print(__doc__)
+        sys.exit(1)
+
+    screener = FundamentalsScreener.load()
+    if sys.argv[1] == "refresh":
+        from app import StockAnalysisAgent
+
+        with open(sys.argv[2], encoding="utf-8") as f:
+            watchlist = [line.strip().upper() for line in f if line.strip()]
+        with priority(Priority.BATCH):
+            fetched = screener.refresh(StockAnalysisAgent(), watchlist)
+        print(f"Refreshed {fetched} of {len(watchlist)} symbols ({len(screener)} in store)")
+    else:
+        start = time.perf_counter()
+        results = screener.query(sys.argv[2])
+        print(format_results(results, len(screener)))
+        print(f"\n{(time.perf_counter() - start) * 1000:.2f} ms")
@@ -0,0 +1,125 @@
+"""Local stub for Yahoo and Reddit, serving recorded fixtures over HTTP.
+
+Serves ``GET /fixture/<key>`` from a fixture directory written by
+``fixtures.py`` in record mode, adding configurable latency and injected
+errors so benchmarks see realistic upstream behaviour:
+
+    python stub_server.py --latency-ms 120 --jitter-ms 40 --error-rate 0.02 --throttle-rate 0.05
+
+Throttled responses are 429s with a ``Retry-After`` header, which exercises
+the rate limiter's backoff. ``GET /stats`` returns request and error counts.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from fixtures import FIXTURES_DIR
+
+
+class StubConfig:
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0, seed: Optional[int] = None):
+        self.fixtures_dir = fixtures_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "served": 0, "missing": 0, "errors": 0, "throttled": 0}
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+    def delay(self) -> float:
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+
+def make_handler(config: StubConfig):
+    class StubHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes, headers: Optional[dict] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                with config.lock:
+                    return self._send(200, json.dumps(config.stats).encode())
+            if not self.path.startswith("/fixture/"):
+                return self._send(404, b"{}")
+
+            config.count("requests")
+            time.sleep(config.delay())
+
+            roll = config.roll()
+            if roll < config.throttle_rate:
+                config.count("throttled")
+                return self._send(429, b'{"error": "throttled"}', {"Retry-After": str(config.retry_after)})
+            if roll < config.throttle_rate + config.error_rate:
+                config.count("errors")
+                return self._send(503, b'{"error": "injected"}')
+
+            key = self.path[len("/fixture/"):]
+            path = os.path.realpath(os.path.join(config.fixtures_dir, key))
+            if not path.startswith(os.path.realpath(config.fixtures_dir) + os.sep) or not os.path.exists(path):
+                config.count("missing")
+                return self._send(404, b'{"error": "no fixture"}')
+            with open(path, "rb") as f:
+                body = f.read()
+            config.count("served")
+            self._send(200, body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def serve(config: StubConfig, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Start the stub in a background thread; call ``shutdown()`` on the result to stop it"""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded upstream fixtures over HTTP")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(args.fixtures, args.latency_ms, args.jitter_ms, args.error_rate,
+                        args.throttle_rate, args.retry_after, args.seed)
+    server = serve(config, args.host, args.port)
+    print(f"Serving {args.fixtures} on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
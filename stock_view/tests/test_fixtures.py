@@ -0,0 +1,71 @@
+import importlib.util
+import json
+import os
+import socket
+
+import pytest
+
+import fixtures
+import peers
+from stub_server import StubConfig, serve
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+INFO = {"symbol": "AAPL", "marketCap": 3_000_000_000_000, "trailingPE": 31.5}
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Fail any connection that leaves the machine"""
+    connect = socket.socket.connect
+
+    def guarded(sock, address):
+        if isinstance(address, tuple) and address[0] not in ("127.0.0.1", "localhost", "::1"):
+            raise AssertionError(f"network call to {address} during replay")
+        return connect(sock, address)
+
+    monkeypatch.setattr(socket.socket, "connect", guarded)
+    monkeypatch.setattr(peers, "yf", peers.yf)
+
+
+@pytest.fixture
+def fixture_dir(tmp_path):
+    path = tmp_path / fixtures.fixture_key("yahoo", "AAPL", "info")
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"type": "json", "data": INFO}), encoding="utf-8")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def main_module():
+    """A copy of app.py loaded the way ``python app.py`` loads it, separate from ``import app``"""
+    spec = importlib.util.spec_from_file_location("stock_view_main", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_install_from_env_patches_the_running_module(monkeypatch, offline, fixture_dir, main_module):
+    monkeypatch.setenv("STOCK_VIEW_FIXTURES", f"replay:{fixture_dir}")
+    fixtures.install_from_env(app_module=main_module)
+
+    assert isinstance(main_module.yf, fixtures.FixtureYFinance)
+    assert isinstance(main_module.praw, fixtures.FixturePraw)
+    fundamentals = main_module.StockAnalysisAgent().get_fundamentals("AAPL")
+    assert fundamentals["market_cap"] == INFO["marketCap"]
+    assert fundamentals["pe_ratio"] == INFO["trailingPE"]
+
+
+def test_replay_from_stub_server(offline, fixture_dir, main_module):
+    stub = serve(StubConfig(fixture_dir), port=0)
+    try:
+        fixtures.install("replay", f"http://127.0.0.1:{stub.server_address[1]}", main_module)
+        fundamentals = main_module.StockAnalysisAgent().get_fundamentals("AAPL")
+    finally:
+        stub.shutdown()
+    assert fundamentals["market_cap"] == INFO["marketCap"]
+
+
+def test_missing_fixture_is_not_fetched_live(offline, tmp_path, main_module):
+    fixtures.install("replay", str(tmp_path), main_module)
+    fundamentals = main_module.StockAnalysisAgent().get_fundamentals("MSFT")
+    assert "yahoo/MSFT/info.json" in fundamentals["error"]
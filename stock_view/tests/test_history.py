@@ -0,0 +1,79 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from history import HistoryCache, lean_history
+
+
+def frame(closes, volumes):
+    return pd.DataFrame({"Open": closes, "Close": closes, "Volume": volumes, "Dividends": 0.0})
+
+
+def test_large_volume_round_trips_exactly():
+    history = lean_history(frame([187.25, 188.5], [123456789, 9_876_543_210]))
+    assert history.volume.tolist() == [123456789, 9_876_543_210]
+    assert history.close.dtype == np.float32
+
+
+def test_arrays_are_read_only():
+    history = lean_history(frame([1.0, 2.0], [10, 20]))
+    for array in history:
+        assert array.flags.c_contiguous
+        with pytest.raises(ValueError):
+            array[0] = 0
+
+
+def test_empty_frame_gives_empty_arrays():
+    history = lean_history(pd.DataFrame())
+    assert len(history.close) == 0 and len(history.volume) == 0
+
+
+def test_requests_within_ttl_share_one_buffer():
+    cache = HistoryCache(ttl=60)
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return frame([1.0, 2.0], [10, 20])
+
+    first = cache.get("AAPL", "1y", fetch)
+    second = cache.get("AAPL", "1y", fetch)
+    assert second.close is first.close and second.volume is first.volume
+    assert len(fetches) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_concurrent_misses_wait_for_one_fetch():
+    cache = HistoryCache()
+    release = threading.Event()
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        release.wait(5)
+        return frame([1.0], [10])
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("MSFT", "1y", fetch))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(fetches) == 1
+    assert all(result.close is results[0].close for result in results)
+
+
+def test_least_recently_used_symbol_is_evicted():
+    cache = HistoryCache(max_entries=2)
+    for symbol in ("AAPL", "MSFT"):
+        cache.get(symbol, "1y", lambda: frame([1.0], [10]))
+    cache.get("AAPL", "1y", lambda: frame([1.0], [10]))
+    cache.get("NVDA", "1y", lambda: frame([1.0], [10]))
+    misses = cache.stats()["misses"]
+    cache.get("AAPL", "1y", lambda: frame([1.0], [10]))
+    assert cache.stats()["misses"] == misses
+    cache.get("MSFT", "1y", lambda: frame([1.0], [10]))
+    assert cache.stats()["misses"] == misses + 1
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import BINS, IndicatorEngine
+
+
+def bars(count=120, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, count)))
+    high = close * (1 + rng.uniform(0, 0.02, count))
+    low = close * (1 - rng.uniform(0, 0.02, count))
+    volume = rng.integers(1_000_000, 5_000_000, count).astype(float)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=3), periods=count)
+    return pd.DataFrame({"Close": close, "High": high, "Low": low, "Volume": volume}, index=index)
+
+
+def reference(frame):
+    """Every indicator recomputed over the whole history with pandas"""
+    close, high, low = frame["Close"], frame["High"], frame["Low"]
+    ema_12 = close.ewm(span=12, adjust=False).mean()
+    ema_26 = close.ewm(span=26, adjust=False).mean()
+    macd = ema_12 - ema_26
+    signal = macd.ewm(span=9, adjust=False).mean()
+
+    change = close.diff().fillna(0.0)
+    avg_gain = change.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    avg_loss = (-change).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    prev = close.shift().fillna(close)
+    true_range = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1)
+    true_range.iloc[0] = high.iloc[0] - low.iloc[0]
+    atr = true_range.ewm(alpha=1 / 14, adjust=False).mean()
+
+    middle = close.rolling(20).mean()
+    band = close.rolling(20).std(ddof=0) * 2
+    return {
+        'sma_20': middle.iloc[-1],
+        'sma_50': close.rolling(50).mean().iloc[-1],
+        'ema_12': ema_12.iloc[-1],
+        'ema_26': ema_26.iloc[-1],
+        'macd': macd.iloc[-1],
+        'macd_signal': signal.iloc[-1],
+        'macd_histogram': (macd - signal).iloc[-1],
+        'rsi_14': 100 - 100 / (1 + avg_gain.iloc[-1] / avg_loss.iloc[-1]),
+        'atr_14': atr.iloc[-1],
+        'bollinger_upper': (middle + band).iloc[-1],
+        'bollinger_lower': (middle - band).iloc[-1],
+    }
+
+
+def incremental(frame, backfilled, path):
+    engine = IndicatorEngine(path)
+    engine.backfill({"AAPL": frame.iloc[:backfilled]})
+    for day, bar in frame.iloc[backfilled:].iterrows():
+        assert engine.update("AAPL", day, bar["Close"], bar["High"], bar["Low"], bar["Volume"])
+    return engine
+
+
+@pytest.mark.parametrize("backfilled", [1, 30, 119])
+def test_updates_match_a_full_recompute(tmp_path, backfilled):
+    frame = bars()
+    snapshot = incremental(frame, backfilled, str(tmp_path / "ind.npz")).snapshot("AAPL")
+    expected = reference(frame)
+
+    assert snapshot["bars"] == len(frame)
+    for name, value in expected.items():
+        assert snapshot[name] == pytest.approx(value, rel=1e-9), name
+
+
+def test_backfill_of_many_symbols_matches_one_at_a_time(tmp_path):
+    frames = {"AAPL": bars(seed=1), "MSFT": bars(80, seed=2)}
+    together = IndicatorEngine(str(tmp_path / "a.npz"))
+    together.backfill(frames)
+    for symbol, frame in frames.items():
+        alone = IndicatorEngine(str(tmp_path / f"{symbol}.npz"))
+        alone.backfill({symbol: frame})
+        assert together.snapshot(symbol) == pytest.approx(alone.snapshot(symbol))
+
+
+def test_profile_widens_for_bars_outside_the_backfill_range(tmp_path):
+    frame = bars()
+    engine = IndicatorEngine(str(tmp_path / "ind.npz"))
+    engine.backfill({"AAPL": frame.iloc[:-1]})
+    top = float(frame["High"].iloc[:-1].max())
+
+    # A breakout day far above the backfilled range, on overwhelming volume
+    day = frame.index[-1]
+    assert engine.update("AAPL", day, top * 1.5, top * 1.6, top * 1.4, 1e10)
+    snapshot = engine.snapshot("AAPL")
+    row = engine._rows["AAPL"]
+    width = (engine.state["profile_high"][row] - engine.state["profile_low"][row]) / BINS
+
+    assert engine.state["profile_high"][row] == pytest.approx(top * 1.6)
+    assert abs(snapshot["volume_poc"] - top * 1.5) <= width
+    assert engine.profile[row].sum() == pytest.approx(frame["Volume"].iloc[:-1].sum() + 1e10)
+
+
+def test_state_survives_save_and_load(tmp_path):
+    path = str(tmp_path / "ind.npz")
+    engine = incremental(bars(), 60, path)
+    engine.save()
+    assert IndicatorEngine.load(path).snapshot("AAPL") == engine.snapshot("AAPL")
+
+
+def test_old_and_unfinished_bars_are_ignored(tmp_path):
+    frame = bars()
+    engine = IndicatorEngine(str(tmp_path / "ind.npz"))
+    engine.backfill({"AAPL": frame})
+    assert not engine.update("AAPL", frame.index[-5], 1.0, 1.0, 1.0, 1.0)
+    assert not engine.update("AAPL", pd.Timestamp.today(), 1.0, 1.0, 1.0, 1.0)
+    assert engine.snapshot("AAPL")["bars"] == len(frame)
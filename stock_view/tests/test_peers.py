@@ -0,0 +1,120 @@
+import json
+import math
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from peers import PeerComparison, percentile_ranks
+from ratelimit import Priority, current_priority
+from screener import FundamentalsScreener
+
+nan = math.nan
+
+
+def test_percentile_counts_ties_as_half():
+    ranks = percentile_ranks(np.array([3.0]), np.array([[1.0, 2.0, 3.0, 4.0]]))
+    assert ranks.tolist() == [62.5]
+
+
+def test_percentile_extremes():
+    ranks = percentile_ranks(np.array([0.0, 10.0]), np.array([[1.0, 2.0], [1.0, 2.0]]))
+    assert ranks.tolist() == [0.0, 100.0]
+
+
+def test_percentile_ignores_nan_peers():
+    ranks = percentile_ranks(np.array([2.5]), np.array([[1.0, nan, 2.0, nan, 3.0, 4.0]]))
+    assert ranks.tolist() == [50.0]
+
+
+def test_percentile_is_nan_without_a_target_or_peers():
+    ranks = percentile_ranks(np.array([nan, 1.0]), np.array([[1.0, 2.0], [nan, nan]]))
+    assert all(math.isnan(r) for r in ranks)
+
+
+def test_percentile_ranks_each_metric_against_its_own_row():
+    peers = np.array([[10.0, 20.0, 30.0], [0.1, 0.2, 0.3], [5.0, 5.0, 5.0]])
+    ranks = percentile_ranks(np.array([25.0, 0.05, 5.0]), peers)
+    assert ranks.tolist() == pytest.approx([200 / 3, 0.0, 50.0])
+
+
+class FakeAgent:
+    """Answers from canned info dicts and counts the upstream calls"""
+
+    def __init__(self, release=None):
+        self.info_calls = []
+        self.priorities = []
+        self.release = release
+
+    def get_info(self, symbol):
+        if self.release is not None:
+            self.release.wait(5)
+        self.info_calls.append(symbol)
+        self.priorities.append(current_priority())
+        return {"trailingPE": float(len(self.info_calls)) * 10, "currentRatio": 1.5}
+
+    def get_fundamentals(self, symbol, info=None):
+        assert info is not None
+        return {"pe_ratio": info["trailingPE"]}
+
+    def get_financial_health(self, symbol, info=None):
+        assert info is not None
+        return {"current_ratio": info["currentRatio"]}
+
+
+@pytest.fixture
+def comparison(tmp_path):
+    path = tmp_path / "peers.json"
+    path.write_text(json.dumps({"industry:semiconductors": {
+        "symbols": ["NVDA", "AMD", "INTC", "AVGO"], "fetched_at": time.time(),
+    }}), encoding="utf-8")
+    screener = FundamentalsScreener(str(tmp_path / "screener.npz"))
+    return PeerComparison(screener, path=str(path))
+
+
+INFO = {"industryKey": "semiconductors"}
+
+
+def test_refresh_fetches_info_once_per_peer(comparison):
+    agent = FakeAgent()
+    comparison.refresh_in_background(agent, ["AMD", "INTC", "AVGO"]).join(5)
+
+    assert sorted(agent.info_calls) == ["AMD", "AVGO", "INTC"]
+    assert set(agent.priorities) == {Priority.PREFETCH}
+    assert comparison.screener.values(["AMD"], ["current_ratio"]).tolist() == [[1.5]]
+
+
+def test_compare_ranks_cached_peers_without_waiting(comparison):
+    comparison.screener.upsert("AMD", {"pe_ratio": 40.0})
+    release = threading.Event()
+    agent = FakeAgent(release)
+
+    result = comparison.compare(agent, "NVDA", INFO, {"pe_ratio": 50.0})
+    assert agent.info_calls == []
+    assert result["peers"] == ["AMD", "INTC", "AVGO"]
+    assert result["percentiles"] == {"pe_ratio": 100.0}
+    assert result["refreshing"] == 2
+
+    # A second report while the refresh is running does not start another one
+    assert comparison.refresh_in_background(agent, result["peers"]) is None
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "peer-refresh":
+            thread.join(5)
+
+    assert sorted(agent.info_calls) == ["AVGO", "INTC"]
+    result = comparison.compare(agent, "NVDA", INFO, {"pe_ratio": 50.0, "current_ratio": 1.0})
+    assert result["refreshing"] == 0
+    assert result["peer_count"]["pe_ratio"] == 3
+    assert result["percentiles"] == {"pe_ratio": 100.0, "current_ratio": 0.0}
+
+
+class OfflineAgent(FakeAgent):
+    def get_info(self, symbol):
+        raise ConnectionError("yahoo down")
+
+
+def test_symbols_without_info_are_skipped(comparison):
+    comparison.refresh_in_background(OfflineAgent(), ["AMD"]).join(5)
+    assert comparison.screener.stale(["AMD"], 3600) == ["AMD"]
@@ -0,0 +1,87 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import ratelimit
+from ratelimit import HostBucket, Priority, RateLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_bucket_refills_at_its_rate_up_to_the_burst(clock):
+    bucket = HostBucket(rate=2.0, burst=5)
+    bucket.tokens = 0.0
+    bucket.refill(clock() + 1.5)
+    assert bucket.tokens == pytest.approx(3.0)
+    bucket.refill(clock() + 60)
+    assert bucket.tokens == 5
+
+
+def test_interactive_calls_may_drain_the_bucket(clock):
+    limiter = RateLimiter({"yahoo": (1.0, 3)})
+    waits = [limiter.acquire("yahoo", Priority.INTERACTIVE) for _ in range(3)]
+    assert waits == [0.0, 0.0, 0.0]
+    assert limiter._bucket("yahoo").tokens == 0
+
+
+def test_waiters_are_served_by_priority_and_keep_the_reserve(clock):
+    limiter = RateLimiter({"yahoo": (1.0, 5)})
+    bucket = limiter._bucket("yahoo")
+    bucket.tokens = 0.0
+    waited = {}
+
+    def advance(seconds):
+        with limiter._cond:
+            clock.now += seconds
+            limiter._cond.notify_all()
+
+    def wait_for(level):
+        waited[level] = limiter.acquire("yahoo", level)
+
+    # Queued lowest priority first, so the order they are served in comes from the priority alone
+    threads = {}
+    for level in (Priority.PREFETCH, Priority.BATCH, Priority.INTERACTIVE):
+        threads[level] = threading.Thread(target=wait_for, args=(level,), daemon=True)
+        threads[level].start()
+        deadline = time.monotonic() + 5
+        while len(bucket.waiters) < len(threads) and time.monotonic() < deadline:
+            time.sleep(0.001)
+    assert len(bucket.waiters) == 3
+
+    def served(*expected):
+        for level in expected:
+            threads[level].join(5)
+        time.sleep(0.02)
+        return {level for level, thread in threads.items() if not thread.is_alive()}
+
+    advance(1)
+    assert served(Priority.INTERACTIVE) == {Priority.INTERACTIVE}
+    # BATCH leaves one token in reserve
+    advance(1)
+    assert served() == {Priority.INTERACTIVE}
+    advance(1)
+    assert served(Priority.BATCH) == {Priority.INTERACTIVE, Priority.BATCH}
+    # One token is left; PREFETCH leaves two in reserve
+    advance(1)
+    assert served() == {Priority.INTERACTIVE, Priority.BATCH}
+    advance(1)
+    assert served(Priority.PREFETCH) == set(Priority)
+
+    assert waited == {Priority.INTERACTIVE: 1.0, Priority.BATCH: 3.0, Priority.PREFETCH: 5.0}
+    assert bucket.tokens == pytest.approx(2.0)
+    assert bucket.max_queue_depth == 3
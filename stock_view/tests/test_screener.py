@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+
+import screener
+from screener import FundamentalsScreener
+
+
+def test_save_keeps_rows_written_by_another_screener(tmp_path):
+    path = str(tmp_path / "screener.npz")
+    app = FundamentalsScreener.load(path)
+    cli = FundamentalsScreener.load(path)
+
+    cli.upsert("MSFT", {"pe_ratio": 35.0})
+    cli.save()
+    app.upsert("AAPL", {"pe_ratio": 30.0, "return_on_equity": 1.5})
+    app.save()
+
+    stored = FundamentalsScreener.load(path)
+    assert sorted(stored.symbols) == ["AAPL", "MSFT"]
+    assert stored.values(["MSFT", "AAPL"], ["pe_ratio"]).tolist() == [[35.0, 30.0]]
+    assert math.isnan(stored.values(["MSFT"], ["return_on_equity"])[0, 0])
+
+
+def test_sync_takes_only_newer_rows(tmp_path):
+    path = str(tmp_path / "screener.npz")
+    older = FundamentalsScreener.load(path)
+    older.upsert("AAPL", {"pe_ratio": 28.0}, updated_at=100.0)
+    newer = FundamentalsScreener.load(path)
+    newer.upsert("AAPL", {"pe_ratio": 30.0}, updated_at=200.0)
+    newer.save()
+
+    assert older.sync() == 1
+    assert older.values(["AAPL"], ["pe_ratio"])[0, 0] == 30.0
+    older.save()
+    assert newer.sync() == 0
+
+
+def test_sync_rereads_the_store_only_after_it_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "screener.npz")
+    app = FundamentalsScreener.load(path)
+    app.upsert("AAPL", {"pe_ratio": 30.0})
+    app.save()
+
+    loads = []
+    real_load = np.load
+    monkeypatch.setattr(screener.np, "load", lambda *args, **kwargs: loads.append(args[0]) or real_load(*args, **kwargs))
+    assert app.sync() == 0 and app.sync() == 0
+    assert loads == []
+
+    cli = FundamentalsScreener(path)
+    cli.upsert("MSFT", {"pe_ratio": 35.0})
+    cli.save()
+    assert app.sync() == 1
+    assert app.sync() == 0
+    assert len(loads) == 2  # cli merging before its write, then app